@@ -0,0 +1,142 @@
+import atexit
+import copy
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundSaver:
+    """Class containing all the functions enabling the saving of objects in pyb files by a background thread.
+
+    The saves are carried out one after the other by a single writing thread, so that the next objects can be
+    processed while the previous ones are still being written. Each save is registered with the path of its pyb file
+    until it is finished. The wait_saved function waits for the end of the saves of a pyb file or of all the pyb files,
+    and raises the errors that may have occurred during them. The functions reading a pyb file wait for its pending
+    saves before reading it.
+
+    The saves finished without error are unregistered as soon as they end. The failed saves are reported when they end
+    and stay registered until they are waited for, so that their errors are raised again. All the saves are waited for
+    at the exit of the interpreter.
+
+    The object saved is a shallow copy of the object whose dictionaries are also copied, so that the arrays and
+    dataframes it contains can be replaced in the object while it is being written.
+    """
+    _executor = None
+    _dict_pending_saves = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def shallow_copy(obj):
+        """Function to make a copy of an object sharing its arrays but not its dictionaries.
+
+        Parameters
+        ----------
+        obj : object
+            Object to be copied.
+
+        Returns
+        ----------
+        obj_copy : object
+            Copy of the object in which the dictionary attributes are copied and the other attributes are shared.
+        """
+        obj_copy = copy.copy(obj)
+        obj_copy.__dict__.update({name: value.copy() for name, value in obj.__dict__.items()
+                                  if isinstance(value, dict)})
+
+        return obj_copy
+
+    @staticmethod
+    def submit(path_pyb, saving_function, obj):
+        """Function to save an object in a pyb file with the background thread.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file, used to wait for the end of the save.
+
+        saving_function : callable
+            Function writing the object given as its only argument.
+
+        obj : object
+            Object to be saved. A shallow copy is saved instead of the object itself.
+
+        Returns
+        ----------
+        future : concurrent.futures.Future
+            Future of the save.
+        """
+        with BackgroundSaver._lock:
+            if BackgroundSaver._executor is None:
+                BackgroundSaver._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyb_writer")
+                atexit.register(BackgroundSaver.flush)
+            future = BackgroundSaver._executor.submit(saving_function, BackgroundSaver.shallow_copy(obj))
+            BackgroundSaver._dict_pending_saves.setdefault(os.path.abspath(path_pyb), []).append(future)
+
+        # The callback is added without the lock because it is called immediately if the save is already finished.
+        future.add_done_callback(lambda future_done: BackgroundSaver.pruning(path_pyb, future_done))
+
+        return future
+
+    @staticmethod
+    def pruning(path_pyb, future):
+        """Function called at the end of a background save to unregister it if it has succeeded.
+
+        A failed save is reported and stays registered, so that its error is raised again when it is waited for.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file of the save.
+
+        future : concurrent.futures.Future
+            Future of the finished save.
+        """
+        if not future.cancelled() and future.exception() is not None:
+            print(f"BACKGROUND SAVE FAILED: {path_pyb}: {future.exception()!r}")
+            return
+
+        with BackgroundSaver._lock:
+            list_futures = BackgroundSaver._dict_pending_saves.get(os.path.abspath(path_pyb), [])
+            if future in list_futures:
+                list_futures.remove(future)
+            if not list_futures:
+                BackgroundSaver._dict_pending_saves.pop(os.path.abspath(path_pyb), None)
+
+    @staticmethod
+    def wait_saved(path_pyb=None):
+        """Function to wait for the end of the background saves of a pyb file or of all the pyb files.
+
+        The foreground saves wait for the background saves of their pyb file, so that they are never mixed up with them.
+
+        Parameters
+        ----------
+        path_pyb : str or None
+            Path of the pyb file whose saves are waited for. If it is None, all the saves are waited for.
+
+        Raises
+        ----------
+        Exception
+            The first error raised by one of the saves waited for is raised again once all of them are finished.
+        """
+        # The writing thread does not wait for the saves, since it carries them out one after the other.
+        if threading.current_thread().name.startswith("pyb_writer"):
+            return
+
+        with BackgroundSaver._lock:
+            if path_pyb is None:
+                list_paths = list(BackgroundSaver._dict_pending_saves)
+            else:
+                list_paths = [os.path.abspath(path_pyb)]
+            list_futures = [future for path in list_paths
+                            for future in BackgroundSaver._dict_pending_saves.pop(path, [])]
+
+        # All the saves are waited for before raising the first error.
+        list_errors = [future.exception() for future in list_futures]
+        for error in list_errors:
+            if error is not None:
+                raise error
+
+    @staticmethod
+    def flush():
+        """Function to wait for the end of all the background saves."""
+        BackgroundSaver.wait_saved()
@@ -0,0 +1,199 @@
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+class CenteredTemporalIndex(NDArrayOperatorsMixin):
+    """Temporal index centered on a different time for each cell of the axis of the object's movement, whose rows are
+    computed only when they are accessed.
+
+    The centered index is a 2D array with one row per cell of the axis of the object's movement, each row being the
+    temporal index minus the time at which the object reaches the centre of the cell. Instead of storing this array,
+    the CenteredTemporalIndex stores the 1D temporal index, the list of the centering times and the ratios of the unit
+    conversions applied to it. A row is computed from them each time it is accessed, exactly as it would have been in
+    the 2D array.
+
+    The multiplication of the CenteredTemporalIndex by a scalar, used for the unit conversions of the indexes, gives
+    another CenteredTemporalIndex. The CenteredTemporalIndex can otherwise be used like a numpy array : numpy functions
+    and operators are applied to the 2D array computed entirely.
+
+    Attributes
+    ----------
+    index : np.ndarray
+        1D temporal index to be centered.
+
+    list_time_center : list of float
+        Times on which the temporal index is centered for each cell of the axis of the object's movement.
+
+    tuple_ratios : tuple of float
+        Ratios of the unit conversions successively applied to the centered index.
+    """
+
+    def __init__(self, index, list_time_center, tuple_ratios=()):
+        """Init function to make a CenteredTemporalIndex object.
+
+        Parameters
+        ----------
+        index : np.ndarray
+            1D temporal index to be centered.
+
+        list_time_center : list of float
+            Times on which the temporal index is centered for each cell of the axis of the object's movement.
+
+        tuple_ratios : tuple of float
+            Ratios of the unit conversions successively applied to the centered index.
+        """
+        self._index = index
+        self._list_time_center = list(list_time_center)
+        self._tuple_ratios = tuple(tuple_ratios)
+
+    @property
+    def index(self):
+        """Getter for the index attribute."""
+        return self._index
+
+    @property
+    def list_time_center(self):
+        """Getter for the list_time_center attribute."""
+        return self._list_time_center
+
+    @property
+    def tuple_ratios(self):
+        """Getter for the tuple_ratios attribute."""
+        return self._tuple_ratios
+
+    @property
+    def shape(self):
+        """Getter for the shape of the centered index."""
+        return len(self.list_time_center), self.index.shape[0]
+
+    @property
+    def dtype(self):
+        """Getter for the type of the values of the centered index."""
+        return self.row_computing(0, self.index[:1]).dtype if self.list_time_center else self.index.dtype
+
+    @property
+    def ndim(self):
+        """Getter for the number of dimensions of the centered index."""
+        return 2
+
+    @property
+    def size(self):
+        """Getter for the number of values of the centered index."""
+        return self.shape[0] * self.shape[1]
+
+    def row_computing(self, i_row, index=None):
+        """Function to compute a row of the centered index.
+
+        Parameters
+        ----------
+        i_row : int
+            Index of the cell whose row is computed.
+
+        index : np.ndarray or None
+            Part of the temporal index to be centered. If it is None, the whole temporal index is centered.
+
+        Returns
+        ----------
+        row : np.ndarray
+            1D temporal index centered on the time of the cell and converted with the ratios.
+        """
+        row = (self.index if index is None else index) - self.list_time_center[i_row]
+        for ratio in self.tuple_ratios:
+            row = row * ratio
+
+        return row
+
+    def rows_computing(self, list_rows):
+        """Function to compute several rows of the centered index in a 2D array.
+
+        Parameters
+        ----------
+        list_rows : iterable of int
+            Indexes of the cells whose rows are computed.
+
+        Returns
+        ----------
+        array : np.ndarray
+            2D array of the rows computed.
+        """
+        list_rows = list(list_rows)
+        array = np.empty((len(list_rows), self.shape[1]), dtype=self.dtype)
+        for i, i_row in enumerate(list_rows):
+            array[i] = self.row_computing(i_row)
+
+        return array
+
+    def __getitem__(self, key):
+        """Indexing of the CenteredTemporalIndex computing only the rows of the cells selected.
+
+        Parameters
+        ----------
+        key : int or slice or np.ndarray or tuple
+            Index of the values selected, as for a numpy array.
+
+        Returns
+        ----------
+        array : np.ndarray
+            Values selected.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+
+        # Cases of indexes with new axes, ellipsis, multidimensional masks or several arrays of indexes broadcast
+        # together, for which all the rows are computed.
+        if (not key or any(key_axis is None or key_axis is Ellipsis for key_axis in key) or
+                (np.ndim(key[0]) > 1 and np.asarray(key[0]).dtype == bool) or
+                sum(not isinstance(key_axis, slice) and np.ndim(key_axis) > 0 for key_axis in key) > 1):
+            return np.asarray(self)[key]
+
+        list_rows = np.arange(self.shape[0])[key[0]]
+
+        # Case of a single row selected.
+        if np.ndim(list_rows) == 0:
+            return self.row_computing(int(list_rows))[key[1:]]
+
+        return self.rows_computing(list_rows.ravel()).reshape(list_rows.shape + (self.shape[1],))[
+            (slice(None),) * list_rows.ndim + key[1:]]
+
+    def __array__(self, dtype=None, copy=None):
+        """Conversion of the CenteredTemporalIndex into a 2D numpy array by computing all its rows."""
+        array = self.rows_computing(range(self.shape[0]))
+
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Application of the numpy universal functions and operators on the 2D array.
+
+        The multiplication by a scalar gives a CenteredTemporalIndex to which the ratio is added.
+        """
+        if ufunc is np.multiply and method == "__call__" and len(inputs) == 2 and not kwargs:
+            other = inputs[1] if inputs[0] is self else inputs[0]
+            if not isinstance(other, CenteredTemporalIndex) and np.ndim(other) == 0:
+                return CenteredTemporalIndex(self.index, self.list_time_center, self.tuple_ratios + (other,))
+
+        inputs = tuple(np.asarray(value) if isinstance(value, CenteredTemporalIndex) else value for value in inputs)
+        if "out" in kwargs:
+            kwargs["out"] = tuple(np.asarray(value) if isinstance(value, CenteredTemporalIndex) else value
+                                  for value in kwargs["out"])
+
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getattr__(self, name):
+        """Access to the other attributes and methods of numpy arrays on the 2D array."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(np.asarray(self), name)
+
+    def __len__(self):
+        """Number of cells of the axis of the object's movement."""
+        return self.shape[0]
+
+    def __iter__(self):
+        """Iteration on the rows of the centered index."""
+        for i_row in range(self.shape[0]):
+            yield self.row_computing(i_row)
+
+    def __repr__(self):
+        """Representation of the CenteredTemporalIndex."""
+        return (f"CenteredTemporalIndex(shape={self.shape}, dtype={self.dtype}, "
+                f"tuple_ratios={self.tuple_ratios})")
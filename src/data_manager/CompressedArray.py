@@ -0,0 +1,390 @@
+import lzma
+import os
+import zlib
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+class CompressedArray(NDArrayOperatorsMixin):
+    """Array saved in a file in compressed blocks along its last axis, decompressed only when its values are accessed.
+
+    The arrays of the measurements are mostly smooth time series whose successive values share their most significant
+    bytes. Each block contains all the values of a range of time steps. Its bytes are shuffled so that the first byte
+    of every value is stored first, then the second byte of every value, and so on, before being compressed with a codec
+    of the standard library (‘zlib’ or ‘lzma’).
+
+    When the CompressedArray is sliced, only the blocks of the time steps selected are read and decompressed. The
+    CompressedArray can otherwise be used like a numpy array : numpy functions and operators decompress it entirely. It
+    is pickled and copied as a numpy array.
+
+    The file is opened when the CompressedArray is made and kept open until it is deleted, so that the CompressedArray
+    keeps reading the version of the file described by its blocks even if the file is replaced by a new version.
+
+    Attributes
+    ----------
+    path_file : str
+        Path of the file containing the compressed blocks.
+
+    shape : tuple of int
+        Shape of the array.
+
+    dtype : np.dtype
+        Type of the values of the array.
+
+    codec : str
+        Name of the codec of the blocks (‘zlib’ or ‘lzma’).
+
+    block_size : int
+        Number of time steps per block.
+
+    list_blocks : list of tuple
+        Offset and size in bytes of each compressed block in the file.
+    """
+    codecs = {"zlib": (zlib.compress, zlib.decompress), "lzma": (lzma.compress, lzma.decompress)}
+
+    def __init__(self, path_file, shape, dtype, codec, block_size, list_blocks):
+        """Init function to make a CompressedArray object from the description of its file.
+
+        Parameters
+        ----------
+        path_file : str
+            Path of the file containing the compressed blocks.
+
+        shape : tuple of int
+            Shape of the array.
+
+        dtype : np.dtype or str
+            Type of the values of the array.
+
+        codec : str
+            Name of the codec of the blocks (‘zlib’ or ‘lzma’).
+
+        block_size : int
+            Number of time steps per block.
+
+        list_blocks : list of tuple
+            Offset and size in bytes of each compressed block in the file.
+        """
+        self._path_file = path_file
+        self._shape = tuple(shape)
+        self._dtype = np.dtype(dtype)
+        self._codec = codec
+        self._block_size = block_size
+        self._list_blocks = list_blocks
+        self._blocks_file = open(path_file, "rb")
+
+    @property
+    def path_file(self):
+        """Getter for the path_file attribute."""
+        return self._path_file
+
+    @property
+    def shape(self):
+        """Getter for the shape attribute."""
+        return self._shape
+
+    @property
+    def dtype(self):
+        """Getter for the dtype attribute."""
+        return self._dtype
+
+    @property
+    def codec(self):
+        """Getter for the codec attribute."""
+        return self._codec
+
+    @property
+    def block_size(self):
+        """Getter for the block_size attribute."""
+        return self._block_size
+
+    @property
+    def list_blocks(self):
+        """Getter for the list_blocks attribute."""
+        return self._list_blocks
+
+    @property
+    def ndim(self):
+        """Getter for the number of dimensions of the array."""
+        return len(self.shape)
+
+    @property
+    def size(self):
+        """Getter for the number of values of the array."""
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        """Getter for the size in bytes of the decompressed array."""
+        return self.size * self.dtype.itemsize
+
+    @staticmethod
+    def shuffle(array):
+        """Function to gather the bytes of the same rank of all the values of an array.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array whose bytes are to be shuffled.
+
+        Returns
+        ----------
+        bytes_shuffled : bytes
+            Bytes of the array, the first byte of every value first, then the second byte of every value, and so on.
+        """
+        return np.ascontiguousarray(array).view(np.uint8).reshape(-1, array.dtype.itemsize).T.tobytes()
+
+    @staticmethod
+    def unshuffle(bytes_shuffled, dtype, shape):
+        """Function to reconstruct an array from its shuffled bytes.
+
+        Parameters
+        ----------
+        bytes_shuffled : bytes
+            Bytes of the array shuffled by the shuffle function.
+
+        dtype : np.dtype
+            Type of the values of the array.
+
+        shape : tuple of int
+            Shape of the array.
+
+        Returns
+        ----------
+        array : np.ndarray
+            Array reconstructed.
+        """
+        return np.ascontiguousarray(np.frombuffer(bytes_shuffled, np.uint8).reshape(dtype.itemsize, -1).T).view(
+            dtype).reshape(shape)
+
+    @staticmethod
+    def computing_block_size(array, block_bytes=2 ** 20):
+        """Function to compute the number of time steps of the blocks of an array so that they weigh about 1 MiB.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array to be compressed in blocks along its last axis.
+
+        block_bytes : int
+            Target size in bytes of the decompressed blocks.
+
+        Returns
+        ----------
+        block_size : int
+            Number of time steps per block.
+        """
+        return max(block_bytes // max(array[..., :1].nbytes, 1), 1)
+
+    @classmethod
+    def write(cls, array, path_file, codec="zlib", block_size=None):
+        """Function to write an array in a file in compressed blocks along its last axis.
+
+        The blocks are written in a temporary file renamed at the end of the writing.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array to be compressed.
+
+        path_file : str
+            Path of the file of the compressed blocks.
+
+        codec : str
+            Name of the codec of the blocks (‘zlib’ or ‘lzma’).
+
+        block_size : int or None
+            Number of time steps per block. If it is None, the blocks weigh about 1 MiB before compression.
+
+        Returns
+        ----------
+        compressed_array : CompressedArray
+            CompressedArray of the file written.
+        """
+        if codec not in cls.codecs:
+            raise ValueError(f"Incorrect codec ‘{codec}’, the possible codecs are : {', '.join(cls.codecs)}")
+
+        compress = cls.codecs[codec][0]
+        block_size = block_size or cls.computing_block_size(array)
+        list_blocks = []
+        with open(f"{path_file}.tmp", "wb") as blocks_file:
+            for i_time in range(0, max(array.shape[-1], 1), block_size):
+                bytes_block = compress(cls.shuffle(array[..., i_time:i_time + block_size]))
+                list_blocks.append((blocks_file.tell(), len(bytes_block)))
+                blocks_file.write(bytes_block)
+        os.replace(f"{path_file}.tmp", path_file)
+
+        return cls(path_file, array.shape, array.dtype, codec, block_size, list_blocks)
+
+    def is_stored_in(self, path_file):
+        """Function to determine whether the CompressedArray reads the current version of a given file.
+
+        Parameters
+        ----------
+        path_file : str
+            Path of the file.
+
+        Returns
+        ----------
+        is_stored_in : bool
+            Returns True if the file opened by the CompressedArray is the one currently at this path.
+        """
+        try:
+            return (os.path.abspath(self.path_file) == os.path.abspath(path_file) and
+                    os.path.samestat(os.fstat(self._blocks_file.fileno()), os.stat(path_file)))
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def reading_bytes(self, offset, size):
+        """Function to read bytes of the file opened by the CompressedArray.
+
+        Parameters
+        ----------
+        offset : int
+            Offset of the first byte read.
+
+        size : int
+            Number of bytes read.
+
+        Returns
+        ----------
+        bytes_read : bytes
+            Bytes read.
+        """
+        # Reading without moving the position of the file, so that several threads can read it at the same time.
+        if hasattr(os, "pread"):
+            return os.pread(self._blocks_file.fileno(), size, offset)
+
+        self._blocks_file.seek(offset)
+        return self._blocks_file.read(size)
+
+    def close(self):
+        """Function to close the file of the CompressedArray."""
+        blocks_file = getattr(self, "_blocks_file", None)
+        if blocks_file is not None:
+            blocks_file.close()
+
+    def reading_blocks(self, i_block_start, i_block_end):
+        """Function to read and decompress a range of consecutive blocks.
+
+        Parameters
+        ----------
+        i_block_start : int
+            Index of the first block read.
+
+        i_block_end : int
+            Index of the block following the last block read.
+
+        Returns
+        ----------
+        array : np.ndarray
+            Array of the time steps of the blocks read.
+        """
+        decompress = self.codecs[self.codec][1]
+        list_arrays = []
+        for i_block in range(i_block_start, i_block_end):
+            offset, size = self.list_blocks[i_block]
+            n_time = min(self.block_size, self.shape[-1] - i_block * self.block_size)
+            list_arrays.append(self.unshuffle(decompress(self.reading_bytes(offset, size)), self.dtype,
+                                              self.shape[:-1] + (n_time,)))
+
+        if not list_arrays:
+            return np.empty(self.shape[:-1] + (0,), dtype=self.dtype)
+
+        return np.concatenate(list_arrays, axis=-1)
+
+    def decompress(self):
+        """Function to decompress the whole array.
+
+        Returns
+        ----------
+        array : np.ndarray
+            Array decompressed.
+        """
+        return self.reading_blocks(0, len(self.list_blocks))
+
+    def __getitem__(self, key):
+        """Slicing of the CompressedArray decompressing only the blocks of the time steps selected.
+
+        Parameters
+        ----------
+        key : int or slice or np.ndarray or tuple
+            Index of the values selected, as for a numpy array.
+
+        Returns
+        ----------
+        array : np.ndarray
+            Values selected.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+
+        list_ellipsis = [i_axis for i_axis, key_axis in enumerate(key) if key_axis is Ellipsis]
+
+        # Cases of indexes with new axes, multidimensional masks or too many axes, for which the whole array is
+        # decompressed.
+        if (any(key_axis is None or (np.ndim(key_axis) > 1 and np.asarray(key_axis).dtype == bool) for key_axis in key)
+                or len(key) - len(list_ellipsis) > self.ndim):
+            return self.decompress()[key]
+
+        # Replacement of the ellipsis by full slices so that the last index is the one of the time axis.
+        if list_ellipsis:
+            i_ellipsis = list_ellipsis[0]
+            key = key[:i_ellipsis] + (slice(None),) * (self.ndim - len(key) + 1) + key[i_ellipsis + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        # Time steps selected and range of the blocks containing them.
+        time_steps = np.arange(self.shape[-1])[key[-1]]
+        if np.size(time_steps) == 0:
+            return np.empty(self.shape[:-1] + (0,), dtype=self.dtype)[key[:-1] + (slice(0, 0),)]
+        i_block_start = int(np.min(time_steps)) // self.block_size
+        i_block_end = int(np.max(time_steps)) // self.block_size + 1
+        start = i_block_start * self.block_size
+
+        # Index of the time steps selected relative to the blocks read.
+        if isinstance(key[-1], slice):
+            stop = int(time_steps[-1]) - start + (1 if time_steps.size == 1 or time_steps[1] > time_steps[0] else -1)
+            key_time = slice(int(time_steps[0]) - start, stop if stop >= 0 else None, key[-1].step)
+        else:
+            key_time = time_steps - start
+
+        return self.reading_blocks(i_block_start, i_block_end)[key[:-1] + (key_time,)]
+
+    def __array__(self, dtype=None, copy=None):
+        """Conversion of the CompressedArray into a numpy array by decompressing it."""
+        array = self.decompress()
+
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Application of the numpy universal functions and operators on the decompressed array."""
+        inputs = tuple(np.asarray(value) if isinstance(value, CompressedArray) else value for value in inputs)
+        if "out" in kwargs:
+            kwargs["out"] = tuple(np.asarray(value) if isinstance(value, CompressedArray) else value
+                                  for value in kwargs["out"])
+
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getattr__(self, name):
+        """Access to the other attributes and methods of numpy arrays on the decompressed array."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.decompress(), name)
+
+    def __len__(self):
+        """Length of the first axis of the array."""
+        return self.shape[0]
+
+    def __reduce_ex__(self, protocol):
+        """Reduction of the CompressedArray as the decompressed numpy array used by pickle and copy."""
+        return self.decompress().__reduce_ex__(protocol)
+
+    def __del__(self):
+        """Closing of the file when the CompressedArray is deleted."""
+        self.close()
+
+    def __repr__(self):
+        """Representation of the CompressedArray."""
+        return (f"CompressedArray(shape={self.shape}, dtype={self.dtype}, codec={self.codec}, "
+                f"n_blocks={len(self.list_blocks)})")
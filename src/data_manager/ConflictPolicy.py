@@ -0,0 +1,105 @@
+import os
+
+
+class ConflictPolicy:
+    """Class containing all the functions enabling the resolution of the conflicts between a pyb file and the
+    configuration given to create the object it contains.
+
+    A conflict occurs when the configuration dictionaries stored in a pyb file differ from those given as input. The
+    conflict policy decides which of the two configurations is kept:
+    - ‘interactive’ (default) asks the user to choose between the json and the pyb.
+    - ‘prefer_file’ keeps the pyb file.
+    - ‘prefer_config’ rebuilds the object from the configuration given as input and replaces the pyb file.
+    - ‘error’ raises a ValueError.
+    - ‘rebuild_if_stale’ keeps the pyb file unless one of its sources has been modified after it, in which case the
+    object is rebuilt from the configuration given as input, even without difference between the configurations.
+
+    The conflict policy can be given to each object or for all the objects with the ‘MACULAR_CONFLICT_POLICY’
+    environment variable, so that batch jobs never wait for a user answer.
+    """
+    policies = ("interactive", "prefer_file", "prefer_config", "error", "rebuild_if_stale")
+
+    @staticmethod
+    def resolving_conflict_policy(conflict_policy=None):
+        """Function to get the conflict policy to be used.
+
+        Parameters
+        ----------
+        conflict_policy : str or None
+            Conflict policy given as input. If it is None, the policy is taken from the ‘MACULAR_CONFLICT_POLICY’
+            environment variable, otherwise it is ‘interactive’.
+
+        Returns
+        ----------
+        conflict_policy : str
+            Returns the name of the conflict policy.
+
+        Raises
+        ----------
+        ValueError
+            The value error is raised if the conflict policy does not exist.
+        """
+        if conflict_policy is None:
+            conflict_policy = os.environ.get("MACULAR_CONFLICT_POLICY") or "interactive"
+
+        if conflict_policy not in ConflictPolicy.policies:
+            raise ValueError(f"Incorrect conflict policy ‘{conflict_policy}’, the possible policies are : "
+                             f"{', '.join(ConflictPolicy.policies)}")
+
+        return conflict_policy
+
+    @staticmethod
+    def is_stale(path_pyb, list_paths_sources):
+        """Function to determine whether a pyb file is older than one of the sources used to create it.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path to the pyb file or to the pyb store.
+
+        list_paths_sources : list of str
+            Paths to the files used to create the object of the pyb file. Missing sources are ignored.
+
+        Returns
+        ----------
+        is_stale : bool
+            Returns True if one of the sources has been modified after the pyb file.
+        """
+        mtime_pyb = os.path.getmtime(path_pyb)
+
+        return any(os.path.exists(path_source) and os.path.getmtime(path_source) > mtime_pyb
+                   for path_source in list_paths_sources)
+
+    @staticmethod
+    def choosing_configuration(conflict_policy, is_stale=False):
+        """Function to choose the configuration to be kept in case of conflict according to the conflict policy.
+
+        Parameters
+        ----------
+        conflict_policy : str
+            Name of the conflict policy.
+
+        is_stale : bool
+            True if the pyb file is older than one of its sources.
+
+        Returns
+        ----------
+        user_choice : str
+            Returns ‘json’ to keep the configuration given as input or ‘pyb’ to keep the pyb file. In the
+            ‘interactive’ policy, the answer of the user is returned as it is.
+
+        Raises
+        ----------
+        ValueError
+            The value error is raised with the ‘error’ policy.
+        """
+        if conflict_policy == "interactive":
+            return input("Which configuration should be kept ? json or pyb : ").lower()
+        elif conflict_policy == "prefer_file":
+            return "pyb"
+        elif conflict_policy == "prefer_config":
+            return "json"
+        elif conflict_policy == "rebuild_if_stale":
+            return "json" if is_stale else "pyb"
+
+        raise ValueError("The configuration of the pyb file differs from the one given as input")
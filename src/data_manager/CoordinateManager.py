@@ -40,6 +40,36 @@ class CoordinateManager:
 
         return dict_coordinates
 
+    @staticmethod
+    def array_id_to_coordinates(array_num, n_cells):
+        """Conversion of an array of Macular identification numbers of cells in the Macular coordinate system.
+
+        This is the vectorised equivalent of id_to_coordinates. The coordinates are computed with integer arithmetic so
+        that a whole Macular csv header can be converted in a single operation.
+
+        Parameters
+        ----------
+        array_num : np.ndarray
+            1D array of Macular identification numbers of the cells whose coordinates are to be determined in Macular.
+
+        n_cells : tuple
+            Size of the Macular graph in cells in the form of : (number of cells in x, number of cells in y).
+
+        Returns
+        ----------
+        dict_coordinates : dict of np.ndarray
+            Dictionary containing the arrays of Macular coordinates of the cells named by the Macular identification
+            numbers given as input. The dictionary contains an ‘x’, a ‘y’ and a ‘z’ key.
+        """
+        array_num = np.asarray(array_num, dtype=int)
+
+        # Calculation of the x, y and z coordinates arrays.
+        dict_coordinates = {"z": array_num // (n_cells[0] * n_cells[1]),
+                            "x": array_num % (n_cells[0] * n_cells[1]) // n_cells[1],
+                            "y": array_num % n_cells[1]}
+
+        return dict_coordinates
+
     @staticmethod
     def coordinates_to_id(dict_coordinates, n_cells):
         """Conversion of a Macular coordinate system of a cell in the Macular identification number.
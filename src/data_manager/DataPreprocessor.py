@@ -1,5 +1,7 @@
 import numpy as np
 
+from src.data_manager.CenteredTemporalIndex import CenteredTemporalIndex
+
 
 class DataPreprocessor:
     @staticmethod
@@ -39,31 +41,62 @@ class DataPreprocessor:
             return array[slicer_indices]
 
     @staticmethod
-    def vsdi_computing(macular_dict_array_data):
+    def vsdi_computing(macular_dict_array_data, weight_exc=0.8, weight_inh=0.2, block_size=None):
+        """Function to compute the VSDI of the cortical column as the weighted sum of the opposite of the excitatory and
+        inhibitory mean voltages normalised by their initial value.
+
+        The initial voltages are broadcast along the time axis instead of being repeated, and the VSDI is accumulated in
+        a single output array. The time steps can be computed by blocks of block_size time steps, so that the only other
+        array allocated is the normalised inhibitory voltage of a block. By default, all the time steps are computed at
+        once."""
         # Set the average excitatory and inhibitory voltages.
         exc_mean_voltage = macular_dict_array_data["muVn_CorticalExcitatory"]
         inh_mean_voltage = macular_dict_array_data["muVn_CorticalInhibitory"]
 
         # Set of initial average voltages.
-        initial_exc_mean_voltage = exc_mean_voltage[:, :, 0]
-        initial_inh_mean_voltage = inh_mean_voltage[:, :, 0]
-
-        # Calculation of the VSDI of the excitatory and inhibitory populations.
-        vsdi_exc = -DataPreprocessor.array_normalization(exc_mean_voltage, initial_exc_mean_voltage)
-        vsdi_inh = -DataPreprocessor.array_normalization(inh_mean_voltage, initial_inh_mean_voltage)
+        initial_exc_mean_voltage = exc_mean_voltage[:, :, :1]
+        initial_inh_mean_voltage = inh_mean_voltage[:, :, :1]
+
+        vsdi = np.empty(exc_mean_voltage.shape, dtype=np.result_type(exc_mean_voltage.dtype, inh_mean_voltage.dtype,
+                                                                       0.0))
+        block_size = block_size or max(vsdi.shape[2], 1)
+        for i_time in range(0, vsdi.shape[2], block_size):
+            vsdi_block = vsdi[:, :, i_time:i_time + block_size]
+
+            # Calculation of the VSDI of the excitatory population directly in the VSDI of the cortical column.
+            if exc_mean_voltage.dtype == vsdi.dtype:
+                DataPreprocessor.weighted_opposite_normalization(
+                    exc_mean_voltage[:, :, i_time:i_time + block_size], initial_exc_mean_voltage, weight_exc,
+                    out=vsdi_block)
+            else:
+                vsdi_block[...] = DataPreprocessor.weighted_opposite_normalization(
+                    exc_mean_voltage[:, :, i_time:i_time + block_size], initial_exc_mean_voltage, weight_exc)
 
-        # Calculation of the VSDI of the cortical column.
-        vsdi = vsdi_exc * 0.8 + vsdi_inh * 0.2
+            # Addition of the VSDI of the inhibitory population.
+            np.add(vsdi_block, DataPreprocessor.weighted_opposite_normalization(
+                inh_mean_voltage[:, :, i_time:i_time + block_size], initial_inh_mean_voltage, weight_inh),
+                   out=vsdi_block)
 
         return vsdi
 
+    @staticmethod
+    def weighted_opposite_normalization(array_to_normalize, baseline, weight, out=None):
+        """Normalise an array by a baseline broadcast on it, then multiply it by the opposite of a weight.
+
+        The operations are carried out in place in the output array, which is a new array if it is not given."""
+        normalized_array = np.subtract(array_to_normalize, baseline, out=out)
+        normalized_array = np.divide(normalized_array, baseline,
+                                     out=normalized_array if normalized_array.dtype.kind in "fc" else None)
+
+        return np.multiply(normalized_array, -weight, out=normalized_array)
+
     @staticmethod
     def array_normalization(array_to_normalize, baseline):
         """Normalise an array by a single value, a 2D or 3D array."""
         if type(baseline) == int:
             normalized_array = (array_to_normalize - baseline) / baseline
 
-        elif type(baseline) == np.ndarray:
+        elif isinstance(baseline, np.ndarray):
             if len(array_to_normalize.shape) == 1:
                 normalized_array = (array_to_normalize - float(baseline)) / float(baseline)
             elif len(array_to_normalize.shape) == 2:
@@ -96,13 +129,8 @@ class DataPreprocessor:
 
     @staticmethod
     def temporal_centering(index, list_time_center):
-        # Incrementing the list of time indexes re-centred for each cell in the bar axis.
-        list_index_centered = []
-
-        for time_center in list_time_center:
-            list_index_centered.append(index - time_center)
-
-        return np.array(list_index_centered)
+        # Time index re-centred for each cell in the bar axis, whose rows are computed when accessed.
+        return CenteredTemporalIndex(index, list_time_center)
 
     @staticmethod
     def spatial_centering(index, n_cells):
@@ -114,29 +142,40 @@ class DataPreprocessor:
             return index - (index[int(n_cells / 2)] + index[int(n_cells / 2) - 1]) / 2
 
     @staticmethod
-    def derivative_computing_3d_array(array, index, n=1):
+    def derivative_computing_3d_array(array, index, n=1, out=None):
         """Function to compute derivative of a 3D array to be derived. The derivative can depend
-        on n_value or to be instant."""
-        df_dxdt = np.zeros(array.shape)
-
-        # Go through temporal index
-        for i_derivate in range(array.shape[2]):
-            # Case where the time index is too close to the lower limit for the window to fit.
-            if i_derivate < n:
-                df_dxdt[:, :, i_derivate] = (array[:, :, i_derivate + n] - array[:, :, 0])
-                df_dxdt[:, :, i_derivate] = df_dxdt[:, :, i_derivate] / (index[i_derivate + n] - index[0])
-
-            # Case where the time index is too close to the upper limit for the window to fit.
-            elif i_derivate >= array.shape[2] - n:
-                df_dxdt[:, :, i_derivate] = (array[:, :, array.shape[2] - 1] - array[:, :, i_derivate - n])
-                df_dxdt[:, :, i_derivate] = df_dxdt[:, :, i_derivate] / (
-                        index[array.shape[2] - 1] - index[i_derivate - n])
-            # Intermediate case where the n window fits within the neighbourhood of the current time index.
-            else:
-                df_dxdt[:, :, i_derivate] = (array[:, :, i_derivate + n] - array[:, :, i_derivate - n])
-                df_dxdt[:, :, i_derivate] = df_dxdt[:, :, i_derivate] / (index[i_derivate + n] - index[i_derivate - n])
-
-        return df_dxdt
+        on n_value or to be instant. The derivative keeps the dtype of the array to be derived.
+
+        The derivative is computed on all the time steps at once with differences between shifted slices of the array,
+        divided by the differences of the index. The first and last n time steps, for which the window does not fit, are
+        computed as two blocks with the first and last time steps. The derivative is written in the out array if it is
+        given, which must have the shape and dtype of the array to be derived and must not be this array. The values
+        are those of a division of each difference of the array by the difference of the index, the differences of an
+        index made of Python scalars being cast to the dtype of the array."""
+        n_time = array.shape[2]
+        if n_time < 2 * n:
+            raise IndexError(f"The derivative window {n} does not fit in the {n_time} time steps of the array")
+        if out is None:
+            out = np.empty(array.shape, dtype=array.dtype)
+
+        # Differences of the index for the lower edge, the intermediate time steps and the upper edge.
+        index_array = np.asarray(index)
+        index_differences = np.concatenate((index_array[n:2 * n] - index_array[0],
+                                            index_array[2 * n:] - index_array[:n_time - 2 * n],
+                                            index_array[n_time - 1] - index_array[n_time - 2 * n:n_time - n]))
+        # Case of an index of Python scalars, whose differences are cast to the dtype of the array when dividing it.
+        if not isinstance(index, np.ndarray) and all(type(value) in (int, float) for value in index):
+            index_differences = index_differences.astype(np.result_type(array.dtype, 0.0))
+
+        # Case where the time index is too close to the lower limit for the window to fit.
+        np.subtract(array[:, :, n:2 * n], array[:, :, :1], out=out[:, :, :n])
+        # Intermediate case where the n window fits within the neighbourhood of the current time index.
+        np.subtract(array[:, :, 2 * n:], array[:, :, :n_time - 2 * n], out=out[:, :, n:n_time - n])
+        # Case where the time index is too close to the upper limit for the window to fit.
+        np.subtract(array[:, :, n_time - 1:], array[:, :, n_time - 2 * n:n_time - n], out=out[:, :, n_time - n:])
+        np.divide(out, index_differences, out=out, casting="unsafe")
+
+        return out
 
     @staticmethod
     def conversion_specific_arrays_unit_dict_array(dict_array, pattern, suffix_array, ratio):
@@ -415,3 +454,113 @@ class DataPreprocessor:
                 mean_section[i, j] = array_to_mean.mean().round(4)
 
         return mean_section.astype(float)
+
+    @staticmethod
+    def axis_cropping_mask(array, axis, cropping_type, cropping_dict):
+        """Function to crop one axis of a 3D array with a view for fixed edges or a boolean mask for thresholds.
+
+        The cropping methods are the same as those of crop_imbricated_array, applied to all the positions of the other
+        two axes at once. A fixed edge crop gives the same number of values at all positions and is carried out by
+        slicing the axis. The threshold crops give a different number of values at each position. They are represented
+        by a boolean mask of the shape of the array, true for the values kept.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            3D array of data to be cropped.
+
+        axis : int
+            Index of the axis to be cropped.
+
+        cropping_type : str
+            Name of the cropping type to be applied to the axis (‘fixed_edge’, ‘threshold’ or ‘max_ratio_threshold’).
+            Any other name leaves the array uncropped.
+
+        cropping_dict : dict
+            Dictionary of cropping settings. Settings depend on the type of cropping selected.
+
+        Returns
+        ----------
+        cropped_array : np.ndarray
+            Array cropped of its fixed edges or the array given as input.
+
+        mask : np.ndarray or None
+            Boolean mask of the values kept by a threshold crop or None if all the values of the cropped array are kept.
+        """
+        if cropping_type == "fixed_edge":
+            edge_start = cropping_dict.get("edge_start", 0)
+            edge_end = cropping_dict.get("edge_end", 0)
+            return array[(slice(None),) * axis + (slice(edge_start, array.shape[axis] - edge_end),)], None
+
+        elif cropping_type == "threshold":
+            # The threshold is compared to the values converted to float as in threshold_cropping.
+            return array, array >= np.asarray(cropping_dict["threshold"], dtype=float)
+
+        elif cropping_type == "max_ratio_threshold":
+            # Calculation of the dynamic thresholds depending on the maximum of each position of the other two axes.
+            return array, array >= cropping_dict["ratio_threshold"] * array.max(axis=axis, keepdims=True)
+
+        else:
+            return array, None
+
+    @staticmethod
+    def masked_axis_averaging(array, axis, mask=None):
+        """Function for calculating the average section of a 3D array along one axis on the values kept by a mask.
+
+        The values of each position of the other two axes are summed and divided by their number in a single reduction.
+        As with imbricated_arrays_axis_averaging, the average is rounded to 4 decimal places and is not a number at the
+        positions where no values are kept.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            3D array of data to be averaged.
+
+        axis : int
+            Index of the axis to be averaged.
+
+        mask : np.ndarray or None
+            Boolean mask of the values to be averaged. If it is None, all the values are averaged.
+
+        Returns
+        ----------
+        mean_section : np.ndarray
+            2D array corresponding to the average section along the axis.
+        """
+        sum_section = np.sum(array, axis=axis, dtype=float, where=True if mask is None else mask)
+        count_section = array.shape[axis] if mask is None else np.count_nonzero(mask, axis=axis)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sum_section / count_section).round(4)
+
+    @staticmethod
+    def mean_section_computing(array, averaging_axis, cropping_type, cropping_dict):
+        """Function for calculating the average section of a 3D array along a cropped axis.
+
+        The array is cropped with a view or a boolean mask along the axis to be averaged, then averaged on the values
+        kept. The average section is the same as the one obtained with the imbricated arrays, without creating an array
+        for each position of the other two axes.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            3D array of data to be averaged.
+
+        averaging_axis : str
+            Name of the axis to be averaged (‘vertical’, ‘horizontal’ or ‘temporal’).
+
+        cropping_type : str
+            Name of the cropping type to be applied to the axis to be averaged.
+
+        cropping_dict : dict
+            Dictionary of cropping settings. Settings depend on the type of cropping selected.
+
+        Returns
+        ----------
+        mean_section : np.ndarray
+            2D array corresponding to the average section along the axis.
+        """
+        axis = {"vertical": 0, "horizontal": 1, "temporal": 2}[averaging_axis]
+        cropped_array, mask = DataPreprocessor.axis_cropping_mask(array, axis, cropping_type, cropping_dict)
+
+        return DataPreprocessor.masked_axis_averaging(cropped_array, axis, mask)
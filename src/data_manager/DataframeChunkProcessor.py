@@ -21,6 +21,10 @@ class DataframeChunkProcessor:
 
     def get_list_num_measurements(self, path_csv_file):
         columns = pd.read_csv(path_csv_file, nrows=0).columns[1:]
+
+        return self.get_list_num_measurements_from_columns(columns)
+
+    def get_list_num_measurements_from_columns(self, columns):
         list_measurements, list_num = [], []
 
         # Go through column names of the Macular dataframe.
@@ -35,46 +39,71 @@ class DataframeChunkProcessor:
         return list_num, list_measurements
 
     @staticmethod
-    def init_dict_measurements_array(list_measurements):
+    def init_dict_measurements_array(list_measurements, x, y, z, dtype=np.float64):
 
         # Create the measurements list without duplicates
         list_unique_measurements = list(set(list_measurements))
         print(f"Measurements : {list_unique_measurements}")
 
-        # Initialisation of the empty list dictionary of measurements.
-        dict_measurements_array = {measurements: []
+        # Allocation of the array of each measurement once for the whole simulation.
+        print(f"Implementation of array of size {x}x{y}x{z}...", end="")
+        dict_measurements_array = {measurements: np.zeros([x, y, z], dtype=dtype)
                                       for measurements in list_unique_measurements}
 
         return dict_measurements_array
 
     @staticmethod
-    def extend_dict_measurements_array(dict_measurements_array, x, y, z):
-        print(f"Implementation of array of size {x}x{y}x{z}...", end="")
-        for measurements in dict_measurements_array:
-            dict_measurements_array[measurements] += [np.zeros([x, y, z])]
+    def make_scatter_map(list_measurements, list_num, n_cells):
+        """Creation of the map used to scatter the columns of a Macular csv into the arrays of the measurements.
 
-        return dict_measurements_array
+        The map is computed once per csv file. It associates each measurement with the integer arrays of the position
+        of its columns in the csv (without the ‘Time’ column) and of the numpy coordinates of the corresponding cells.
 
-    @staticmethod
-    def fill_dict_measurements_array_chunk(dataframe_chunk, dict_measurements_array, list_measurements,
-                                              list_num, n_cells, i_chunk):
-        print("Filling...", end="")
-        for i, num in enumerate(list_num):
-            # Conversion of the Macular identification number into Macular coordinates
-            macular_coord = CoordinateManager.id_to_coordinates(num, n_cells)
-            # Insert the 3D array of the given measurement and the given cell coordinates in the measurement dictionary.
-            dict_measurements_array[list_measurements[i]][i_chunk][macular_coord["x"], macular_coord["y"]] = (
-                dataframe_chunk.iloc[:, i].to_numpy())
+        The Macular coordinate system differs from the numpy one by a 90° rotation. The numpy coordinates are those of
+        a Macular array of size (n_cells_x, n_cells_y) rotated with np.rot90 on its two first axes, i.e. the row is
+        (n_cells_y - 1 - y) and the column is x. The arrays of the measurements are thus filled directly in their final
+        (n_cells_y, n_cells_x, n_time) orientation.
 
-        return dict_measurements_array
+        Parameters
+        ----------
+        list_measurements : list of str
+            List of the measurements (output_celltype) of each column of the Macular csv.
 
-    @staticmethod
-    def dict_measurements_array_rotation(dict_measurements_array, axes):
-        print("Rotating...", end="")
-        for key in dict_measurements_array:
-            dict_measurements_array[key] = np.rot90(dict_measurements_array[key], axes=axes)
-        print("Done!")
+        list_num : list of int
+            List of the Macular identification numbers of the cells of each column of the Macular csv.
 
-        return dict_measurements_array
+        n_cells : tuple
+            Size of the Macular graph in cells in the form of : (number of cells in x, number of cells in y).
+
+        Returns
+        ----------
+        scatter_map : dict of tuple
+            Dictionary associating each measurement with a tuple of three integer arrays: the positions of the columns,
+            the numpy rows and the numpy columns of the cells.
+        """
+        array_measurements = np.array(list_measurements)
+        dict_coordinates = CoordinateManager.array_id_to_coordinates(list_num, n_cells)
+
+        # Conversion of the Macular coordinates into numpy rows and columns.
+        rows = (n_cells[1] - 1) - dict_coordinates["y"]
+        columns_numpy = dict_coordinates["x"]
+
+        scatter_map = {}
+        for measurement in dict.fromkeys(list_measurements):
+            # Positions of all the columns of the current measurement.
+            columns = np.flatnonzero(array_measurements == measurement)
+            scatter_map[measurement] = (columns, rows[columns], columns_numpy[columns])
 
+        return scatter_map
 
+    @staticmethod
+    def fill_dict_measurements_array_chunk(dataframe_chunk, dict_measurements_array, scatter_map, i_time):
+        print("Filling...", end="")
+        values = dataframe_chunk.to_numpy()
+        for measurement, (columns, rows, columns_numpy) in scatter_map.items():
+            # Insert all the columns of the given measurement at their cell coordinates and at the time offset of the
+            # chunk in a single assignment.
+            dict_measurements_array[measurement][rows, columns_numpy, i_time:i_time + values.shape[0]] = (
+                values[:, columns].T)
+
+        return dict_measurements_array
@@ -1,4 +1,3 @@
-import pickle
 import re
 import copy
 from functools import wraps
@@ -7,10 +6,13 @@ import numpy as np
 import pandas as pd
 from tabulate import tabulate
 
+from src.data_manager.BackgroundSaver import BackgroundSaver
+from src.data_manager.ConflictPolicy import ConflictPolicy
 from src.data_manager.MacularDictArray import MacularDictArray
 from src.data_manager.MetaAnalyser import MetaAnalyser
 from src.data_manager.SpatialAnalyser import SpatialAnalyser
 from src.data_manager.ConditionsAnalyser import ConditionsAnalyser
+from src.data_manager.PybStore import PybStore
 
 
 class MacularAnalysisDataframes:
@@ -390,7 +392,7 @@ class MacularAnalysisDataframes:
         }
     """
 
-    def __init__(self, multi_macular_dict_array, multiple_dicts_analysis):
+    def __init__(self, multi_macular_dict_array, multiple_dicts_analysis, conflict_policy=None, background_save=False):
         """Function for constructing a MacularAnalysisDataframes.
 
         The function begins by extracting the path to the pyb file and removing it from the multiple analysis
@@ -404,7 +406,8 @@ class MacularAnalysisDataframes:
         input to the __init__ function. If there is a difference,between the two dictionaries, it will be up to the user
         to decide whether to keep the pyb loaded from the file or creating a new MacularAnalysisDataframes based on the
         multiple analysis dictionary provided as input. In this case, the MacularAnalysisDataframes will be saved and
-        will therefore replace the existing pyb file.
+        will therefore replace the existing pyb file. For unattended runs, this choice can instead be made by the
+        conflict policy.
 
         In the event that the multiple analysis dictionary provided as input contains only a single key for the path to
         the pyb file, then the MacularAnalysisDataframes will simply be loaded without comparisons. In this context, the
@@ -470,7 +473,19 @@ class MacularAnalysisDataframes:
             are desired, preceded by the prefix ‘all_’. These aliases are substituted within the
             MacularAnalysisDataframes by the getter of the multiple analysis dictionary. Be careful to only group
             together analyses that share the same configurations.
+
+        conflict_policy : str or None
+            Policy used in case of difference between the multiple analysis dictionary of the pyb file and the one given
+            as input (‘interactive’, ‘prefer_file’, ‘prefer_config’, ‘error’ or ‘rebuild_if_stale’). If it is None, the
+            policy is taken from the ‘MACULAR_CONFLICT_POLICY’ environment variable, otherwise the user is asked to
+            choose.
+
+        background_save : bool
+            Save the MacularAnalysisDataframes in its pyb file with a background thread instead of waiting for the end
+            of the writing (False by default). The end of the save can be waited for with BackgroundSaver.wait_saved.
         """
+        conflict_policy = ConflictPolicy.resolving_conflict_policy(conflict_policy)
+
         # Storing of the pyb path.
         path_pyb = multiple_dicts_analysis["path_pyb"]
 
@@ -482,7 +497,8 @@ class MacularAnalysisDataframes:
         multiple_dicts_analysis_copy = self.cleaning_multiple_dicts_features(multiple_dicts_analysis_copy)
 
         # Import a pyb file with the same name or create a new MacularAnalysisDataframes from the dictionary.
-        self.managing_pre_existing_file(path_pyb, multi_macular_dict_array, multiple_dicts_analysis_copy)
+        self.managing_pre_existing_file(path_pyb, multi_macular_dict_array, multiple_dicts_analysis_copy,
+                                        conflict_policy, background_save)
 
     @property
     def dict_paths_pyb(self):
@@ -691,7 +707,7 @@ class MacularAnalysisDataframes:
         print(str_to_display)
         return str_to_display
 
-    def make_from_dictionary(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis):
+    def make_from_dictionary(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis, background_save=False):
         """Creation of a new MacularAnalysisDataframes based on the multiple analysis dictionary and the multiple
         macular dict array provided as input by the user.
 
@@ -712,6 +728,9 @@ class MacularAnalysisDataframes:
         multiple_dicts_analysis : dict of dict
             Dictionaries containing all analyses or meta-analyses to be performed for each dimension of the
             MacularAnalysisDataframes, in a condensed format.
+
+        background_save : bool
+            Save the MacularAnalysisDataframes with a background thread (False by default).
         """
         # Initialisation of the pyb path dictionary with that of MacularAnalysisDataframes.
         self._dict_paths_pyb = {"self": path_pyb, "MacularDictArrays": {}}
@@ -732,7 +751,7 @@ class MacularAnalysisDataframes:
         self.make_meta_analysis_dataframes_analysis(dict_index)
 
         # Saving the MacularAnalysisDataframes.
-        self.save()
+        self.save(background_save)
 
     def update_from_file(self, path_pyb):
         """Method for updating a MacularAnalysisDataframes object by replacing it with another MacularAnalysisDataframes
@@ -747,13 +766,13 @@ class MacularAnalysisDataframes:
 
         """
         print("FILE UPDATING...", end="")
-        with open(path_pyb, "rb") as pyb_file:
-            tmp_dict = pickle.load(pyb_file).__dict__
+        tmp_dict = PybStore.load_file(path_pyb).__dict__
         self.__dict__.clear()
         self.__dict__.update(tmp_dict)
         print("UPDATED!")
 
-    def managing_pre_existing_file(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis):
+    def managing_pre_existing_file(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis,
+                                   conflict_policy="interactive", background_save=False):
         """Manages whether a pyb file corresponding to the path of the pyb file provided by the user exists.
 
         If the pyb file exists, it is imported into the MacularAnalysisDataframes as a priority to save time and avoid
@@ -773,27 +792,51 @@ class MacularAnalysisDataframes:
         multiple_dicts_analysis : dict of dict
             Dictionaries containing all analyses or meta-analyses to be performed for each dimension of the
             MacularAnalysisDataframes, in a condensed format.
+
+        conflict_policy : str
+            Policy used in case of difference between the multiple analysis dictionary of the pyb file and the one given
+            as input.
+
+        background_save : bool
+            Save a new MacularAnalysisDataframes with a background thread (False by default).
         """
+        # Waiting for the end of the background saves of the pyb file before reading it.
+        BackgroundSaver.wait_saved(path_pyb)
+
         try:
-            # Update MacularAnalysisDataframes from an existing file if possible.
-            self.update_from_file(path_pyb)
+            # Update MacularAnalysisDataframes from the header of an existing file if possible, without its dataframes.
+            header = PybStore.read_header(path_pyb)
+            if header is None:
+                self.update_from_file(path_pyb)
+            else:
+                self.__dict__.clear()
+                self.__dict__.update(header["attributes"])
+                self._dict_analysis_dataframes = None
 
             # The comparison with json occurs if the multiple analysis dictionary does not contain only the pyb path.
             if len(multiple_dicts_analysis.keys()) != 0:
-                self.checking_difference_file_json(path_pyb, multi_macular_dict_array, multiple_dicts_analysis)
+                self.checking_difference_file_json(path_pyb, multi_macular_dict_array, multiple_dicts_analysis,
+                                                   conflict_policy, background_save)
+
+            # Reading of the dataframes of the existing file if the json has not been kept.
+            if self._dict_analysis_dataframes is None:
+                self.update_from_file(path_pyb)
 
         except (FileNotFoundError, EOFError):
             # Construction of a MacularAnalysisDataframes from the dictionaries if no file exists.
             print("NO FILE FOR THE UPDATE. Using the dictionaries.")
-            self.make_from_dictionary(path_pyb, multi_macular_dict_array, multiple_dicts_analysis)
+            self.make_from_dictionary(path_pyb, multi_macular_dict_array, multiple_dicts_analysis, background_save)
 
-    def checking_difference_file_json(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis):
+    def checking_difference_file_json(self, path_pyb, multi_macular_dict_array, multiple_dicts_analysis,
+                                      conflict_policy="interactive", background_save=False):
         """Comparison between the multiple analysis dictionary contained in the imported pyb and that specified in the
         init function of MacularDictArray.
 
         The verification is carried out on the elements of the multiple analysis dictionaries. In case of a difference
-        between the two, it is up to the user to choose between the dictionaries contained in the pyb or the one entered
-        as input for the init function.
+        between the two, the conflict policy chooses between the dictionaries contained in the pyb or the one entered
+        as input for the init function. By default, it is up to the user to choose. With the ‘rebuild_if_stale’ policy,
+        the MacularAnalysisDataframes is also rebuilt if the csv file of one of its MacularDictArray has been modified
+        after its pyb file.
 
         Parameters
         ----------
@@ -808,18 +851,30 @@ class MacularAnalysisDataframes:
             Dictionaries containing all analyses or meta-analyses to be performed for each dimension of the
             MacularAnalysisDataframes, in a condensed format.
 
+        conflict_policy : str
+            Policy used in case of difference between the multiple analysis dictionary of the pyb file and the one given
+            as input (‘interactive’, ‘prefer_file’, ‘prefer_config’, ‘error’ or ‘rebuild_if_stale’).
+
+        background_save : bool
+            Save a new MacularAnalysisDataframes with a background thread (False by default).
+
         Raises
         ----------
         ValueError
-            The value error is raised in the event of an incorrect response from the user.
+            The value error is raised in the event of an incorrect response from the user or of a difference with the
+            ‘error’ policy.
         """
+        # Checking whether the csv file of a MacularDictArray has been modified after the pyb file.
+        is_stale = conflict_policy == "rebuild_if_stale" and ConflictPolicy.is_stale(
+            path_pyb, [macular_dict_array.path_csv for macular_dict_array in multi_macular_dict_array.values()])
+
         # Checking difference between both multiple analysis dictionary.
-        if self._multiple_dicts_analysis != multiple_dicts_analysis:
+        if self._multiple_dicts_analysis != multiple_dicts_analysis or is_stale:
             print("Multiple analysis dictionary differ...")
-            user_choice = input("Which configuration should be kept ? json or pyb : ").lower()
+            user_choice = ConflictPolicy.choosing_configuration(conflict_policy, is_stale)
             # Conservation of the json file.
             if user_choice == "json":
-                self.make_from_dictionary(path_pyb, multi_macular_dict_array, multiple_dicts_analysis)
+                self.make_from_dictionary(path_pyb, multi_macular_dict_array, multiple_dicts_analysis, background_save)
             # Conservation of the pyb file.
             elif user_choice == "pyb":
                 pass
@@ -945,18 +1000,34 @@ class MacularAnalysisDataframes:
             The path can be absolute or relative.
         """
         print("FILE LOADING...", end="")
-        with open(path_pyb, "rb") as pyb_file:
-            macular_analysis_dataframe = pickle.load(pyb_file)
+        BackgroundSaver.wait_saved(path_pyb)
+        macular_analysis_dataframe = PybStore.load_file(path_pyb)
         print("LOADED!")
 
         return macular_analysis_dataframe
 
-    def save(self):
+    def save(self, background_save=False):
         """Saving the MacularAnalysisDataframes in a pyb (python binary) file whose path and name correspond to that
         present in the attribute of the analysis dictionary.
+
+        The pyb file ends with a header containing the MacularAnalysisDataframes without its dataframes, so that it can
+        be compared to the multiple analysis dictionary without reading the dataframes. If the path has the ‘.pyb5’
+        extension, the buffers of the dataframes are written out-of-band and mapped on the file when it is loaded. The
+        pyb file is written in a temporary file renamed at the end of the writing, so that an interrupted save never
+        leaves a truncated pyb file. A save waits for the end of the background saves of the pyb file before writing it.
+
+        Parameters
+        ----------
+        background_save : bool
+            Save the MacularAnalysisDataframes with a background thread and return without waiting for the end of the
+            writing (False by default). The end of the save can be waited for with BackgroundSaver.wait_saved.
         """
-        with open(f"{self.dict_paths_pyb['self']}", "wb") as pyb_file:
-            pickle.dump(self, pyb_file)
+        if background_save:
+            BackgroundSaver.submit(self.dict_paths_pyb['self'], MacularAnalysisDataframes.save, self)
+        else:
+            # Waiting for the end of the background saves of the pyb file before writing it.
+            BackgroundSaver.wait_saved(self.dict_paths_pyb['self'])
+            PybStore.dump(self, self.dict_paths_pyb['self'], ("_dict_analysis_dataframes",))
 
     def initialize_macular_analysis_dataframes(self, multi_macular_dict_array, multiple_dicts_analysis):
         """Function to initialise a MacularAnalysisDataframes.
@@ -0,0 +1,123 @@
+import pandas as pd
+
+from src.data_manager.DataframeChunkProcessor import DataframeChunkProcessor
+
+
+class MacularCsvHeader:
+    """Schema of the header of a Macular csv.
+
+    The header of the csv is read and parsed only once per file. The MacularCsvHeader then gathers everything needed to
+    process each chunk of the csv: the names of the columns, the measurement (output_celltype) and the Macular
+    identification number of the cell of each column, and the map used to scatter the columns into the arrays of the
+    measurements.
+
+    The header can be projected on a subset of the measurements of the csv. Only the columns of these measurements are
+    then read from the csv (usecols) and scattered into the arrays of the measurements.
+
+    Attributes
+    ----------
+    path_csv : str
+        The path of the csv file containing the Macular simulation data whose header is parsed.
+
+    n_cells : tuple
+        Size of the Macular graph in cells in the form of : (number of cells in x, number of cells in y).
+
+    columns : list of str
+        Names of all the columns of the csv, including the ‘Time’ column.
+
+    usecols : list of str
+        Names of the columns of the csv to be read, including the ‘Time’ column, in the order of the csv.
+
+    list_num : list of int
+        Macular identification numbers of the cells of each data column to be read.
+
+    list_measurements : list of str
+        Measurements (output_celltype) of each data column to be read.
+
+    measurements : list of str
+        Measurements present in the csv without duplicates, in the order of their first column.
+
+    scatter_map : dict of tuple
+        Dictionary associating each measurement with the integer arrays of the positions of its columns and of the
+        numpy rows and columns of its cells. The positions of the columns are those of the columns to be read.
+    """
+
+    def __init__(self, path_csv, n_cells, measurements=None):
+        """Init function to parse the header of a Macular csv.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file containing the Macular simulation data.
+
+        n_cells : tuple
+            Size of the Macular graph in cells in the form of : (number of cells in x, number of cells in y).
+
+        measurements : list of str or None
+            Measurements (output_celltype) to be read from the csv. All the measurements are read if it is None.
+
+        Raises
+        ----------
+        ValueError
+            The value error is raised if one of the measurements to be read is absent from the csv.
+        """
+        self._path_csv = path_csv
+        self._n_cells = n_cells
+        self._columns = pd.read_csv(path_csv, nrows=0).columns.tolist()
+
+        # Extraction of the measurement and cell of each data column.
+        list_num, list_measurements = (
+            DataframeChunkProcessor().get_list_num_measurements_from_columns(self._columns[1:]))
+
+        # Projection of the data columns on the measurements to be read.
+        if measurements is None:
+            list_kept = list(range(len(list_measurements)))
+        else:
+            missing_measurements = [measurement for measurement in measurements if measurement not in list_measurements]
+            if missing_measurements:
+                raise ValueError(f"Measurements {missing_measurements} absent from the csv.")
+            list_kept = [i for i, measurement in enumerate(list_measurements) if measurement in measurements]
+        self._usecols = [self._columns[0]] + [self._columns[i + 1] for i in list_kept]
+        self._list_num = [list_num[i] for i in list_kept]
+        self._list_measurements = [list_measurements[i] for i in list_kept]
+        self._scatter_map = DataframeChunkProcessor.make_scatter_map(self._list_measurements, self._list_num, n_cells)
+
+    @property
+    def path_csv(self):
+        """Getter for the path_csv attribute."""
+        return self._path_csv
+
+    @property
+    def n_cells(self):
+        """Getter for the n_cells attribute."""
+        return self._n_cells
+
+    @property
+    def columns(self):
+        """Getter for the columns attribute."""
+        return self._columns
+
+    @property
+    def usecols(self):
+        """Getter for the usecols attribute."""
+        return self._usecols
+
+    @property
+    def list_num(self):
+        """Getter for the list_num attribute."""
+        return self._list_num
+
+    @property
+    def list_measurements(self):
+        """Getter for the list_measurements attribute."""
+        return self._list_measurements
+
+    @property
+    def measurements(self):
+        """Getter for the measurements attribute."""
+        return list(self._scatter_map)
+
+    @property
+    def scatter_map(self):
+        """Getter for the scatter_map attribute."""
+        return self._scatter_map
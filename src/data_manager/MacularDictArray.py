@@ -1,15 +1,21 @@
 import os.path
-import pickle
 import copy
 import re
 
 import numpy as np
 import pandas as pd
+from pandas.io.common import get_handle
 
+from src.data_manager.BackgroundSaver import BackgroundSaver
+from src.data_manager.ConflictPolicy import ConflictPolicy
 from src.data_manager.CoordinateManager import CoordinateManager
 from src.data_manager.DataPreprocessor import DataPreprocessor
 from src.data_manager.DataframeHelpers import DataframeHelpers
 from src.data_manager.DataframeChunkProcessor import DataframeChunkProcessor
+from src.data_manager.MacularCsvHeader import MacularCsvHeader
+from src.data_manager.ParallelCsvParser import ParallelCsvParser
+from src.data_manager.PreprocessingCache import PreprocessingCache
+from src.data_manager.PybStore import PybStore
 
 
 class MacularDictArray:
@@ -18,8 +24,8 @@ class MacularDictArray:
     The creation of a MacularDictArray requires the presence of a csv file containing the measurements of a Macular
     simulation. It also requires knowledge of some of the parameters of the Macular simulation. The measurements
     contained in the csv are parsed into a numpy arrays and separated by pair of output and cell type.
-    These measurements also undergo a rotation to correct the difference in rotation between Macular and numpy. The
-    temporal index is also accessed and stored.
+    These measurements are placed directly at their numpy coordinates to correct the difference in rotation between
+    Macular and numpy. The temporal index is also accessed and stored.
 
     Then, the data stored in the MacularDictArray undergoes a series of transformations determined by the
     preprocessing dictionary. The transformations include centering the data on the center of the cell receptor fields,
@@ -27,14 +33,22 @@ class MacularDictArray:
     managed by the DataPreprocessor class.
 
     Once the MacularDictArray has been created and transformed, the object is saved in a binary form. The location and
-    name of the file is the same as that of the ‘.csv’ but with a ‘.pyb’ extension instead. The purpose of this PYB file
-    is to speed up subsequent imports.
+    name of the file is the same as that of the ‘.csv’ but with a ‘.pyb’ extension instead of the ‘.csv’ and compression
+    extensions. The purpose of this PYB file is to speed up subsequent imports.
+
+    If the ‘MACULAR_CACHE_DIR’ environment variable is defined, the MacularDictArray is instead searched for in a
+    preprocessing cache identified by the csv and by the simulation and preprocessing dictionaries. Several
+    preprocessing variants of the same simulation can then be reused without conflict on the pyb file. The raw data and
+    index extracted from the csv are also kept in the cache, so that a change of preprocessing never re-parses the csv.
+    The maximum size of the cache in bytes can be given by the ‘MACULAR_CACHE_MAX_BYTES’ environment variable.
 
     When attempting to create a MacularDictArray for which the .pyb file already exists, it is the pyb file that
     will be imported instead of the csv. During this import, a comparison is made between the simulation and
     preprocessing dictionaries of the MacularDictArray saved in the pyb and those given as inputs to the initialisation
     function of the MaculaDictArray. In case of a difference, it is up to the user to decide which of the two to
-    prioritise. Please note that it will also be up to the user to save the new MacularDictArray.
+    prioritise. Please note that it will also be up to the user to save the new MacularDictArray. For unattended runs,
+    the choice can instead be made by a conflict policy given to the init function or by the ‘MACULAR_CONFLICT_POLICY’
+    environment variable (see ConflictPolicy).
 
     The name of the csv file used to create a MacularDictArray can be a unique identifier that respects the following
     recommended nomenclature :
@@ -109,7 +123,8 @@ class MacularDictArray:
         - ‘spatial_x’ in degrees (default key) which is the indexes for the x-axis.
         - ‘spatial_y’ in degrees (default key) which is the indexes for the y-axis.
         - 'temporal_centered' (optional) for centered time indexes where the response of each cell is centered on the
-        moment of arrival of the bar in the center of their receptor field.
+        moment of arrival of the bar in the center of their receptor field. It is a CenteredTemporalIndex computing the
+        index of each cell only when it is accessed.
         - ‘spatial_x_centered’ in degrees (default key) which is the indexes for the x-axis centered on the middle cell
         of the x-axis of the grid cell.
         - ‘spatial_y_centered’ in degrees (default key) which is the indexes for the y-axis  centered on the middle cell
@@ -132,7 +147,7 @@ class MacularDictArray:
         the name of the simulation follow the recommended nomenclature.
     """
 
-    def __init__(self, dict_simulation, dict_preprocessing):
+    def __init__(self, dict_simulation, dict_preprocessing, conflict_policy=None, background_save=False):
         """Init function to make a MacularDictArray object.
 
         Note the presence of a check to determine whether or not a pyb file exists, in order to import it as a priority,
@@ -146,7 +161,9 @@ class MacularDictArray:
             MacularDictArray.
 
             The mandatory parameters are:
-            - path_csv : The path of the csv file containing the Macular simulation data to be accessed.
+            - path_csv : The path of the csv file containing the Macular simulation data to be accessed. The csv can be
+            compressed (‘.csv.gz’, ‘.csv.bz2’, ‘.csv.xz’, ‘.csv.zip’ or ‘.csv.zst’), it is then decompressed on the fly
+            while being read.
             - n_cells_x: Number of cells on the x-axis of the Macular graph used.
             - n_cells_y: Number of cells on the y-axis of the Macular graph used.
             - dx: Distance between Macular cells in degrees.
@@ -156,12 +173,23 @@ class MacularDictArray:
 
             The optional parameters are:
             - path_pyb : Path to file with .pyb (python binary) extension where to save the MacularDictArray object in a
-            binary file.
+            binary file. With the .pybd extension, the MacularDictArray is saved in a directory with one memory-mappable
+            file per array of data and index. With the .pyb5 extension, the MacularDictArray is pickled with the
+            protocol 5 and its arrays are mapped on the file when it is loaded, without copying them.
             - speed: Speed of the moving object in degrees/s if you want to use temporal centering.
             - size_bar: Size of the bar if you want to use temporal centering.
             - transient: Duration at the start of the simulation to be removed, it can be in number of frames or in
             seconds.
             - axis: Axis of the object's movement ("horizontal" or "vertical") if there is one.
+            - measurements: List of the measurements (output_celltype) to be read from the csv. The other columns of the
+            csv are not parsed. All the measurements are read by default.
+            - dtype: Type of the arrays of the measurements, kept by all the preprocessing ("float64" by default). For
+            example, "float32" halves the memory and the size of the pyb file.
+            - n_workers: Number of worker processes parsing the csv in parallel (1 by default).
+            - skip_transient_rows: Skip the rows of the transient deduced from delta_t without parsing them (True by
+            default).
+            - compression: Codec (‘zlib’ or ‘lzma’) of the measurement arrays of a pyb store, saved compressed by blocks
+            of time steps and only decompressed when they are accessed. The arrays are saved uncompressed by default.
 
             Note : It is possible to enter a simulation dictionary containing only the optional parameter ‘path_pyb’
             in order to import the pre-existing pyb file without having to specify all the parameter values. In this
@@ -180,7 +208,8 @@ class MacularDictArray:
             - ‘binning’ to average the data of the measurements over a time interval that is entered as
             the value associated with the key.
             - ‘VSDI’ to calculate the voltage sensitive dye imaging signal of the cortex. Two possible values: True and
-            False.
+            False. The value can also be a dictionary with the ‘excitatory’ and ‘inhibitory’ keys giving the weights of
+            the two populations in the VSDI (0.8 and 0.2 by default).
             - ‘derivative’ to calculate the derivative of the measurements. It is possible to add an integer value
             to integrate over a larger interval. Otherwise, an instantaneous derivative will be obtained. The
             ‘derivative’ key is associated with a dictionary that must contain the measurements to be processed as keys
@@ -194,7 +223,17 @@ class MacularDictArray:
             convert degrees in millimetres of retina.
             - 'spatial_index_mm_cortex' to add a spatial index expressed in mm for cortex. The value is the ratio to
             convert degrees in millimetres of cortex.
+
+        conflict_policy : str or None
+            Policy used in case of difference between the dictionaries of the pyb file and those given as input
+            (‘interactive’, ‘prefer_file’, ‘prefer_config’, ‘error’ or ‘rebuild_if_stale’). If it is None, the policy
+            is taken from the ‘MACULAR_CONFLICT_POLICY’ environment variable, otherwise the user is asked to choose.
+
+        background_save : bool
+            Save the MacularDictArray in its pyb file with a background thread instead of waiting for the end of the
+            writing (False by default). The end of the save can be waited for with BackgroundSaver.wait_saved.
         """
+        conflict_policy = ConflictPolicy.resolving_conflict_policy(conflict_policy)
         self._transient_reg = re.compile(".*/[A-Za-z]{1,2}_[A-Za-z]{1,3}_[A-Za-z]{6}[0-9]{4}_.*_([0-9]{0,4}f?)")
 
         dict_simulation_copy = dict_simulation.copy()
@@ -203,11 +242,19 @@ class MacularDictArray:
 
 
         if "path_pyb" not in dict_simulation_copy:
-            dict_simulation_copy["path_pyb"] = dict_simulation_copy["path_csv"].replace("csv", "pyb")
+            dict_simulation_copy["path_pyb"] = self.path_csv_to_path_pyb(dict_simulation_copy["path_csv"])
         print(f"\n{dict_simulation_copy['path_pyb']}")
 
-        self.managing_pre_existing_file(dict_simulation_copy, dict_preprocessing_copy)
-        self.save()
+        # Use of the preprocessing cache if it is enabled and if the configuration is complete.
+        preprocessing_cache = PreprocessingCache.from_environment()
+        if preprocessing_cache is not None and "path_csv" in dict_simulation_copy:
+            self.managing_preprocessing_cache(preprocessing_cache, dict_simulation_copy, dict_preprocessing_copy)
+            # The pyb file is not written again if it already contains the MacularDictArray.
+            if not self.is_pyb_file_current():
+                self.save(background_save)
+        else:
+            self.managing_pre_existing_file(dict_simulation_copy, dict_preprocessing_copy, conflict_policy)
+            self.save(background_save)
 
     @property
     def path_csv(self):
@@ -256,8 +303,7 @@ class MacularDictArray:
 
         The modification of dict_simulation leads to a recomputation of the data and index attributes.
         """
-        self.update_from_simulation_dict(dict_simulation)
-        self.update_from_preprocessing_dict(self.dict_preprocessing)
+        self.update_from_dicts(dict_simulation, self.dict_preprocessing)
 
     @property
     def dict_preprocessing(self):
@@ -274,8 +320,7 @@ class MacularDictArray:
         dict_simulation_with_path["path_csv"] = self._path_csv
         dict_simulation_with_path["path_pyb"] = self._path_pyb
 
-        self.update_from_simulation_dict(dict_simulation_with_path)
-        self.update_from_preprocessing_dict(dict_preprocessing)
+        self.update_from_dicts(dict_simulation_with_path, dict_preprocessing)
 
     @property
     def data(self):
@@ -323,6 +368,80 @@ class MacularDictArray:
         """Setter for the transient_reg attribute."""
         self._transient_reg = transient_reg
 
+    @staticmethod
+    def compression_extension(path_csv):
+        """Function to get the extension of the compression of a Macular csv.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file containing the Macular simulation data.
+
+        Returns
+        ----------
+        extension : str
+            Extension of the compression of the csv (‘.gz’, ‘.bz2’, ‘.xz’, ‘.zip’ or ‘.zst’) or an empty string if the
+            csv is not compressed.
+        """
+        extension = os.path.splitext(path_csv)[1]
+        if extension in (".gz", ".bz2", ".xz", ".zip", ".zst"):
+            return extension
+
+        return ""
+
+    @staticmethod
+    def path_csv_to_path_pyb(path_csv):
+        """Function to deduce the default path of the pyb file from the path of the Macular csv.
+
+        The extensions of the csv and of its compression, if there is one, are replaced by the ‘.pyb’ extension.
+
+        Example :
+        "/user/jemonet/example/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv.gz" gives
+        "/user/jemonet/example/RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb"
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file containing the Macular simulation data.
+
+        Returns
+        ----------
+        path_pyb : str
+            Path of the pyb file in the same folder and with the same name as the csv.
+        """
+        path_csv = path_csv[:len(path_csv) - len(MacularDictArray.compression_extension(path_csv))]
+
+        return f"{os.path.splitext(path_csv)[0]}.pyb"
+
+    def __reduce_ex__(self, protocol):
+        """Reduction of the MacularDictArray used by pickle.
+
+        From the protocol 5, the memory-maps of data and index are reduced as numpy arrays sharing their buffer. Numpy
+        only pickles the buffers of base arrays out-of-band, so that the buffers of the memory-maps are not copied in
+        the pickle either.
+
+        Parameters
+        ----------
+        protocol : int
+            Version of the pickle protocol.
+
+        Returns
+        ----------
+        reduce_value : tuple
+            Returns the callable, its arguments and the state used to reconstruct the MacularDictArray.
+        """
+        reduce_value = super().__reduce_ex__(protocol)
+        if protocol < 5:
+            return reduce_value
+
+        state = reduce_value[2].copy()
+        for name_dict in ("_data", "_index"):
+            if isinstance(state.get(name_dict), dict):
+                state[name_dict] = {name_array: array.view(np.ndarray) if isinstance(array, np.memmap) else array
+                                    for name_array, array in state[name_dict].items()}
+
+        return reduce_value[:2] + (state,) + reduce_value[3:]
+
     def __repr__(self):
         """Function to display a MacularDictArray.
 
@@ -448,13 +567,16 @@ class MacularDictArray:
 
         return dict_preprocessing_cleaned
 
-    def managing_pre_existing_file(self, dict_simulation, dict_preprocessing):
+    def managing_pre_existing_file(self, dict_simulation, dict_preprocessing, conflict_policy="interactive"):
         """Managing that a pyb file corresponding to the file path in the
         simulation dictionary already exists.
 
         If the pyb file exists, it is imported into the MacularDictArray as a priority to save time and avoid
         additional processing of the csv. If it does not exist, the csv file is processed and saved in a pyb.
 
+        The comparison between the pyb file and the dictionaries is made from the header of the pyb file only. The data
+        and index of the pyb file are read only if they are kept.
+
         Parameters
         ----------
         dict_simulation : dict
@@ -463,28 +585,114 @@ class MacularDictArray:
 
         dict_preprocessing : dict
             Dictionary for configuring the various processes to be implemented on the simulation data.
+
+        conflict_policy : str
+            Policy used in case of difference between the dictionaries of the pyb file and those given as input.
         """
+        # Waiting for the end of the background saves of the pyb file before reading it.
+        BackgroundSaver.wait_saved(dict_simulation['path_pyb'])
+
         try:
-            # Update MacularDictArray from an existing file if possible.
-            self.update_from_file(dict_simulation['path_pyb'])
+            # Update MacularDictArray from the header of an existing file if possible, without its data and index.
+            header = PybStore.read_header(dict_simulation['path_pyb'])
+            if header is None:
+                self.update_from_file(dict_simulation['path_pyb'])
+            else:
+                self.__dict__.clear()
+                self.__dict__.update(header["attributes"])
+                self._data, self._index = None, None
 
             # The comparison with json only occurs if the simulation dictionary does not contain only the pyb path.
             if len(dict_simulation.keys()) > 1:
-                self.checking_difference_file_json(dict_simulation, dict_preprocessing)
+                self.checking_difference_file_json(dict_simulation, dict_preprocessing, conflict_policy)
+
+            # Reading of the data and index of the existing file if the json has not been kept.
+            if self._data is None:
+                self.update_from_file(dict_simulation['path_pyb'])
 
         except (FileNotFoundError, EOFError):
             # Construction of a MacularDictArray from the dictionaries if no file exists.
             print("NO FILE FOR THE UPDATE. Using the dictionaries.")
-            self.update_from_simulation_dict(dict_simulation)
-            self.update_from_preprocessing_dict(dict_preprocessing)
+            self.update_from_dicts(dict_simulation, dict_preprocessing)
+
+    def managing_preprocessing_cache(self, preprocessing_cache, dict_simulation, dict_preprocessing):
+        """Managing the reuse of a MacularDictArray stored in the preprocessing cache.
+
+        The entry of the cache is found from the csv and from the simulation and preprocessing dictionaries, regardless
+        of the path of the pyb file. It is a manifest containing the MacularDictArray without its data and index, which
+        are stored in the entries of the raw data and of the processes chained from these dictionaries. If there is an
+        entry, it is imported into the MacularDictArray with the paths of the simulation dictionary and the arrays are
+        imported from the entries of the raw data and of the processes. Otherwise, the csv file is processed and the
+        manifest is stored in the cache.
+
+        Parameters
+        ----------
+        preprocessing_cache : PreprocessingCache
+            Content-addressed cache of the preprocessed MacularDictArray.
+
+        dict_simulation : dict
+            Dictionary containing all the parameters of the Macular simulations necessary for the processing of the
+            MacularDictArray.
+
+        dict_preprocessing : dict
+            Dictionary for configuring the various processes to be implemented on the simulation data.
+        """
+        key = preprocessing_cache.make_key(dict_simulation["path_csv"], dict_simulation, dict_preprocessing)
+        macular_dict_array = preprocessing_cache.get(MacularDictArray, key)
+
+        # Update MacularDictArray from the manifest of the cache and from the entries of its arrays if possible.
+        if macular_dict_array is not None:
+            print("CACHE HIT.")
+            self.__dict__.clear()
+            self.__dict__.update(macular_dict_array.__dict__)
+            self._path_csv, self._path_pyb = dict_simulation["path_csv"], dict_simulation["path_pyb"]
+            self.managing_raw_cache(preprocessing_cache)
+            self.setup_data_dict_array_preprocessing()
+
+        # Construction of a MacularDictArray from the dictionaries and storage of its manifest in the cache.
+        else:
+            print("CACHE MISS. Using the dictionaries.")
+            self.update_from_dicts(dict_simulation, dict_preprocessing)
+            macular_dict_array = MacularDictArray.__new__(MacularDictArray)
+            macular_dict_array.__dict__.update(self.__dict__)
+            macular_dict_array._data, macular_dict_array._index = {}, {}
+            preprocessing_cache.put(key, macular_dict_array)
+
+    def is_pyb_file_current(self):
+        """Function to determine whether the pyb file of the MacularDictArray already contains it.
+
+        The pyb file is current if its header has the same csv path and the same simulation and preprocessing
+        dictionaries as the MacularDictArray, and if the csv file has not been modified after it.
+
+        Returns
+        ----------
+        is_current : bool
+            Returns True if the pyb file does not need to be written again.
+        """
+        # Waiting for the end of the background saves of the pyb file before reading it.
+        BackgroundSaver.wait_saved(self.path_pyb)
+
+        try:
+            header = PybStore.read_header(self.path_pyb)
+        except (FileNotFoundError, EOFError):
+            return False
+        if header is None:
+            return False
+
+        return (header["attributes"].get("_path_csv") == self._path_csv and
+                header["attributes"].get("_dict_simulation") == self.dict_simulation and
+                header["attributes"].get("_dict_preprocessing") == self.dict_preprocessing and
+                not ConflictPolicy.is_stale(self.path_pyb, [self.path_csv]))
 
-    def checking_difference_file_json(self, dict_simulation, dict_preprocessing):
+    def checking_difference_file_json(self, dict_simulation, dict_preprocessing, conflict_policy="interactive"):
         """Comparison between the simulation and preprocessing dictionary contained in the imported pyb and that
         specified in the init function of MacularDictArray.
 
         The verification is carried out on the elements of the simulation and processing dictionaries, but also on
-        the path of the csv file. In case of a difference between the two, it is up to the user to choose between the
-        dictionaries contained in the pyb or the one entered as input for the init function.
+        the path of the csv file. In case of a difference between the two, the conflict policy chooses between the
+        dictionaries contained in the pyb or the one entered as input for the init function. By default, it is up to
+        the user to choose. With the ‘rebuild_if_stale’ policy, the MacularDictArray is also rebuilt from the
+        dictionaries if the csv file has been modified after the pyb file.
 
         Parameters
         ----------
@@ -495,25 +703,33 @@ class MacularDictArray:
         dict_preprocessing : dict
             Dictionary for configuring the various processes to be implemented on the simulation data.
 
+        conflict_policy : str
+            Policy used in case of difference between the dictionaries of the pyb file and those given as input
+            (‘interactive’, ‘prefer_file’, ‘prefer_config’, ‘error’ or ‘rebuild_if_stale’).
+
         Raises
         ----------
         ValueError
-            The value error is raised in the event of an incorrect response from the user.
+            The value error is raised in the event of an incorrect response from the user or of a difference with the
+            ‘error’ policy.
         """
         # Removal of the remaining path_data parameter
         dict_simulation_no_path = dict_simulation.copy()
         del dict_simulation_no_path["path_csv"]
         del dict_simulation_no_path["path_pyb"]
 
+        # Checking whether the csv file has been modified after the pyb file.
+        is_stale = conflict_policy == "rebuild_if_stale" and ConflictPolicy.is_stale(dict_simulation["path_pyb"],
+                                                                                     [dict_simulation["path_csv"]])
+
         # Checking difference between each dictionary and path_csv
         if (self.dict_simulation != dict_simulation_no_path or self.dict_preprocessing != dict_preprocessing
-                or self._path_csv != dict_simulation["path_csv"]):
+                or self._path_csv != dict_simulation["path_csv"] or is_stale):
             print("Simulation and/or Preprocessing dictionary differ...")
-            user_choice = input("Which configuration should be kept ? json or pyb : ").lower()
+            user_choice = ConflictPolicy.choosing_configuration(conflict_policy, is_stale)
             # Conservation of the json file.
             if user_choice == "json":
-                self.update_from_simulation_dict(dict_simulation)
-                self.update_from_preprocessing_dict(dict_preprocessing)
+                self.update_from_dicts(dict_simulation, dict_preprocessing)
             # Conservation of the pyb file.
             elif user_choice == "pyb":
                 pass
@@ -524,7 +740,33 @@ class MacularDictArray:
             return 1
         return 0
 
-    def update_from_simulation_dict(self, dict_simulation):
+    def update_from_dicts(self, dict_simulation, dict_preprocessing):
+        """Updating the MacularDictArray from a simulation dictionary and a preprocessing dictionary.
+
+        If the preprocessing dictionary contains a binning, it is carried out during the extraction of the data from the
+        csv, so that only the binned arrays of the measurements are allocated. The binning is otherwise carried out with
+        the other processes when the preprocessing cache is enabled, because the raw data it stores are not binned, and
+        when the csv is parsed in parallel.
+
+        Parameters
+        ----------
+        dict_simulation : dict
+            Dictionary containing all the parameters of the Macular simulations necessary for the processing of the
+            MacularDictArray.
+
+        dict_preprocessing : dict
+            Dictionary for configuring the various processes to be implemented on the simulation data.
+        """
+        bin_time = dict_preprocessing.get("binning")
+        if (PreprocessingCache.from_environment() is not None or
+                (dict_simulation.get("n_workers", 1) > 1 and
+                 not self.compression_extension(dict_simulation["path_csv"]))):
+            bin_time = None
+
+        self.update_from_simulation_dict(dict_simulation, bin_time)
+        self.update_from_preprocessing_dict(dict_preprocessing, binned=bool(bin_time))
+
+    def update_from_simulation_dict(self, dict_simulation, bin_time=None):
         """Updating the MacularDictArray from a simulation dictionary (dict_simulation).
 
         The update concerns the value of the attributes dict_simulation, simulation_id, data and index.
@@ -534,6 +776,10 @@ class MacularDictArray:
         dict_simulation : dict
             Dictionary containing all the parameters of the Macular simulations necessary for the processing of the
             MacularDictArray.
+
+        bin_time : float or None
+            Binning interval in seconds applied to the data and temporal index during their extraction from the csv. No
+            binning is carried out if it is None. It is ignored if the preprocessing cache is enabled.
         """
         self._path_pyb = dict_simulation["path_pyb"]
         self._path_csv = dict_simulation["path_csv"]
@@ -541,9 +787,44 @@ class MacularDictArray:
         del self._dict_simulation["path_pyb"]
         del self._dict_simulation["path_csv"]
         self._data, self._index = {}, {"temporal": [], "spatial_x": np.array([]), "spatial_y": np.array([])}
-        self.setup_data_index_dict_array()
 
-    def update_from_preprocessing_dict(self, dict_preprocessing):
+        # Use of the raw data and index of the preprocessing cache if it is enabled.
+        preprocessing_cache = PreprocessingCache.from_environment()
+        if preprocessing_cache is not None:
+            self.managing_raw_cache(preprocessing_cache)
+        else:
+            self.setup_data_index_dict_array(bin_time)
+
+    def managing_raw_cache(self, preprocessing_cache):
+        """Managing the reuse of the raw data and index of a MacularDictArray stored in the preprocessing cache.
+
+        The raw data and index are the arrays extracted from the csv before any preprocessing. Their entry of the cache
+        is found from the csv and from the simulation dictionary only. If there is an entry, its arrays are imported
+        into the MacularDictArray as copy-on-write memory-maps. Otherwise, the csv file is processed and the raw data
+        and index are stored in the cache.
+
+        Parameters
+        ----------
+        preprocessing_cache : PreprocessingCache
+            Content-addressed cache of the preprocessed MacularDictArray.
+        """
+        key = preprocessing_cache.make_raw_key(self.path_csv, self.dict_simulation)
+        macular_dict_array_raw = preprocessing_cache.get(MacularDictArray, key)
+
+        # Update of the data and index from the cache if possible.
+        if macular_dict_array_raw is not None:
+            print("RAW CACHE HIT.")
+            self._data, self._index = macular_dict_array_raw.data, macular_dict_array_raw.index
+
+        # Extraction of the data and index from the csv and storage in the cache without the preprocessing dictionary.
+        else:
+            self.setup_data_index_dict_array()
+            macular_dict_array_raw = MacularDictArray.__new__(MacularDictArray)
+            macular_dict_array_raw.__dict__.update({attribute: value for attribute, value in self.__dict__.items()
+                                                    if attribute != "_dict_preprocessing"})
+            preprocessing_cache.put(key, macular_dict_array_raw)
+
+    def update_from_preprocessing_dict(self, dict_preprocessing, binned=False):
         """Updating the MacularDictArray from a preprocessing dictionary (dict_preprocessing).
 
         The update concerns the value of the attributes dict_preprocessing, data and index.
@@ -552,11 +833,14 @@ class MacularDictArray:
         ----------
         dict_preprocessing : dict
             Dictionary for configuring the various processes to be implemented on the simulation data.
+
+        binned : bool
+            True if the binning has already been carried out during the extraction of the data from the csv.
         """
         self._dict_preprocessing = dict_preprocessing
         self._dict_preprocessing = self.cleaning_dict_preprocessing(dict_preprocessing)
 
-        self.setup_data_dict_array_preprocessing()
+        self.setup_data_dict_array_preprocessing(binned)
 
     def update_from_file(self, path_pyb):
         """Update of a newly created or already existing MacularDictArray object with a MacularDictArray stored in a
@@ -571,8 +855,7 @@ class MacularDictArray:
 
         """
         print("FILE UPDATING...", end="")
-        with open(path_pyb, "rb") as pyb_file:
-            tmp_dict = pickle.load(pyb_file).__dict__
+        tmp_dict = self.load_pyb(path_pyb).__dict__
         self.__dict__.clear()
         self.__dict__.update(tmp_dict)
         print("UPDATED!")
@@ -588,61 +871,515 @@ class MacularDictArray:
 
             The path can be absolute or relative.        """
         print("FILE LOADING...", end="")
-        with open(path_pyb, "rb") as pyb_file:
-            macular_dict_array = pickle.load(pyb_file)
+        BackgroundSaver.wait_saved(path_pyb)
+        macular_dict_array = cls.load_pyb(path_pyb)
         print("LOADED!")
 
         return macular_dict_array
 
-    def save(self):
+    @classmethod
+    def inspect(cls, path_pyb):
+        """Reading of the description of a MacularDictArray stored in a pyb file or in a pyb store without its data.
+
+        Only the header of the pyb file or the metadata of the pyb store is read. Pyb files saved without header are
+        read entirely.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path to file with .pyb extension or to directory with .pybd extension where a MacularDictArray object is
+            saved.
+
+        Returns
+        ----------
+        dict_description : dict
+            Dictionary containing the ‘path_csv’, ‘path_pyb’, ‘dict_simulation’ and ‘dict_preprocessing’ of the
+            MacularDictArray, as well as the ‘data’ and ‘index’ dictionaries associating the name of each array with its
+            shape and its dtype.
+        """
+        BackgroundSaver.wait_saved(path_pyb)
+        header = PybStore.read_header(path_pyb)
+        if header is None:
+            header = PybStore.make_header(cls.load_pyb(path_pyb))
+
+        return {"path_csv": header["attributes"]["_path_csv"], "path_pyb": header["attributes"]["_path_pyb"],
+                "dict_simulation": header["attributes"]["_dict_simulation"],
+                "dict_preprocessing": header["attributes"]["_dict_preprocessing"],
+                "data": {measurement: {"shape": dict_array["shape"], "dtype": dict_array["dtype"]}
+                         for measurement, dict_array in header["manifest"]["_data"].items()},
+                "index": {name_index: {"shape": dict_array["shape"], "dtype": dict_array["dtype"]}
+                          for name_index, dict_array in header["manifest"]["_index"].items()}}
+
+    @classmethod
+    def load_pyb(cls, path_pyb):
+        """Reading of a MacularDictArray stored in a pyb file or in a pyb store.
+
+        A path with the ‘.pybd’ extension designates a pyb store, i.e. a directory with one ‘.npy’ file per array of
+        data and index. The arrays of a pyb store are memory-mapped in read-only mode and only read from the disk when
+        they are accessed. A path with the ‘.pyb5’ extension designates a pyb file whose arrays are mapped on the file
+        in copy-on-write mode.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path to file with .pyb extension or to directory with .pybd extension where a MacularDictArray object is
+            saved.
+
+        Returns
+        ----------
+        macular_dict_array : MacularDictArray
+            MacularDictArray read.
+        """
+        if PybStore.is_pyb_store(path_pyb):
+            return PybStore.load(cls, path_pyb)
+
+        return PybStore.load_file(path_pyb)
+
+    def save(self, background_save=False):
         """Saving the MacularDictArray in a pyb (python binary) file whose path and name correspond to that
         present in the attribute of the simulation dictionary.
+
+        The pyb file ends with a header describing the MacularDictArray without its data and index, which can be read
+        with the inspect function. If the path has the ‘.pybd’ extension, the MacularDictArray is saved in a pyb store
+        with one ‘.npy’ file per array of data and index instead, the measurement arrays being compressed if the
+        ‘compression’ key of the simulation dictionary is given.
+
+        The pyb file is written in a temporary file renamed at the end of the writing, so that an interrupted save never
+        leaves a truncated pyb file. A save waits for the end of the background saves of the pyb file before writing it.
+
+        Parameters
+        ----------
+        background_save : bool
+            Save the MacularDictArray with a background thread and return without waiting for the end of the writing
+            (False by default). The end of the save can be waited for with BackgroundSaver.wait_saved.
+        """
+        if background_save:
+            BackgroundSaver.submit(self.path_pyb, MacularDictArray.save, self)
+        else:
+            # Waiting for the end of the background saves of the pyb file before writing it.
+            BackgroundSaver.wait_saved(self.path_pyb)
+            if PybStore.is_pyb_store(self.path_pyb):
+                PybStore.save(self, self.path_pyb, compression=self.dict_simulation.get("compression"))
+            else:
+                PybStore.dump(self, self.path_pyb)
+
+    def save_arrays(self, list_measurements=(), list_indexes=()):
+        """Saving only some measurements and indexes of the MacularDictArray in its pyb store.
+
+        The arrays of the measurements and indexes given are written in their own file of the pyb store, as well as
+        those missing from it, and the metadata file is updated. The files of the other arrays are kept as they are, so
+        that appending or replacing a measurement only costs the writing of its array. If the path is not a pyb store,
+        the whole MacularDictArray is saved.
+
+        Parameters
+        ----------
+        list_measurements : list of str
+            Names of the measurements of the data to be written.
+
+        list_indexes : list of str
+            Names of the indexes to be written.
+        """
+        # Waiting for the end of the background saves of the pyb store before updating it.
+        BackgroundSaver.wait_saved(self.path_pyb)
+
+        if PybStore.is_pyb_store(self.path_pyb):
+            PybStore.save(self, self.path_pyb, compression=self.dict_simulation.get("compression"),
+                          dict_names_arrays={"_data": list(list_measurements), "_index": list(list_indexes)})
+        else:
+            self.save()
+
+    def adding_preprocessing(self, preprocess, parameters):
+        """Adding a process to the MacularDictArray and saving only the arrays it creates or replaces.
+
+        Only the processes that add new arrays without modifying the existing ones can be added: ‘VSDI’, ‘derivative’,
+        ‘spatial_x_centering’, ‘spatial_y_centering’ and ‘mean_sections’. The process is carried out with the
+        parameters given, followed by the units conversion of the indexes it creates, then the parameters are added to
+        the preprocessing dictionary. The measurements of a ‘derivative’ and the axes of ‘mean_sections’ are merged with
+        those already in the preprocessing dictionary. The MacularDictArray is then equal to a MacularDictArray created
+        with the preprocessing dictionary completed.
+
+        Parameters
+        ----------
+        preprocess : str
+            Name of the process to be added, which is a key of the preprocessing dictionary.
+
+        parameters : object
+            Value of the key of the process in the preprocessing dictionary.
+
+        Raises
+        ----------
+        ValueError
+            The value error is raised if the process modifies the existing arrays of the MacularDictArray.
         """
-        with open(f"{self.path_pyb}", "wb") as pyb_file:
-            pickle.dump(self, pyb_file)
+        if preprocess not in ("VSDI", "derivative", "spatial_x_centering", "spatial_y_centering", "mean_sections"):
+            raise ValueError(f"The ‘{preprocess}’ process cannot be added to an existing MacularDictArray")
+
+        # Implementation of the process with the parameters given only, followed by the units conversion of its indexes.
+        dict_preprocessing = self.dict_preprocessing
+        data_before, index_before = self.data.copy(), self.index.copy()
+        self._dict_preprocessing = {**dict_preprocessing, preprocess: parameters}
+        self.preprocessing_step(preprocess)
+        print(f"Units converting...", end="")
+        self.make_all_indexes_units_conversion_preprocess({name_index: array for name_index, array in self.index.items()
+                                                          if index_before.get(name_index) is not array})
+        print("Done!")
 
-    def setup_data_index_dict_array(self):
+        # Merge of the parameters given with those of the preprocessing dictionary.
+        if preprocess == "derivative":
+            parameters = {**dict_preprocessing.get("derivative", {}), **parameters}
+        elif preprocess == "mean_sections":
+            parameters = {**dict_preprocessing.get("mean_sections", {}), **{
+                averaging_axis: dict_preprocessing.get("mean_sections", {}).get(averaging_axis, []) + list_sections
+                for averaging_axis, list_sections in parameters.items()}}
+        self._dict_preprocessing = {**dict_preprocessing, preprocess: parameters}
+
+        self.save_arrays([measurement for measurement, array in self.data.items()
+                          if data_before.get(measurement) is not array],
+                         [name_index for name_index, array in self.index.items()
+                          if index_before.get(name_index) is not array])
+
+    def setup_data_index_dict_array(self, bin_time=None):
         """Setting up measurements (output-cell type) dictionaries with data in the form of numpy.arrays.
 
         This process first requires extracting the data and its index from the csv of the Macular simulation. This
-        extraction is done on pieces of pandas dataframe, which therefore requires concatenation at the end.
-        The spatial orientation of the data within the numpy array is also different, which requires a
-        correction.
+        extraction is done on pieces of pandas dataframe written directly into arrays allocated once for the whole
+        simulation. The spatial orientation of the data within the numpy array differs from that of Macular, the values
+        are therefore placed directly at their numpy coordinates.
+
+        Parameters
+        ----------
+        bin_time : float or None
+            Binning interval in seconds applied to the data and temporal index during their extraction from the csv. No
+            binning is carried out if it is None.
         """
         self.setup_spatial_index("x")
         self.setup_spatial_index("y")
-        self.extract_data_index_from_macular_csv()
-        self.concatenate_data_index_dict_array()
-        DataframeChunkProcessor.dict_measurements_array_rotation(self.data, (0, 1))
+        self.extract_data_index_from_macular_csv(bin_time)
 
-    def extract_data_index_from_macular_csv(self):
+    def extract_data_index_from_macular_csv(self, bin_time=None):
         """Function allowing the extraction of the data and index contained in a Macular csv.
 
-        The data contained in the csv Macular is read in chunks of dataframe of 2000 lines. This
-        choice accelerates the reading of large datasets by parallelising them. As a result, the datasets
-        and the index obtained after extraction are also subdivided and combined into a list.
+        The number of time steps kept after the removal of the transient and of the end of the simulation is counted
+        first without parsing the whole csv, in order to allocate the array of each measurement only once. The data
+        contained in the csv Macular is then read in chunks of dataframe of 2000 lines which are written in place at
+        their time offset in these arrays, the temporal index being made of the times of the chunks.
+
+        Chunks entirely included in the transient are skipped without being processed and the reading of the csv stops
+        as soon as a chunk goes beyond the end of the simulation.
+
+        If a binning interval is given, the arrays of the measurements are allocated with the number of bins only and
+        each chunk is binned as soon as it is read, the time steps of its last incomplete bin being carried over to the
+        next chunk. The temporal index is binned at the end of the extraction.
+
+        If more time steps than counted are read, the temporal index is extracted first from the ‘Time’ column alone
+        and the data are read again.
+
+        If the ‘n_workers’ key of the simulation dictionary is greater than 1, the csv is instead split into byte ranges
+        parsed in parallel by this number of worker processes with the ParallelCsvParser class, which also returns the
+        temporal index. A compressed csv is always decompressed on the fly and read sequentially. The parallel parsing
+        does not bin the data.
+
+        Parameters
+        ----------
+        bin_time : float or None
+            Binning interval in seconds applied to the data and temporal index of the csv read sequentially. No binning
+            is carried out if it is None.
         """
         print("\nData/Index extraction.")
+        # Parsing of the csv header, done once for the whole file.
+        csv_header = self.csv_header_parsing()
+        transient = self.transient_computing()
+
+        # Parallel parsing of the csv by byte ranges, which is not possible in a compressed csv.
+        if self.dict_simulation.get("n_workers", 1) > 1 and not self.compression_extension(self.path_csv):
+            self._data, self.index["temporal"] = ParallelCsvParser.parse_macular_csv(
+                self.path_csv, csv_header, transient, self.dict_simulation["end"],
+                (self.dict_simulation["n_cells_y"], self.dict_simulation["n_cells_x"]),
+                self.dict_simulation["n_workers"], self.dict_simulation.get("dtype", "float64"),
+                self.transient_rows_computing())
+            return
+
+        # Skip of the first rows of the transient, checked with the first time read after them.
+        n_rows_skipped = self.transient_rows_computing()
+        first_time = self.reading_first_times(n_rows_skipped)
+        if n_rows_skipped and (len(first_time) == 0 or first_time[0] >= transient):
+            print(f"Row after skipping {n_rows_skipped} rows is not in the transient, no row skipped.")
+            n_rows_skipped = 0
+            first_time = self.reading_first_times()
+
+        n_time = self.counting_time_steps(n_rows_skipped, first_time)
+        bin_size = None
+        if bin_time:
+            bin_size = DataPreprocessor.computing_binning_parameters(first_time[ParallelCsvParser.cropping_times(
+                first_time, transient, self.dict_simulation["end"])] - transient, bin_time)[0]
+
+        # Case of more time steps read than counted.
+        if not self.reading_data_from_macular_csv(csv_header, n_rows_skipped, n_time, bin_size):
+            print(f"More time steps read than the {n_time} time steps counted, reading of the temporal index first.")
+            n_rows_skipped = self.extract_temporal_index_from_macular_csv(n_rows_skipped)
+            self.reading_data_from_macular_csv(csv_header, n_rows_skipped, len(self.index["temporal"]), bin_size)
+
+        # Binning of the temporal index in the same way as the data.
+        if bin_time:
+            print(f"Binning {bin_time}s...Done!")
+            bin_size, n_bin = DataPreprocessor.computing_binning_parameters(self.index["temporal"], bin_time)
+            self.index["temporal"] = DataPreprocessor.binning_unidimensional(self.index["temporal"], bin_size, n_bin)
+            # Removal of the bins allocated beyond those of the temporal index.
+            for measurement in self.data:
+                if self.data[measurement].shape[2] != n_bin:
+                    self.data[measurement] = np.ascontiguousarray(self.data[measurement][:, :, :n_bin])
+
+    def reading_first_times(self, n_rows_skipped=0):
+        """Function reading the ‘Time’ column of a Macular csv from its first rows until two time steps are kept.
+
+        The reading stops as soon as two time steps are kept between the transient and the end of the simulation or the
+        end of the simulation is exceeded, so that only the first chunks of the csv are parsed.
+
+        Parameters
+        ----------
+        n_rows_skipped : int
+            Number of rows at the start of the csv to be skipped without being parsed.
+
+        Returns
+        ----------
+        time : np.ndarray
+            Times of the rows read after the rows skipped.
+        """
+        transient = self.transient_computing()
+        list_time, n_kept = [], 0
+
+        with pd.read_csv(self.path_csv, usecols=["Time"], skiprows=range(1, n_rows_skipped + 1),
+                         chunksize=2000) as chunked_time:
+            for time_chunk in chunked_time:
+                list_time += [time_chunk["Time"].to_numpy()]
+                n_kept += ParallelCsvParser.cropping_times(list_time[-1], transient, self.dict_simulation["end"]).sum()
+                if n_kept >= 2 or (self.dict_simulation["end"] != "max" and
+                                   list_time[-1][-1] > self.dict_simulation["end"]):
+                    break
+
+        return np.concatenate(list_time) if list_time else np.array([])
+
+    @staticmethod
+    def counting_lines(path_csv, block_size=2 ** 20):
+        """Function counting the rows of a Macular csv after its header from their line breaks, without parsing them.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file, decompressed on the fly if it is compressed.
+
+        block_size : int
+            Number of bytes read at a time.
+
+        Returns
+        ----------
+        n_rows : int
+            Number of rows after the header.
+        """
+        n_line_breaks, last_byte = 0, b"\n"
+        with get_handle(path_csv, "rb", compression="infer", is_text=False) as handles:
+            for block in iter(lambda: handles.handle.read(block_size), b""):
+                n_line_breaks += block.count(b"\n")
+                last_byte = block[-1:]
+
+        # Case of a last row without line break.
+        return max(n_line_breaks + (last_byte != b"\n") - 1, 0)
+
+    def counting_time_steps(self, n_rows_skipped, first_time):
+        """Function counting the number of time steps of a Macular csv kept between the transient and the end of the
+        simulation without parsing the whole csv.
+
+        Without end of the simulation, the rows after the transient are counted from their line breaks. Otherwise, the
+        rows of an uncompressed csv are counted from their line breaks by byte ranges of 16 MiB, only the ‘Time’ column
+        of the ranges containing the transient or the end of the simulation being parsed, and the number of time steps
+        of a compressed csv is deduced from the time step between the first two times kept.
+
+        Parameters
+        ----------
+        n_rows_skipped : int
+            Number of rows at the start of the csv skipped without being parsed.
+
+        first_time : np.ndarray
+            Times of the first rows read after the rows skipped, up to the first two time steps kept.
+
+        Returns
+        ----------
+        n_time : int
+            Number of time steps kept, which is checked against the number of time steps read. It is an upper bound if
+            the compressed csv ends before the end of the simulation.
+        """
+        transient, end = self.transient_computing(), self.dict_simulation["end"]
+        time_kept = first_time[ParallelCsvParser.cropping_times(first_time, transient, end)]
+
+        # Case of a csv whose time steps kept have all been read.
+        if len(time_kept) < 2:
+            return len(time_kept)
+
+        # Case of a csv without end whose rows are counted, the rows of the transient having all been read.
+        if end == "max":
+            return self.counting_lines(self.path_csv) - n_rows_skipped - int((first_time < transient).sum())
+
+        # Case of an uncompressed csv cut at the end of the simulation, whose rows are counted by byte ranges.
+        if not self.compression_extension(self.path_csv):
+            start_data = ParallelCsvParser.skipping_rows(self.path_csv, n_rows_skipped)
+            list_ranges = ParallelCsvParser.split_byte_ranges(
+                self.path_csv, max(os.path.getsize(self.path_csv) // 2 ** 24, 1), start_data)
+            list_ranges = ParallelCsvParser.selecting_byte_ranges(self.path_csv, list_ranges, transient, end)
+
+            return sum(ParallelCsvParser.counting_rows(self.path_csv, byte_range, transient, end)
+                       for byte_range in list_ranges)
+
+        # Case of a compressed csv cut at the end of the simulation.
+        time_step = round(time_kept[1] - time_kept[0], 6)
+
+        return int(np.floor((end - time_kept[0]) / time_step + 1e-6)) + 1
+
+    def reading_data_from_macular_csv(self, csv_header, n_rows_skipped, n_time, bin_size=None):
+        """Function reading the data and the temporal index of a Macular csv in chunks of dataframe of 2000 lines.
+
+        The arrays of the measurements are allocated with the number of time steps counted, or with the number of bins
+        they contain if a binning is carried out. The reading stops if more time steps than counted are read. If fewer
+        time steps than counted are read, the arrays are cut to the time steps read.
+
+        Parameters
+        ----------
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the chunks.
+
+        n_rows_skipped : int
+            Number of rows at the start of the csv to be skipped without being parsed.
+
+        n_time : int
+            Number of time steps kept counted before the reading.
+
+        bin_size : int or None
+            Number of time steps per bin. No binning is carried out if it is None.
+
+        Returns
+        ----------
+        is_read : bool
+            Returns False if more time steps than counted have been read, in which case the reading is incomplete.
+        """
+        transient = self.transient_computing()
+        dtype = self.dict_simulation.get("dtype", "float64")
+
+        # The means of the bins of integer measurements are stored as floats, as with the binning of the whole arrays.
+        if bin_size and not np.issubdtype(dtype, np.floating):
+            dtype = np.result_type(dtype, np.float64)
+        self._data = DataframeChunkProcessor.init_dict_measurements_array(
+            csv_header.measurements, self.dict_simulation["n_cells_y"], self.dict_simulation["n_cells_x"],
+            n_time // bin_size if bin_size else n_time, dtype)
+        dict_partial_bins = {}
+        list_time = []
+
         # Import of the data contained in the csv into a segmented dataframe.
-        chunked_dataframe = pd.read_csv(self.path_csv, chunksize=2000)
+        with pd.read_csv(self.path_csv, usecols=csv_header.usecols, skiprows=range(1, n_rows_skipped + 1),
+                         chunksize=2000) as chunked_dataframe:
+            i_chunk, i_time = 0, 0
+            print("Chunk : ")
+            # Processing of data frame segments
+            for dataframe_chunk in chunked_dataframe:
+                print(f"{i_chunk + 1}, ", end="")
+                time = dataframe_chunk["Time"].to_numpy()
+                list_time += [time[ParallelCsvParser.cropping_times(time, transient, self.dict_simulation["end"])]]
+
+                # Case of more time steps read than counted.
+                if sum(len(time_kept) for time_kept in list_time) > n_time:
+                    return False
+
+                # Case of a chunk entirely included in the transient.
+                if time[-1] < transient:
+                    print("Transient skipped!")
+                elif bin_size:
+                    i_time, dict_partial_bins = self.dataframe_chunk_binning(dataframe_chunk, i_time,
+                                                                             dict_partial_bins, bin_size, csv_header)
+                else:
+                    i_time = self.dataframe_chunk_processing(dataframe_chunk, i_time, csv_header)
+
+                # Case of a chunk going beyond the end of the simulation.
+                if self.dict_simulation["end"] != "max" and time[-1] > self.dict_simulation["end"]:
+                    break
+                i_chunk += 1
+
+        self.index["temporal"] = np.concatenate(list_time or [np.array([])]) - transient
+
+        # Case of fewer time steps read than counted, the binned arrays being cut after the binning of the index.
+        if len(self.index["temporal"]) < n_time and not bin_size:
+            for measurement in self.data:
+                self.data[measurement] = np.ascontiguousarray(self.data[measurement][:, :, :i_time])
+
+        return True
+
+    def csv_header_parsing(self):
+        """Function to parse the header of the Macular csv once for all its chunks.
+
+        The header is projected on the measurements of the ‘measurements’ key of the simulation dictionary if there is
+        one, so that only the columns of these measurements are read from the csv.
+
+        Returns
+        ----------
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the chunks.
+        """
+        return MacularCsvHeader(self.path_csv, (self.dict_simulation["n_cells_x"], self.dict_simulation["n_cells_y"]),
+                                self.dict_simulation.get("measurements"))
 
-        i_chunk = 0
-        print("Chunk : ")
-        # Processing of data frame segments
-        for dataframe_chunk in chunked_dataframe:
-            print(f"{i_chunk + 1}, ", end="")
-            self.dataframe_chunk_processing(dataframe_chunk, i_chunk)
-            i_chunk += 1
+    def extract_temporal_index_from_macular_csv(self, n_rows_skipped=0):
+        """Function extracting the temporal index of a Macular csv from its ‘Time’ column only.
 
-    def dataframe_chunk_processing(self, dataframe_chunk, i_chunk):
-        """Restructuring of a chunk of pandas dataframe into numpy array dictionaries for the index and
-        the data.
+        The index is cropped in the same way as the chunks of the data, between the transient and the end of the
+        simulation, then re-centred on the transient. The reading of the ‘Time’ column stops as soon as the end of the
+        simulation is exceeded.
+
+        The first rows of the transient can be skipped without being parsed. The first time read after these rows must
+        still belong to the transient, which guarantees that no row to be kept has been skipped. Otherwise, the whole
+        ‘Time’ column is read again without skipping any row.
+
+        Parameters
+        ----------
+        n_rows_skipped : int
+            Number of rows at the start of the csv to be skipped without being parsed.
+
+        Returns
+        ----------
+        n_rows_skipped : int
+            Number of rows actually skipped after checking the first time read.
+        """
+        transient = self.transient_computing()
+        list_time = []
+
+        # Import of the time column only.
+        with pd.read_csv(self.path_csv, usecols=["Time"], skiprows=range(1, n_rows_skipped + 1),
+                         chunksize=100000) as chunked_time:
+            for time_chunk in chunked_time:
+                list_time += [time_chunk["Time"].to_numpy()]
+                # Case of skipped rows that may not all belong to the transient.
+                if n_rows_skipped and list_time[0][0] >= transient:
+                    print(f"Time {list_time[0][0]}s after skipping {n_rows_skipped} rows is not in the transient, "
+                          f"no row skipped.")
+                    return self.extract_temporal_index_from_macular_csv()
+                if self.dict_simulation["end"] != "max" and list_time[-1][-1] > self.dict_simulation["end"]:
+                    break
+        time = np.concatenate(list_time)
+
+        # Cropping of the time steps between the transient and the end of the simulation.
+        time_kept = time >= transient
+        if self.dict_simulation["end"] != "max":
+            time_kept &= time <= self.dict_simulation["end"]
+
+        self.index["temporal"] = time[time_kept] - transient
+
+        return n_rows_skipped
+
+    def dataframe_chunk_processing(self, dataframe_chunk, i_time, csv_header=None):
+        """Restructuring of a chunk of pandas dataframe into numpy array dictionaries for the data.
 
         The dataframe is first modified so that its index is the ‘Time’ column and to remove the entire ‘transient’ part
         of the simulation, if there is one. The dictionary of the data attribute is configured to contain the
-        measurements names within keys associated with empty lists. A numpy array of size (n_cells_x, n_cells_y,
-        size_chunk) is added to the list and then filled with the data from the chunk dataframe. Finally, the index of
-        the chunk dataframe is added to the empty list associated with the ‘temporal’ key of the index attribute.
+        measurements names within keys associated with C-contiguous arrays of size (n_cells_y, n_cells_x, n_time)
+        allocated for the whole simulation, with n_time the size of the temporal index. The data from the chunk
+        dataframe is then written in these arrays at the numpy coordinates of each cell, from the time offset of the
+        chunk.
 
         All these operations are carried out using the DataframeChunkProcessor class.
 
@@ -651,32 +1388,120 @@ class MacularDictArray:
         dataframe_chunk : pandas.io.parsers.readers.TextFileReader
             Portion of a dataframe of 2000 lines to be restructured.
 
-        i_chunk : int
-            Current chunk number.
+        i_time : int
+            Time offset from which the chunk is written in the arrays of the measurements.
+
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the chunks. It is parsed from the csv if it is not given.
+
+        Returns
+        ----------
+        i_time : int
+            Time offset from which the next chunk should be written.
         """
-        dataframe_chunk_processor = DataframeChunkProcessor()
+        if csv_header is None:
+            csv_header = self.csv_header_parsing()
+        dataframe_chunk = self.dataframe_chunk_cropping(dataframe_chunk, csv_header)
+
+        # Implementation of data arrays of the size of the whole temporal index.
+        if self._data == {}:
+            if len(self.index["temporal"]) == 0:
+                self.extract_temporal_index_from_macular_csv()
+            self._data = DataframeChunkProcessor.init_dict_measurements_array(
+                csv_header.measurements, self.dict_simulation["n_cells_y"], self.dict_simulation["n_cells_x"],
+                len(self.index["temporal"]), self.dict_simulation.get("dtype", "float64"))
+        DataframeChunkProcessor.fill_dict_measurements_array_chunk(dataframe_chunk, self.data, csv_header.scatter_map,
+                                                                   i_time)
+        print("Done!")
+
+        return i_time + dataframe_chunk.shape[0]
+
+    def dataframe_chunk_cropping(self, dataframe_chunk, csv_header):
+        """Shaping of a chunk of pandas dataframe before its restructuring into the arrays of the data.
+
+        The chunk is projected on the columns of the csv header, its index becomes the ‘Time’ column and the rows of the
+        transient and after the end of the simulation are removed.
+
+        Parameters
+        ----------
+        dataframe_chunk : pandas.io.parsers.readers.TextFileReader
+            Portion of a dataframe of 2000 lines to be shaped.
 
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the chunks.
+
+        Returns
+        ----------
+        dataframe_chunk : pandas.DataFrame
+            Chunk indexed by time and cropped between the transient and the end of the simulation.
+        """
         # Transient computing
         transient = self.transient_computing()
+        # Projection of a chunk read with all the columns of the csv.
+        if dataframe_chunk.shape[1] != len(csv_header.usecols):
+            dataframe_chunk = dataframe_chunk[csv_header.usecols]
         # Shaping of the dataframe fragment.
         dataframe_chunk = dataframe_chunk.set_index("Time")
-        dataframe_chunk = DataframeHelpers.crop_dataframe_rows(dataframe_chunk, transient,
-                                                                self.dict_simulation["end"])
 
-        list_num, list_measurements = dataframe_chunk_processor.get_list_num_measurements(self.path_csv)
+        return DataframeHelpers.crop_dataframe_rows(dataframe_chunk, transient, self.dict_simulation["end"])
 
-        # Implementation of data and index arrays.
-        if self._data == {}:
-            self._data = DataframeChunkProcessor.init_dict_measurements_array(list_measurements)
-        DataframeChunkProcessor.extend_dict_measurements_array(
-            self.data, self.dict_simulation["n_cells_x"], self.dict_simulation["n_cells_y"],
-            dataframe_chunk.shape[0])
-        DataframeChunkProcessor.fill_dict_measurements_array_chunk(
-            dataframe_chunk, self.data, list_measurements, list_num,
-            (self.dict_simulation["n_cells_x"], self.dict_simulation["n_cells_y"]), i_chunk)
-        print("Done!")
+    def dataframe_chunk_binning(self, dataframe_chunk, i_bin, dict_partial_bins, bin_size, csv_header):
+        """Restructuring of a chunk of pandas dataframe into the binned arrays of the data.
 
-        self.index["temporal"] += [dataframe_chunk.index.to_numpy()]
+        The time steps of the chunk are written after those of the last incomplete bin of the previous chunks, in arrays
+        of the size of the chunk only. All the complete bins of these arrays are averaged with binning_tridimensional
+        and written at their bin offset in the arrays of the measurements, which have the size of the binned temporal
+        index. The time steps of the last incomplete bin are carried over to the next chunk. Time steps after the last
+        bin of the temporal index are ignored, as in binning_tridimensional.
+
+        Parameters
+        ----------
+        dataframe_chunk : pandas.io.parsers.readers.TextFileReader
+            Portion of a dataframe of 2000 lines to be restructured.
+
+        i_bin : int
+            Bin offset from which the bins of the chunk are written in the arrays of the measurements.
+
+        dict_partial_bins : dict of np.ndarray
+            Time steps of the last incomplete bin of the previous chunks for each measurement. It is empty for the first
+            chunk.
+
+        bin_size : int
+            Number of time steps per bin.
+
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the chunks.
+
+        Returns
+        ----------
+        i_bin : int
+            Bin offset from which the bins of the next chunk should be written.
+
+        dict_partial_bins : dict of np.ndarray
+            Time steps of the last incomplete bin to be carried over to the next chunk.
+        """
+        dataframe_chunk = self.dataframe_chunk_cropping(dataframe_chunk, csv_header)
+        n_partial = next(iter(dict_partial_bins.values())).shape[2] if dict_partial_bins else 0
+
+        # Arrays of the time steps of the previous incomplete bin followed by those of the chunk.
+        dtype = self.dict_simulation.get("dtype", "float64")
+        dict_chunk_array = {measurement: np.zeros(array.shape[:2] + (n_partial + dataframe_chunk.shape[0],),
+                                                  dtype=dtype) for measurement, array in self.data.items()}
+        for measurement in dict_partial_bins:
+            dict_chunk_array[measurement][:, :, :n_partial] = dict_partial_bins[measurement]
+        DataframeChunkProcessor.fill_dict_measurements_array_chunk(dataframe_chunk, dict_chunk_array,
+                                                                   csv_header.scatter_map, n_partial)
+
+        # Averaging of the complete bins and carry over of the time steps of the last incomplete bin.
+        n_bin_chunk = min((n_partial + dataframe_chunk.shape[0]) // bin_size,
+                          next(iter(self.data.values())).shape[2] - i_bin)
+        for measurement in self.data:
+            self.data[measurement][:, :, i_bin:i_bin + n_bin_chunk] = DataPreprocessor.binning_tridimensional(
+                dict_chunk_array[measurement], bin_size, n_bin_chunk)
+            dict_partial_bins[measurement] = dict_chunk_array[measurement][:, :, n_bin_chunk * bin_size:].copy()
+        print("Binned!")
+
+        return i_bin + n_bin_chunk, dict_partial_bins
 
     def transient_computing(self):
         """Function to calculate the value of the transient to be removed from the data set.
@@ -707,20 +1532,29 @@ class MacularDictArray:
 
         return transient
 
+    def transient_rows_computing(self):
+        """Function to calculate the number of rows of the transient that can be skipped before parsing the csv.
+
+        The number of rows is deduced from the transient and from the time between two frames (delta_t). One row less
+        than the transient is kept so that the first row read can be checked to still belong to the transient. No row is
+        skipped if the ‘skip_transient_rows’ key of the simulation dictionary is False.
+
+        Returns
+        ----------
+        n_rows_skipped : int
+            Returns the number of rows to be skipped at the start of the csv.
+        """
+        if not self.dict_simulation.get("skip_transient_rows", True):
+            return 0
+
+        return max(round(self.transient_computing() / self.dict_simulation["delta_t"]) - 1, 0)
+
     def transient_extraction(self):
         """
         Extracting the transient value from the CSV file path if it follows the nomenclature.
         """
         return int(self.transient_reg.findall(self.path_csv)[0][:-1])
 
-    def concatenate_data_index_dict_array(self):
-        """
-        Concatenation of datasets and index separated into chunks within a list.
-        """
-        self.index["temporal"] = np.concatenate(self.index["temporal"])
-        for key in self.data:
-            self.data[key] = np.concatenate(self.data[key], axis=-1)
-
     def setup_spatial_index(self, name_axis):
         """Function calculating the spatial index of the MacularDictArray for a given axis (x or y).
 
@@ -732,7 +1566,7 @@ class MacularDictArray:
         self.index[f"spatial_{name_axis}"] = np.array([i_cell * self.dict_simulation["dx"] for i_cell in
                                                        range(self.dict_simulation[f"n_cells_{name_axis}"])]).round(5)
 
-    def setup_data_dict_array_preprocessing(self):
+    def setup_data_dict_array_preprocessing(self, binned=False):
         """Implementation of all the procedures for transforming the data indicated in the dictionary of
         preprocessing.
 
@@ -746,7 +1580,8 @@ class MacularDictArray:
         crop differently in horizontal and vertical axes: (x_edge, y_edge) or an int to crop everywhere the same.
         The x_edge and the y_edge of the tuple can also be tuples to crop asymmetrically the two edges of each axis.
         - ‘VSDI’ to calculate the voltage sensitive dye imaging signal of the cortex. Two possible values: True and
-        False.
+        False. The value can also be a dictionary with the ‘excitatory’ and ‘inhibitory’ keys giving the weights of the
+        two populations in the VSDI (0.8 and 0.2 by default).
         - ‘derivative’ to calculate the derivative of the measurements. It is possible to add an integer value
         to integrate over a larger interval. Otherwise, an instantaneous derivative will be obtained. The
         ‘derivative’ key is associated with a dictionary that must contain the measurements to be processed as keys
@@ -766,66 +1601,157 @@ class MacularDictArray:
         Thus, if ‘temporal_centering’ is active, this will create a ‘temporal_centered_ms’ index. For this reason, unit
         conversion processing must always be performed last in order to process all possible new spatial or temporal
         measurements before.
+
+        If the preprocessing cache is enabled, the output of each process is stored in the cache with a key depending on
+        its parameters and on those of the processes carried out before it. Only the processes whose parameters, or
+        those of a previous process, have changed are then carried out again.
+
+        Parameters
+        ----------
+        binned : bool
+            True if the binning has already been carried out during the extraction of the data from the csv, in which
+            case it is not carried out again.
         """
         print("Preprocessing : ", end="")
 
         process_order = ("binning", "edge", "VSDI", "derivative", "temporal_centering", "spatial_x_centering",
-                         "spatial_y_centering", "mean_sections")
+                         "spatial_y_centering", "mean_sections", "units_conversion")
+
+        # Use of the outputs of the processes stored in the preprocessing cache if it is enabled.
+        preprocessing_cache = PreprocessingCache.from_environment()
+        if preprocessing_cache is not None:
+            key = preprocessing_cache.make_raw_key(self.path_csv, self.dict_simulation)
 
         for preprocess in process_order:
-            # If the preprocess does not exist, move on to the next one.
-            try:
-                self.dict_preprocessing[preprocess]
-            except KeyError:
+            # If the preprocess does not exist, move on to the next one. All indexes units conversion is always done.
+            if preprocess not in self.dict_preprocessing and preprocess != "units_conversion":
+                continue
+            # The binning carried out during the extraction of the data is not done again.
+            if preprocess == "binning" and binned:
                 continue
 
-            # Binning of data and index arrays.
-            if preprocess == "binning":
-                print(f"Binning {self.dict_preprocessing['binning']}s...", end="")
-                self.binning_preprocess()
-
-            # Crop of x and y edges
-            elif preprocess == "edge":
-                print("Edge cropping...", end="")
-                self.edge_cropping_preprocess()
-
-            # Computation of the array of data VSDI.
-            elif preprocess == "VSDI":
-                print("VSDI computing...", end="")
-                self.data["VSDI"] = DataPreprocessor.vsdi_computing(self.data)
-
-            # Computation of the array of data derivatives.
-            elif preprocess == "derivative":
-                print("Derivating...", end="")
-                self.derivating_preprocess()
-
-            # Temporal centering of index array.
-            elif preprocess == "temporal_centering":
-                print("Temporal centering...", end="")
-                self.temporal_centering_preprocess()
-
-            # Spatial centering of x-axis index array.
-            elif preprocess == "spatial_x_centering":
-                print("Spatial x centering...", end="")
-                self.index[f"spatial_x_centered"] = DataPreprocessor.spatial_centering(
-                    self.index["spatial_x"], self.dict_simulation["n_cells_x"])
-
-            # Spatial centering of y-axis index array.
-            elif preprocess == "spatial_y_centering":
-                print("Spatial y centering...", end="")
-                self.index[f"spatial_y_centered"] = DataPreprocessor.spatial_centering(
-                    self.index["spatial_y"], self.dict_simulation["n_cells_y"])
-
-            # Mean sectioning along one axis of index array.
-            elif preprocess == "mean_sections":
-                    print(f"Mean sectioning...", end="")
-                    self.mean_sectioning_preprocess()
+            if preprocessing_cache is not None:
+                key = preprocessing_cache.make_step_key(key, preprocess, self.preprocessing_step_parameters(preprocess))
+                self.managing_step_cache(preprocessing_cache, key, preprocess)
+            else:
+                self.preprocessing_step(preprocess)
+
+        print("Done!")
+
+    def preprocessing_step(self, preprocess):
+        """Implementation of one of the procedures for transforming the data indicated in the dictionary of
+        preprocessing.
+
+        Parameters
+        ----------
+        preprocess : str
+            Name of the process to be implemented, which is a key of the preprocessing dictionary or ‘units_conversion’
+            for all indexes units conversion.
+        """
+        # Binning of data and index arrays.
+        if preprocess == "binning":
+            print(f"Binning {self.dict_preprocessing['binning']}s...", end="")
+            self.binning_preprocess()
+
+        # Crop of x and y edges
+        elif preprocess == "edge":
+            print("Edge cropping...", end="")
+            self.edge_cropping_preprocess()
+
+        # Computation of the array of data VSDI.
+        elif preprocess == "VSDI":
+            print("VSDI computing...", end="")
+            self.vsdi_preprocess()
+
+        # Computation of the array of data derivatives.
+        elif preprocess == "derivative":
+            print("Derivating...", end="")
+            self.derivating_preprocess()
+
+        # Temporal centering of index array.
+        elif preprocess == "temporal_centering":
+            print("Temporal centering...", end="")
+            self.temporal_centering_preprocess()
+
+        # Spatial centering of x-axis index array.
+        elif preprocess == "spatial_x_centering":
+            print("Spatial x centering...", end="")
+            self.index[f"spatial_x_centered"] = DataPreprocessor.spatial_centering(
+                self.index["spatial_x"], self.dict_simulation["n_cells_x"])
+
+        # Spatial centering of y-axis index array.
+        elif preprocess == "spatial_y_centering":
+            print("Spatial y centering...", end="")
+            self.index[f"spatial_y_centered"] = DataPreprocessor.spatial_centering(
+                self.index["spatial_y"], self.dict_simulation["n_cells_y"])
+
+        # Mean sectioning along one axis of index array.
+        elif preprocess == "mean_sections":
+            print(f"Mean sectioning...", end="")
+            self.mean_sectioning_preprocess()
 
         # All indexes units conversion
-        print(f"Units converting...", end="")
-        self.make_all_indexes_units_conversion_preprocess()
+        elif preprocess == "units_conversion":
+            print(f"Units converting...", end="")
+            self.make_all_indexes_units_conversion_preprocess()
 
-        print("Done!")
+    def preprocessing_step_parameters(self, preprocess):
+        """Function to get the parameters of the preprocessing dictionary used by one of the procedures.
+
+        Parameters
+        ----------
+        preprocess : str
+            Name of the process, which is a key of the preprocessing dictionary or ‘units_conversion’.
+
+        Returns
+        ----------
+        parameters : object
+            Value of the key of the process in the preprocessing dictionary or, for all indexes units conversion,
+            dictionary of the keys of the preprocessing dictionary containing ‘index’.
+        """
+        if preprocess == "units_conversion":
+            return {name: value for name, value in self.dict_preprocessing.items() if "index" in name}
+
+        return self.dict_preprocessing[preprocess]
+
+    def managing_step_cache(self, preprocessing_cache, key, preprocess):
+        """Managing the reuse of the output of one of the procedures stored in the preprocessing cache.
+
+        The entry of the cache of a process is found from its parameters and from those of all the processes carried
+        out before it, so that a change of parameters only invalidates the outputs of the process and of the following
+        ones. The entry only contains the arrays of data and index created or replaced by the process. If there is an
+        entry, its arrays are imported into the MacularDictArray as copy-on-write memory-maps. Otherwise, the process is
+        carried out and its output is stored in the cache.
+
+        Parameters
+        ----------
+        preprocessing_cache : PreprocessingCache
+            Content-addressed cache of the preprocessed MacularDictArray.
+
+        key : str
+            Key of the entry of the process in the cache.
+
+        preprocess : str
+            Name of the process, which is a key of the preprocessing dictionary or ‘units_conversion’.
+        """
+        macular_dict_array_step = preprocessing_cache.get(MacularDictArray, key)
+
+        # Update of the data and index from the cache if possible.
+        if macular_dict_array_step is not None:
+            print(f"{preprocess} cached...", end="")
+            self.data.update(macular_dict_array_step.data)
+            self.index.update(macular_dict_array_step.index)
+
+        # Implementation of the process and storage in the cache of the arrays it has created or replaced.
+        else:
+            data_before, index_before = self.data.copy(), self.index.copy()
+            self.preprocessing_step(preprocess)
+            macular_dict_array_step = MacularDictArray.__new__(MacularDictArray)
+            macular_dict_array_step._data = {measurement: array for measurement, array in self.data.items()
+                                             if data_before.get(measurement) is not array}
+            macular_dict_array_step._index = {name_index: array for name_index, array in self.index.items()
+                                              if index_before.get(name_index) is not array}
+            preprocessing_cache.put(key, macular_dict_array_step)
 
     def binning_preprocess(self):
         """Function to perform binning of all MacularDictArray measurements as well as the time index.
@@ -859,6 +1785,16 @@ class MacularDictArray:
         self.index["spatial_y"] = self.index["spatial_y"][dict_edges["y_min_edge"]:
                                                           len(self.index["spatial_y"]) - dict_edges["y_max_edge"]]
 
+    def vsdi_preprocess(self):
+        """Function to compute the VSDI of the cortical column from the excitatory and inhibitory mean voltages.
+
+        The weights of the excitatory and inhibitory populations are those of the ‘excitatory’ and ‘inhibitory’ keys of
+        the ‘VSDI’ key in the preprocessing dictionary if it is a dictionary, otherwise 0.8 and 0.2.
+        """
+        dict_weights = self.dict_preprocessing["VSDI"] if isinstance(self.dict_preprocessing["VSDI"], dict) else {}
+        self.data["VSDI"] = DataPreprocessor.vsdi_computing(self.data, dict_weights.get("excitatory", 0.8),
+                                                            dict_weights.get("inhibitory", 0.2))
+
     def derivating_preprocess(self):
         """Function for calculating the derivative of given measurements.
 
@@ -876,8 +1812,8 @@ class MacularDictArray:
         field of each cell.
 
         Time centering is performed according to the ‘temporal_centering’ key in the preprocessing dictionary. The
-        centering computing produces a two-dimensional array of centred times for each cell on the object's movement
-        axis.
+        centering computing produces a CenteredTemporalIndex, used as a two-dimensional array of centred times for each
+        cell on the object's movement axis, but storing only the temporal index and the arrival times of the bar.
 
         If edges have been cropped from the current MacularDictArray, it is necessary to crop these edges also these
         edges in the list of arrival times in the bar in the centre of the receiver fields. All cropping values to be
@@ -916,32 +1852,22 @@ class MacularDictArray:
         preparation for averaging, and the ‘cropping_dict’ which groups the parameters specific to this cropping.
 
         The function begins by scanning the names of the axes to be averaged and the measurements. For each of them,
-        it transforms the array into a imbricated array. This is a 2D array with the dimensions of the two axes not
-        averaged, and each position stores a 1D array corresponding to the axis to be averaged. This allows to isolate
-        values according to the axis to be averaged. This imbricated array is then cropped or not, depending on the
-        user's input. Only the isolated array corresponding to the axis to be averaged is cropped. Different cropping
-        methods are possible. The imbricated array structure was chosen because some of these methods can result in
-        different array sizes coexisting within the same array. Finally, the isolated array from the imbricated array is
-        averaged to obtain the average section.
+        the axis to be averaged is cropped or not, depending on the user's input. Different cropping methods are
+        possible. A fixed edge crop is a view of the array, while the threshold crops keep a different number of values
+        at each position of the other two axes and are represented by a boolean mask of the values kept. Finally, the
+        values kept along the axis are averaged in a single reduction to obtain the average section.
         """
         # Loop on the axes to be averaged.
         for averaging_axis in self.dict_preprocessing["mean_sections"]:
             # Loop through the measurements of each axis to be averaged.
             for mean_section_dictionary in self.dict_preprocessing["mean_sections"][averaging_axis]:
-                # Creation of a imbricated array isolating the axis to be averaged.
-                imbricated_array_data = DataPreprocessor.transform_3d_array_to_imbricated_arrays(
-                self.data[mean_section_dictionary["measurement"]], averaging_axis)
-
-                # Cut the axis to be averaged within the imbricated array to average only a portion.
-                imbricated_array_data = DataPreprocessor.crop_imbricated_array(
-                    imbricated_array_data, mean_section_dictionary["cropping_type"],
-                    mean_section_dictionary["cropping_dict"])
-
-                # Average of the current axis transforming the imbricated array into a 2D array.
+                # Average of the current axis, cropped or not, transforming the 3D array into a 2D array.
                 self.data[f"{averaging_axis}_mean_section_{mean_section_dictionary['cropping_type']}".strip("_")] = (
-                    DataPreprocessor.imbricated_arrays_axis_averaging(imbricated_array_data))
+                    DataPreprocessor.mean_section_computing(
+                        self.data[mean_section_dictionary["measurement"]], averaging_axis,
+                        mean_section_dictionary["cropping_type"], mean_section_dictionary["cropping_dict"]))
 
-    def make_all_indexes_units_conversion_preprocess(self):
+    def make_all_indexes_units_conversion_preprocess(self, dict_indexes=None):
         """Function that creates dictionary entries corresponding to conversions of temporal and spatial indexes.
 
         All new entries are taken from the preprocessing dictionary. These are all keys beginning with ‘temporal_index’
@@ -951,8 +1877,13 @@ class MacularDictArray:
 
         For example, ‘temporal_index_mm’ will create a ‘temporal_mm’ index, but also a ‘temporal_centered_ms’ index if
         ‘centering’ is enabled.
+
+        Parameters
+        ----------
+        dict_indexes : dict of np.ndarray or None
+            Indexes to be converted. If it is None, all the indexes of the MacularDictArray are converted.
         """
-        index_copy = self.index.copy()
+        index_copy = self.index.copy() if dict_indexes is None else dict_indexes
 
         for preprocess in self.dict_preprocessing:
             if "index" in preprocess:
@@ -985,7 +1916,8 @@ class MacularDictArray:
         return macular_dict_array_copy
 
     @classmethod
-    def make_multiple_macular_dict_array(cls, multiple_dicts_simulations, multiple_dicts_preprocessings):
+    def make_multiple_macular_dict_array(cls, multiple_dicts_simulations, multiple_dicts_preprocessings,
+                                         conflict_policy=None, background_save=False):
         """Class method to create several MultiDictArray in succession.
 
         MultiDictArrays are created from dictionaries of simulation and preprocessing dictionaries. Each specific
@@ -1018,6 +1950,15 @@ class MacularDictArray:
             The dictionary may also contain a ‘global’ key containing parameters shared between all preprocessing of
             MacularDictArray. The preprocessing dictionary can be empty or contains only a ‘global’ key.
 
+        conflict_policy : str or None
+            Policy used by each MacularDictArray in case of difference between the dictionaries of its pyb file and
+            those given as input (‘interactive’, ‘prefer_file’, ‘prefer_config’, ‘error’ or ‘rebuild_if_stale’). If it
+            is None, the policy is taken from the ‘MACULAR_CONFLICT_POLICY’ environment variable.
+
+        background_save : bool
+            Save each MacularDictArray with a background thread while the next ones are created (False by default). The
+            end of the saves can be waited for with BackgroundSaver.flush.
+
         Returns
         ----------
         multi_macular_dict_array : dict of MacularDictArray
@@ -1050,6 +1991,7 @@ class MacularDictArray:
                 except KeyError:
                     pass
 
-                multi_macular_dict_array[condition] = MacularDictArray(dict_simulation, dict_preprocessing)
+                multi_macular_dict_array[condition] = MacularDictArray(dict_simulation, dict_preprocessing,
+                                                                       conflict_policy, background_save)
 
         return multi_macular_dict_array
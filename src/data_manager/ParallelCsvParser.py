@@ -0,0 +1,405 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+class ParallelCsvParser:
+    """Class containing all the functions enabling the parsing of a Macular csv by several processes.
+
+    The csv is split into byte ranges starting and ending at line boundaries. The workers first count the rows kept in
+    each range, which gives the time offset of the first row of each range in the arrays of the measurements. Each range
+    is then parsed by a worker process which writes its rows directly at this offset into the arrays of the measurements
+    and sends back only their times, from which the temporal index is made. These arrays are memory-maps of temporary
+    files shared by all the processes, so that no data has to be sent back from the workers nor copied at the end.
+
+    The rows of the transient deduced from delta_t are skipped before splitting the csv, and the ranges entirely
+    included in the transient or entirely after the end of the simulation are never parsed.
+    """
+
+    @staticmethod
+    def split_byte_ranges(path_csv, n_ranges, start_data=None):
+        """Function to split a csv into byte ranges starting and ending at line boundaries.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file to be split.
+
+        n_ranges : int
+            Number of ranges targeted. Fewer ranges are returned if some of them would be empty.
+
+        start_data : int or None
+            Byte offset of the start of the line from which the csv is split. If it is None, the csv is split from the
+            line following its header.
+
+        Returns
+        ----------
+        list_ranges : list of tuple
+            List of the (start, stop) byte offsets of each range. The header line is not included in any range.
+        """
+        with open(path_csv, "rb") as file:
+            if start_data is None:
+                file.readline()
+                start_data = file.tell()
+            size = file.seek(0, io.SEEK_END)
+
+            # Alignment of each boundary on the start of the next line.
+            list_boundaries = [start_data]
+            for i_range in range(1, n_ranges):
+                file.seek(max(start_data + (size - start_data) * i_range // n_ranges - 1, list_boundaries[-1]))
+                file.readline()
+                if list_boundaries[-1] < file.tell() < size:
+                    list_boundaries += [file.tell()]
+            list_boundaries += [size]
+
+        return [(start, stop) for start, stop in zip(list_boundaries[:-1], list_boundaries[1:]) if start < stop]
+
+    @staticmethod
+    def skipping_rows(path_csv, n_rows_skipped, block_size=2 ** 20):
+        """Function to find the byte offset of the line following a number of rows skipped after the header of a csv.
+
+        The rows are skipped by counting their line breaks by blocks of bytes, without being parsed.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file.
+
+        n_rows_skipped : int
+            Number of rows to be skipped after the header.
+
+        block_size : int
+            Number of bytes read at a time.
+
+        Returns
+        ----------
+        start_data : int
+            Byte offset of the start of the first line not skipped, or the size of the file if it has fewer rows.
+        """
+        with open(path_csv, "rb") as file:
+            file.readline()
+            start_data = file.tell()
+            n_line_breaks = n_rows_skipped
+            while n_line_breaks:
+                block = file.read(block_size)
+                if not block:
+                    break
+                # Case of the last row skipped ending in the current block.
+                if block.count(b"\n") >= n_line_breaks:
+                    i_byte = -1
+                    for _ in range(n_line_breaks):
+                        i_byte = block.index(b"\n", i_byte + 1)
+                    return start_data + i_byte + 1
+                n_line_breaks -= block.count(b"\n")
+                start_data += len(block)
+
+        return start_data
+
+    @staticmethod
+    def get_first_time(path_csv, start):
+        """Function to read the time of the line starting at a given byte offset of a Macular csv.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file to be read.
+
+        start : int
+            Byte offset of the start of the line.
+
+        Returns
+        ----------
+        time : float
+            Time of the line read.
+        """
+        with open(path_csv, "rb") as file:
+            file.seek(start)
+            line = file.readline()
+
+        return pd.read_csv(io.BytesIO(line), header=None, usecols=[0]).iloc[0, 0]
+
+    @staticmethod
+    def selecting_byte_ranges(path_csv, list_ranges, transient, end):
+        """Function to remove the ranges whose rows are all in the transient or all after the end of the simulation.
+
+        The csv being sorted by time, a range only contains rows of the transient if the first row of the next range is
+        still in the transient. Likewise, it only contains rows after the end if its first row is after the end.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file split into ranges.
+
+        list_ranges : list of tuple
+            List of the (start, stop) byte offsets of each range.
+
+        transient : float
+            Duration at the start of the simulation to be removed in seconds.
+
+        end : float or str
+            Time at which the data is cut. If this time is ‘max’ then no cut is made.
+
+        Returns
+        ----------
+        list_ranges_selected : list of tuple
+            List of the (start, stop) byte offsets of the ranges to be parsed.
+        """
+        list_first_times = [ParallelCsvParser.get_first_time(path_csv, start) for start, _ in list_ranges]
+        list_first_times += [np.inf]
+
+        return [list_ranges[i] for i in range(len(list_ranges))
+                if list_first_times[i + 1] > transient and (end == "max" or list_first_times[i] <= end)]
+
+    @staticmethod
+    def reading_byte_range(path_csv, byte_range, csv_header):
+        """Function reading the rows of a byte range of a Macular csv.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file to be read.
+
+        byte_range : tuple
+            The (start, stop) byte offsets of the range to be read.
+
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv giving the names of its columns and those to be read.
+
+        Returns
+        ----------
+        values : np.ndarray
+            2D array of the values of the columns read for each row of the range.
+        """
+        with open(path_csv, "rb") as file:
+            file.seek(byte_range[0])
+            bytes_range = file.read(byte_range[1] - byte_range[0])
+
+        return pd.read_csv(io.BytesIO(bytes_range), header=None, names=csv_header.columns,
+                           usecols=csv_header.usecols).to_numpy()
+
+    @staticmethod
+    def cropping_times(time, transient, end):
+        """Function to select the time steps between the transient and the end of the simulation.
+
+        Parameters
+        ----------
+        time : np.ndarray
+            Times of the rows of the csv.
+
+        transient : float
+            Duration at the start of the simulation to be removed in seconds.
+
+        end : float or str
+            Time at which the data is cut. If this time is ‘max’ then no cut is made.
+
+        Returns
+        ----------
+        time_kept : np.ndarray
+            Boolean mask of the rows kept.
+        """
+        time_kept = time >= transient
+        if end != "max":
+            time_kept &= time <= end
+
+        return time_kept
+
+    @staticmethod
+    def counting_rows(path_csv, byte_range, transient, end):
+        """Function counting the rows of a byte range of a Macular csv kept between the transient and the end in a
+        worker process.
+
+        If the first and the last rows of the range are kept, all its rows are kept and they are counted from their line
+        breaks without being parsed. Otherwise, only the ‘Time’ column of the range is parsed.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file.
+
+        byte_range : tuple
+            The (start, stop) byte offsets of the range.
+
+        transient : float
+            Duration at the start of the simulation to be removed in seconds.
+
+        end : float or str
+            Time at which the data is cut. If this time is ‘max’ then no cut is made.
+
+        Returns
+        ----------
+        n_rows : int
+            Number of rows of the range kept.
+        """
+        with open(path_csv, "rb") as file:
+            file.seek(byte_range[0])
+            bytes_range = file.read(byte_range[1] - byte_range[0]).rstrip(b"\r\n")
+
+        # Case of a range whose first and last rows are kept.
+        bytes_first_last = bytes_range[:bytes_range.find(b"\n") + 1] + bytes_range[bytes_range.rfind(b"\n") + 1:]
+        time_first_last = pd.read_csv(io.BytesIO(bytes_first_last), header=None, usecols=[0]).to_numpy()[:, 0]
+        if ParallelCsvParser.cropping_times(time_first_last, transient, end).all():
+            return bytes_range.count(b"\n") + 1
+
+        time = pd.read_csv(io.BytesIO(bytes_range), header=None, usecols=[0]).to_numpy()[:, 0]
+
+        return int(ParallelCsvParser.cropping_times(time, transient, end).sum())
+
+    @staticmethod
+    def parse_byte_range(path_csv, byte_range, csv_header, i_time, n_rows, transient, end, dict_arrays):
+        """Function parsing a byte range of a Macular csv in a worker process.
+
+        The rows of the range are cropped between the transient and the end of the simulation. The columns of each
+        measurement are then written at the numpy coordinates of their cells in the memory-mapped arrays, from the time
+        offset of the range.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file to be parsed.
+
+        byte_range : tuple
+            The (start, stop) byte offsets of the range to be parsed.
+
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv shared by all the ranges.
+
+        i_time : int
+            Time offset of the first row of the range kept in the arrays of the measurements.
+
+        n_rows : int
+            Number of rows of the range kept, counted before the parsing.
+
+        transient : float
+            Duration at the start of the simulation to be removed in seconds.
+
+        end : float or str
+            Time at which the data is cut. If this time is ‘max’ then no cut is made.
+
+        dict_arrays : dict of tuple
+            Dictionary associating each measurement with the path, the shape and the dtype of its memory-mapped array.
+
+        Returns
+        ----------
+        time : np.ndarray
+            Times of the rows of the range kept.
+
+        Raises
+        ----------
+        ValueError
+            The value error is raised if the number of rows kept differs from the number of rows counted.
+        """
+        values = ParallelCsvParser.reading_byte_range(path_csv, byte_range, csv_header)
+
+        # Cropping of the time steps between the transient and the end of the simulation.
+        time_kept = ParallelCsvParser.cropping_times(values[:, 0], transient, end)
+        time = values[time_kept, 0]
+        values = values[time_kept, 1:]
+        if values.shape[0] != n_rows:
+            raise ValueError(f"{values.shape[0]} rows parsed in the byte range {byte_range} of {path_csv} instead of "
+                             f"the {n_rows} rows counted.")
+        if n_rows == 0:
+            return time
+
+        for measurement, (columns, rows, columns_numpy) in csv_header.scatter_map.items():
+            path_file, shape, dtype = dict_arrays[measurement]
+            measurement_array = np.memmap(path_file, dtype=dtype, mode="r+", shape=shape)
+            measurement_array[rows, columns_numpy, i_time:i_time + n_rows] = values[:, columns].T
+            del measurement_array
+
+        return time
+
+    @staticmethod
+    def parse_macular_csv(path_csv, csv_header, transient, end, shape, n_workers, dtype=np.float64,
+                          n_rows_skipped=0):
+        """Function parsing a Macular csv with a pool of worker processes.
+
+        The arrays of the measurements are memory-maps of temporary files created in ‘/dev/shm’ when it exists, so
+        that they are held in shared memory, and in the temporary directory otherwise. The files are removed at the end
+        of the parsing, the arrays keeping their mapping.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file to be parsed.
+
+        csv_header : MacularCsvHeader
+            Schema of the header of the csv.
+
+        transient : float
+            Duration at the start of the simulation to be removed in seconds.
+
+        end : float or str
+            Time at which the data is cut. If this time is ‘max’ then no cut is made.
+
+        shape : tuple
+            Spatial shape of the arrays of the measurements in the form of : (n_cells_y, n_cells_x).
+
+        n_workers : int
+            Number of worker processes.
+
+        dtype : np.dtype
+            Type of the arrays of the measurements.
+
+        n_rows_skipped : int
+            Number of rows of the transient at the start of the csv to be skipped without being parsed. The first time
+            read after these rows must still belong to the transient, otherwise no row is skipped.
+
+        Returns
+        ----------
+        dict_measurements_array : dict of np.ndarray
+            Dictionary associating each measurement with its array of size (n_cells_y, n_cells_x, n_time).
+
+        temporal_index : np.ndarray
+            Temporal index of the rows kept re-centred on the transient.
+        """
+        # Skip of the first rows of the transient, checked with the first time read after them.
+        start_data = None
+        if n_rows_skipped:
+            start_data = ParallelCsvParser.skipping_rows(path_csv, n_rows_skipped)
+            if start_data >= os.path.getsize(path_csv) or ParallelCsvParser.get_first_time(
+                    path_csv, start_data) >= transient:
+                print(f"Row after skipping {n_rows_skipped} rows is not in the transient, no row skipped.")
+                start_data = None
+
+        # Splitting of the csv into more ranges than workers to balance their load.
+        list_ranges = ParallelCsvParser.split_byte_ranges(path_csv, 4 * n_workers, start_data)
+        list_ranges = ParallelCsvParser.selecting_byte_ranges(path_csv, list_ranges, transient, end)
+
+        dir_arrays = tempfile.mkdtemp(prefix="macular_csv_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                # Time offset of each range from the number of rows kept in the previous ones.
+                print(f"Counting rows of {len(list_ranges)} ranges with {n_workers} workers...", end="")
+                list_n_rows = list(executor.map(ParallelCsvParser.counting_rows, [path_csv] * len(list_ranges),
+                                                list_ranges, [transient] * len(list_ranges),
+                                                [end] * len(list_ranges)))
+                list_i_time = np.concatenate([[0], np.cumsum(list_n_rows, dtype=int)]).tolist()
+                print("Done!")
+
+                shape = (shape[0], shape[1], list_i_time[-1])
+                print(f"Measurements : {csv_header.measurements}")
+                print(f"Implementation of shared array of size {shape[0]}x{shape[1]}x{shape[2]}...", end="")
+                dict_arrays = {measurement: (os.path.join(dir_arrays, f"{i_measurement}.dat"), shape, np.dtype(dtype))
+                               for i_measurement, measurement in enumerate(csv_header.measurements)}
+                dict_measurements_array = {measurement: np.asarray(np.memmap(
+                    path_file, dtype=dtype_array, mode="w+", shape=shape_array) if shape_array[2] else np.empty(
+                    shape_array, dtype=dtype_array)) for measurement, (path_file, shape_array, dtype_array)
+                    in dict_arrays.items()}
+                print("Done!")
+
+                print(f"Parsing of {len(list_ranges)} ranges with {n_workers} workers...", end="")
+                list_futures = [executor.submit(ParallelCsvParser.parse_byte_range, path_csv, byte_range, csv_header,
+                                                i_time, n_rows, transient, end, dict_arrays)
+                                for byte_range, i_time, n_rows in zip(list_ranges, list_i_time, list_n_rows)]
+                list_times = [future.result() for future in list_futures]
+                print("Done!")
+        finally:
+            # Removal of the files, whose pages remain mapped by the arrays.
+            shutil.rmtree(dir_arrays, ignore_errors=True)
+
+        return dict_measurements_array, np.concatenate(list_times or [np.array([])]) - transient
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import shutil
+
+from src.data_manager.PybStore import PybStore
+
+
+class PreprocessingCache:
+    """Content-addressed cache of preprocessed objects.
+
+    Each entry of the cache is a pyb store whose name is a hash of the csv used to create the object and of the
+    configuration dictionaries used to process it. The csv is identified by its name, its size, its date of
+    modification and a digest of its first and last bytes, so that a modified csv never matches a previous entry.
+    Several preprocessing variants of the same simulation can thus coexist in the cache.
+
+    The raw data and index extracted from a csv, before any preprocessing, are also stored in their own entry. They are
+    shared by all the preprocessing variants of a simulation, so that changing the preprocessing never re-parses the
+    csv.
+    The output of each process of the preprocessing is then stored in an entry chained to the entry of the previous
+    process, containing only the arrays created or replaced by the process.
+
+    The cache has a maximum size in bytes. When it is exceeded, the least recently used entries are removed.
+
+    The cache is enabled by the ‘MACULAR_CACHE_DIR’ environment variable giving the path of its directory. Its maximum
+    size can be given in bytes by the ‘MACULAR_CACHE_MAX_BYTES’ environment variable, otherwise it is unlimited.
+
+    Attributes
+    ----------
+    path_cache : str
+        Path of the directory of the cache.
+
+    max_bytes : int or None
+        Maximum size of the cache in bytes. The size is unlimited if it is None.
+    """
+
+    def __init__(self, path_cache, max_bytes=None):
+        """Init function to make a PreprocessingCache object.
+
+        Parameters
+        ----------
+        path_cache : str
+            Path of the directory of the cache. The directory is created if it does not exist.
+
+        max_bytes : int or None
+            Maximum size of the cache in bytes. The size is unlimited if it is None.
+        """
+        self._path_cache = path_cache
+        self._max_bytes = max_bytes
+        os.makedirs(path_cache, exist_ok=True)
+
+    @property
+    def path_cache(self):
+        """Getter for the path_cache attribute."""
+        return self._path_cache
+
+    @property
+    def max_bytes(self):
+        """Getter for the max_bytes attribute."""
+        return self._max_bytes
+
+    @classmethod
+    def from_environment(cls):
+        """Function to create the cache configured by the environment variables.
+
+        Returns
+        ----------
+        preprocessing_cache : PreprocessingCache or None
+            Cache in the directory of the ‘MACULAR_CACHE_DIR’ environment variable or None if it is not defined.
+        """
+        if not os.environ.get("MACULAR_CACHE_DIR"):
+            return None
+
+        max_bytes = os.environ.get("MACULAR_CACHE_MAX_BYTES")
+
+        return cls(os.environ["MACULAR_CACHE_DIR"], int(max_bytes) if max_bytes else None)
+
+    @staticmethod
+    def csv_fingerprint(path_csv):
+        """Function to compute the fingerprint of a csv without reading it entirely.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file.
+
+        Returns
+        ----------
+        fingerprint : dict
+            Dictionary containing the name, the size, the date of modification in nanoseconds and the digest of the
+            first and last megabytes of the csv.
+        """
+        stat = os.stat(path_csv)
+        digest = hashlib.sha256()
+        with open(path_csv, "rb") as csv_file:
+            digest.update(csv_file.read(2 ** 20))
+            csv_file.seek(max(stat.st_size - 2 ** 20, 0))
+            digest.update(csv_file.read(2 ** 20))
+
+        return {"name": os.path.basename(path_csv), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "digest": digest.hexdigest()}
+
+    @staticmethod
+    def hash_configuration(*configurations):
+        """Function to hash configurations made of dictionaries, lists and scalars.
+
+        Parameters
+        ----------
+        configurations : dict or list or str or int or float
+            Configurations to be hashed together.
+
+        Returns
+        ----------
+        key : str
+            Hexadecimal hash of the configurations, independent of the order of the keys of the dictionaries.
+        """
+        return hashlib.sha256(json.dumps(configurations, sort_keys=True, default=repr).encode()).hexdigest()
+
+    @staticmethod
+    def cleaning_dict_simulation(dict_simulation):
+        """Function to remove the parameters of a simulation dictionary that do not affect the data.
+
+        Parameters
+        ----------
+        dict_simulation : dict
+            Dictionary containing all the parameters of the Macular simulations.
+
+        Returns
+        ----------
+        dict_simulation_cleaned : dict
+            Simulation dictionary without the paths and the parameters of the reading of the csv.
+        """
+        return {parameter: value for parameter, value in dict_simulation.items()
+                if parameter not in ("path_csv", "path_pyb", "n_workers", "skip_transient_rows",
+                                     "compression")}
+
+    def make_key(self, path_csv, dict_simulation, dict_preprocessing):
+        """Function to make the key of the entry of an object processed from a csv and configuration dictionaries.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file containing the Macular simulation data.
+
+        dict_simulation : dict
+            Dictionary containing all the parameters of the Macular simulations.
+
+        dict_preprocessing : dict
+            Dictionary for configuring the various processes to be implemented on the simulation data.
+
+        Returns
+        ----------
+        key : str
+            Key of the entry in the cache.
+        """
+        return self.hash_configuration(self.csv_fingerprint(path_csv), self.cleaning_dict_simulation(dict_simulation),
+                                       dict_preprocessing)
+
+    def make_raw_key(self, path_csv, dict_simulation):
+        """Function to make the key of the entry of the raw data and index extracted from a csv, before any
+        preprocessing.
+
+        Parameters
+        ----------
+        path_csv : str
+            The path of the csv file containing the Macular simulation data.
+
+        dict_simulation : dict
+            Dictionary containing all the parameters of the Macular simulations.
+
+        Returns
+        ----------
+        key : str
+            Key of the raw entry in the cache, distinct from the keys of the preprocessed entries.
+        """
+        return self.hash_configuration(self.csv_fingerprint(path_csv), self.cleaning_dict_simulation(dict_simulation),
+                                       "raw")
+
+    def make_step_key(self, key_upstream, preprocess, parameters):
+        """Function to make the key of the entry of the output of a process chained after upstream entries.
+
+        Parameters
+        ----------
+        key_upstream : str
+            Key of the entry of the previous process or of the raw entry for the first process.
+
+        preprocess : str
+            Name of the process.
+
+        parameters : dict or list or str or int or float
+            Parameters of the process.
+
+        Returns
+        ----------
+        key : str
+            Key of the entry of the process, which changes with its parameters and with those of all the upstream
+            entries.
+        """
+        return self.hash_configuration(key_upstream, preprocess, parameters)
+
+    def path_entry(self, key):
+        """Getter of the path of the pyb store of an entry."""
+        return os.path.join(self.path_cache, f"{key}.pybd")
+
+    def get(self, cls, key):
+        """Function to load the object of an entry of the cache.
+
+        The arrays of the object are copy-on-write memory-maps of the entry, which can be modified without modifying
+        the entry. The entry is marked as the most recently used.
+
+        Parameters
+        ----------
+        cls : type
+            Class of the object to be loaded.
+
+        key : str
+            Key of the entry in the cache.
+
+        Returns
+        ----------
+        obj : object or None
+            Object of the entry or None if there is no entry for this key.
+        """
+        try:
+            obj = PybStore.load(cls, self.path_entry(key), mmap_mode="c")
+        except FileNotFoundError:
+            return None
+        os.utime(self.path_entry(key))
+
+        return obj
+
+    def put(self, key, obj):
+        """Function to store an object in an entry of the cache.
+
+        The entry is written in a temporary directory renamed at the end of the writing, so that an incomplete entry is
+        never read. The least recently used entries are then removed if the cache exceeds its maximum size.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry in the cache.
+
+        obj : object
+            Object to be stored.
+        """
+        path_entry_tmp = f"{self.path_entry(key)}.tmp{os.getpid()}"
+        PybStore.save(obj, path_entry_tmp)
+        try:
+            os.replace(path_entry_tmp, self.path_entry(key))
+        except OSError:
+            # Case of an entry already stored by another process.
+            shutil.rmtree(path_entry_tmp, ignore_errors=True)
+        self.eviction(key)
+
+    @staticmethod
+    def entry_size(path_entry):
+        """Function to compute the size in bytes of an entry of the cache."""
+        return sum(os.path.getsize(os.path.join(path_directory, file_name))
+                   for path_directory, _, list_files in os.walk(path_entry) for file_name in list_files)
+
+    def eviction(self, key_kept=None):
+        """Function to remove the least recently used entries until the cache no longer exceeds its maximum size.
+
+        Parameters
+        ----------
+        key_kept : str or None
+            Key of an entry never removed, typically the one that has just been stored.
+        """
+        if self.max_bytes is None:
+            return
+
+        list_entries = [entry.path for entry in os.scandir(self.path_cache) if entry.name.endswith(".pybd")]
+        list_entries.sort(key=lambda path_entry: os.stat(path_entry).st_mtime_ns)
+        dict_sizes = {path_entry: self.entry_size(path_entry) for path_entry in list_entries}
+        total_bytes = sum(dict_sizes.values())
+
+        for path_entry in list_entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if key_kept is not None and path_entry == self.path_entry(key_kept):
+                continue
+            shutil.rmtree(path_entry, ignore_errors=True)
+            total_bytes -= dict_sizes[path_entry]
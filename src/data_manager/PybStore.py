@@ -0,0 +1,445 @@
+import mmap
+import os
+import pickle
+import re
+import struct
+
+import numpy as np
+
+from src.data_manager.CompressedArray import CompressedArray
+
+
+class PybStore:
+    """Class containing all the functions enabling the persistence of objects in pyb stores.
+
+    A pyb store is a directory, recognisable by its ‘.pybd’ extension, in which each array of the data and index
+    dictionaries of an object is saved in its own raw ‘.npy’ file. The other attributes of the object are pickled in a
+    small metadata file along with a manifest describing the file, the shape and the dtype of each array.
+
+    When a pyb store is loaded, the arrays are memory-mapped in read-only mode instead of being read. Their values are
+    only paged in from the disk when they are accessed, so that opening a large simulation costs only the reading of
+    its metadata.
+
+    The values of the data and index dictionaries that cannot be memory-mapped (lists or arrays of objects) are kept in
+    the metadata file.
+
+    The 3-dimensional numeric arrays of a pyb store can also be saved compressed by blocks of time steps in ‘.blk’
+    files, with the codec given as input (‘zlib’ or ‘lzma’). They are then loaded as CompressedArray, whose blocks are
+    only decompressed when the time steps they contain are accessed.
+
+    The pyb files, in which objects are pickled as a whole, end with a small header that can be read without reading
+    the pickled object. This header contains the attributes of the object other than its arrays, as well as the shape
+    and dtype of each array. It is placed after the pickled object, followed by its size in bytes and a magic number,
+    so that the pyb files can still be read with pickle.load.
+
+    The pyb files with the ‘.pyb5’ extension are pickled with the protocol 5. The buffers of the arrays are then not
+    copied in the pickle but written after it, out-of-band, in regions aligned on 64 bytes whose positions are given in
+    the header. When such a pyb file is loaded, the arrays are directly mapped on these regions in copy-on-write mode,
+    without copying their buffers. These pyb files can only be read with the load_file function.
+    """
+    magic_header = b"PYBHEAD1"
+    alignment = 64
+
+    @staticmethod
+    def is_pyb_store(path_pyb):
+        """Function to determine whether a pyb path designates a pyb store.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file or of the pyb store.
+
+        Returns
+        ----------
+        is_pyb_store : bool
+            Returns True if the path has the ‘.pybd’ extension of the pyb stores.
+        """
+        return os.path.splitext(os.path.normpath(path_pyb))[1] == ".pybd"
+
+    @staticmethod
+    def is_out_of_band(path_pyb):
+        """Function to determine whether a pyb path designates a pyb file with out-of-band buffers.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file.
+
+        Returns
+        ----------
+        is_out_of_band : bool
+            Returns True if the path has the ‘.pyb5’ extension of the pyb files pickled with the protocol 5.
+        """
+        return os.path.splitext(path_pyb)[1] == ".pyb5"
+
+    @staticmethod
+    def array_file_name(name_dict, name_array):
+        """Function to generate the relative path of the ‘.npy’ file of an array of a pyb store.
+
+        Parameters
+        ----------
+        name_dict : str
+            Name of the dictionary containing the array (‘data’ or ‘index’).
+
+        name_array : str
+            Name of the array in its dictionary.
+
+        Returns
+        ----------
+        file_name : str
+            Path of the ‘.npy’ file relative to the pyb store.
+        """
+        return f"{name_dict}/{re.sub(r'[^A-Za-z0-9_.-]', '_', name_array)}.npy"
+
+    @staticmethod
+    def is_mapped_on(array, path_file):
+        """Function to determine whether an array is the memory-map of the whole array of a given ‘.npy’ file.
+
+        The slices of a memory-map are also memory-maps of its file, but they only cover part of its array. The array
+        is therefore only considered as mapped on the file if it is the memory-map created when loading the file, and
+        not a view of it, with the shape, the dtype and the offset given by the header of the file. Copy-on-write
+        memory-maps are not considered as mapped on their file, as their modifications are not written to it.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array to be checked.
+
+        path_file : str
+            Path of the ‘.npy’ file.
+
+        Returns
+        ----------
+        is_mapped_on : bool
+            Returns True if the array is a memory-map of the whole array of the file.
+        """
+        if not (isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap) and array.mode != "c" and
+                array.filename is not None and os.path.abspath(array.filename) == os.path.abspath(path_file)):
+            return False
+
+        # Comparison with the description of the array in the header of the file.
+        try:
+            with open(path_file, "rb") as npy_file:
+                reading_header = {(1, 0): np.lib.format.read_array_header_1_0,
+                                  (2, 0): np.lib.format.read_array_header_2_0}.get(np.lib.format.read_magic(npy_file))
+                if reading_header is None:
+                    return False
+                shape, fortran_order, dtype = reading_header(npy_file)
+                offset = npy_file.tell()
+        except (OSError, ValueError):
+            return False
+
+        return (array.shape == shape and array.dtype == dtype and array.offset == offset and
+                (array.flags.f_contiguous if fortran_order else array.flags.c_contiguous))
+
+    @staticmethod
+    def save(obj, path_pyb, names_dicts=("_data", "_index"), compression=None, dict_names_arrays=None):
+        """Function to save an object in a pyb store.
+
+        Arrays already memory-mapped on their own file of the pyb store, or already compressed in it with the same
+        codec, are not written again. The other arrays are written in temporary files renamed at the end of their
+        writing, so that objects memory-mapping the previous version of a file keep a valid view. The metadata file is
+        written last.
+
+        If the names of the arrays to be saved are given, only these arrays and those missing from the pyb store are
+        written. The files of the other arrays are kept as they are and only the metadata file is updated, so that
+        appending or replacing an array in an existing pyb store only costs the writing of this array.
+
+        Parameters
+        ----------
+        obj : object
+            Object to be saved.
+
+        path_pyb : str
+            Path of the pyb store.
+
+        names_dicts : tuple of str
+            Names of the attributes of the object containing the dictionaries of arrays to be saved in ‘.npy’ files.
+
+        compression : str or None
+            Name of the codec (‘zlib’ or ‘lzma’) of the 3-dimensional numeric arrays, saved compressed in ‘.blk’ files.
+            If it is None, all the arrays are saved uncompressed.
+
+        dict_names_arrays : dict of list or None
+            Dictionary associating the name of a dictionary of arrays with the names of its arrays to be written. If it
+            is None, all the arrays of the object are written.
+        """
+        dict_attributes = obj.__dict__.copy()
+        manifest, manifest_saved = {}, {}
+
+        # Reading of the manifest of the pyb store to keep the files of the arrays that are not written.
+        if dict_names_arrays is not None and os.path.exists(f"{path_pyb}/metadata.pkl"):
+            with open(f"{path_pyb}/metadata.pkl", "rb") as metadata_file:
+                manifest_saved = pickle.load(metadata_file)["manifest"]
+
+        for name_dict in names_dicts:
+            os.makedirs(f"{path_pyb}/{name_dict.strip('_')}", exist_ok=True)
+            manifest[name_dict], dict_attributes[name_dict] = {}, {}
+            for name_array, array in getattr(obj, name_dict).items():
+                # Case of values that cannot be memory-mapped, the others being replaced in the metadata by their file.
+                dict_attributes[name_dict][name_array] = array
+                if not isinstance(array, (np.ndarray, CompressedArray)) or array.dtype.hasobject:
+                    continue
+
+                # Case of an array of the pyb store that is not to be written.
+                if (name_array in manifest_saved.get(name_dict, {}) and
+                        name_array not in dict_names_arrays.get(name_dict, ())):
+                    manifest[name_dict][name_array] = manifest_saved[name_dict][name_array]
+                else:
+                    manifest[name_dict][name_array] = PybStore.writing_array(array, path_pyb, name_dict, name_array,
+                                                                             compression)
+                dict_attributes[name_dict][name_array] = None
+
+        with open(f"{path_pyb}/metadata.pkl.tmp", "wb") as metadata_file:
+            pickle.dump({"attributes": dict_attributes, "manifest": manifest}, metadata_file)
+        os.replace(f"{path_pyb}/metadata.pkl.tmp", f"{path_pyb}/metadata.pkl")
+
+        # Removal of the files of arrays that are no longer in the object.
+        set_files = {dict_array["file"] for name_dict in manifest for dict_array in manifest[name_dict].values()}
+        for name_dict in names_dicts:
+            for file_name in os.listdir(f"{path_pyb}/{name_dict.strip('_')}"):
+                if f"{name_dict.strip('_')}/{file_name}" not in set_files:
+                    os.remove(f"{path_pyb}/{name_dict.strip('_')}/{file_name}")
+
+    @staticmethod
+    def writing_array(array, path_pyb, name_dict, name_array, compression=None):
+        """Function to write an array in its own file of a pyb store.
+
+        Parameters
+        ----------
+        array : np.ndarray or CompressedArray
+            Array to be written.
+
+        path_pyb : str
+            Path of the pyb store.
+
+        name_dict : str
+            Name of the attribute of the object containing the dictionary of the array.
+
+        name_array : str
+            Name of the array in its dictionary.
+
+        compression : str or None
+            Name of the codec of the array if it is a 3-dimensional numeric array to be compressed.
+
+        Returns
+        ----------
+        dict_array : dict
+            Description of the array in the manifest, with its file, its shape and its dtype, as well as its codec and
+            its blocks if it is compressed.
+        """
+        file_name = PybStore.array_file_name(name_dict.strip("_"), name_array)
+
+        # Case of the measurement arrays compressed by blocks of time steps.
+        if compression is not None and array.ndim == 3 and array.dtype.kind in "biuf":
+            file_name = f"{file_name[:-4]}.blk"
+            path_file = f"{path_pyb}/{file_name}"
+            if not (isinstance(array, CompressedArray) and array.codec == compression and
+                    array.is_stored_in(path_file)):
+                array = CompressedArray.write(np.asarray(array), path_file, compression)
+
+            return {"file": file_name, "shape": array.shape, "dtype": array.dtype.str, "codec": array.codec,
+                    "block_size": array.block_size, "blocks": array.list_blocks}
+
+        path_file = f"{path_pyb}/{file_name}"
+        if not PybStore.is_mapped_on(array, path_file):
+            np.save(f"{path_file[:-4]}.tmp.npy", np.asarray(array))
+            os.replace(f"{path_file[:-4]}.tmp.npy", path_file)
+
+        return {"file": file_name, "shape": array.shape, "dtype": array.dtype.str}
+
+    @staticmethod
+    def load(cls, path_pyb, mmap_mode="r"):
+        """Function to load an object saved in a pyb store with memory-mapped arrays.
+
+        Parameters
+        ----------
+        cls : type
+            Class of the object to be loaded.
+
+        path_pyb : str
+            Path of the pyb store.
+
+        mmap_mode : str
+            Mode of the memory-maps, read-only (‘r’) by default or copy-on-write (‘c’) to allow modifications of the
+            arrays that are not written in the pyb store.
+
+        Returns
+        ----------
+        obj : object
+            Object loaded whose arrays are memory-maps of the ‘.npy’ files of the pyb store or CompressedArray of its
+            ‘.blk’ files.
+        """
+        with open(f"{path_pyb}/metadata.pkl", "rb") as metadata_file:
+            metadata = pickle.load(metadata_file)
+
+        for name_dict in metadata["manifest"]:
+            for name_array, dict_array in metadata["manifest"][name_dict].items():
+                path_file = f"{path_pyb}/{dict_array['file']}"
+                if "codec" in dict_array:
+                    metadata["attributes"][name_dict][name_array] = CompressedArray(
+                        path_file, dict_array["shape"], dict_array["dtype"], dict_array["codec"],
+                        dict_array["block_size"], dict_array["blocks"])
+                else:
+                    metadata["attributes"][name_dict][name_array] = np.load(path_file, mmap_mode=mmap_mode)
+
+        obj = cls.__new__(cls)
+        obj.__dict__.update(metadata["attributes"])
+
+        return obj
+
+    @staticmethod
+    def make_header(obj, names_dicts=("_data", "_index")):
+        """Function to make the header of an object describing its arrays without containing them.
+
+        Parameters
+        ----------
+        obj : object
+            Object whose header is to be made.
+
+        names_dicts : tuple of str
+            Names of the attributes of the object containing the dictionaries of arrays.
+
+        Returns
+        ----------
+        header : dict
+            Dictionary containing the attributes of the object other than the dictionaries of arrays (‘attributes’ key)
+            and the shape and dtype of each array of these dictionaries (‘manifest’ key).
+        """
+        header = {"attributes": {name: value for name, value in obj.__dict__.items() if name not in names_dicts},
+                  "manifest": {}}
+        for name_dict in names_dicts:
+            header["manifest"][name_dict] = {
+                name_array: {"shape": getattr(array, "shape", None),
+                             "dtype": array.dtype.str if isinstance(getattr(array, "dtype", None), np.dtype) else None}
+                for name_array, array in getattr(obj, name_dict).items()}
+
+        return header
+
+    @staticmethod
+    def dump(obj, path_pyb, names_dicts=("_data", "_index")):
+        """Function to pickle an object in a pyb file followed by its header.
+
+        If the path has the ‘.pyb5’ extension, the object is pickled with the protocol 5 and the buffers of its arrays
+        are written out-of-band in aligned regions between the pickle and the header.
+
+        Parameters
+        ----------
+        obj : object
+            Object to be saved.
+
+        path_pyb : str
+            Path of the pyb file.
+
+        names_dicts : tuple of str
+            Names of the attributes of the object containing the dictionaries of arrays, which are not in the header.
+        """
+        header = PybStore.make_header(obj, names_dicts)
+
+        # Writing in a temporary file renamed at the end, so that the arrays mapped on the previous pyb file stay valid.
+        with open(f"{path_pyb}.tmp", "wb") as pyb_file:
+            # Case of a pickle whose buffers are written out-of-band after it.
+            if PybStore.is_out_of_band(path_pyb):
+                list_buffers = []
+                pickle.dump(obj, pyb_file, protocol=5, buffer_callback=list_buffers.append)
+                header["buffers"] = PybStore.write_aligned_buffers(pyb_file, list_buffers)
+            else:
+                pickle.dump(obj, pyb_file)
+            bytes_header = pickle.dumps(header)
+            pyb_file.write(bytes_header + struct.pack("<Q", len(bytes_header)) + PybStore.magic_header)
+        os.replace(f"{path_pyb}.tmp", path_pyb)
+
+    @staticmethod
+    def write_aligned_buffers(pyb_file, list_buffers):
+        """Function to write out-of-band buffers in a file, each one starting at an offset aligned on 64 bytes.
+
+        Parameters
+        ----------
+        pyb_file : io.BufferedWriter
+            File opened in binary writing mode, positioned at the end of the pickle.
+
+        list_buffers : list of pickle.PickleBuffer
+            Out-of-band buffers of the pickle.
+
+        Returns
+        ----------
+        list_regions : list of tuple
+            List of the offset and of the size in bytes of each buffer in the file.
+        """
+        list_regions = []
+        for buffer in list_buffers:
+            pyb_file.write(bytes(-pyb_file.tell() % PybStore.alignment))
+            with buffer.raw() as raw_buffer:
+                list_regions.append((pyb_file.tell(), raw_buffer.nbytes))
+                pyb_file.write(raw_buffer)
+
+        return list_regions
+
+    @staticmethod
+    def load_file(path_pyb):
+        """Function to load an object pickled in a pyb file.
+
+        The arrays of a pyb file with out-of-band buffers are mapped on the file in copy-on-write mode, so that they
+        can be modified without modifying the file.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file.
+
+        Returns
+        ----------
+        obj : object
+            Object loaded.
+        """
+        if not PybStore.is_out_of_band(path_pyb):
+            with open(path_pyb, "rb") as pyb_file:
+                return pickle.load(pyb_file)
+
+        header = PybStore.read_header(path_pyb)
+        with open(path_pyb, "rb") as pyb_file:
+            memory_map = memoryview(mmap.mmap(pyb_file.fileno(), 0, access=mmap.ACCESS_COPY))
+
+        return pickle.loads(memory_map, buffers=[memory_map[offset:offset + size]
+                                                 for offset, size in header["buffers"]])
+
+    @staticmethod
+    def read_header(path_pyb):
+        """Function to read the header of a pyb file or of a pyb store without reading its arrays.
+
+        Parameters
+        ----------
+        path_pyb : str
+            Path of the pyb file or of the pyb store.
+
+        Returns
+        ----------
+        header : dict or None
+            Dictionary containing the attributes of the object other than the dictionaries of arrays (‘attributes’ key)
+            and the description of each array of these dictionaries (‘manifest’ key). The header of a pyb file with
+            out-of-band buffers also contains the position of its buffers (‘buffers’ key). None is returned for pyb
+            files saved without header.
+        """
+        # Case of a pyb store whose metadata file is the header.
+        if PybStore.is_pyb_store(path_pyb):
+            with open(f"{path_pyb}/metadata.pkl", "rb") as metadata_file:
+                metadata = pickle.load(metadata_file)
+            for name_dict in metadata["manifest"]:
+                del metadata["attributes"][name_dict]
+
+            return metadata
+
+        with open(path_pyb, "rb") as pyb_file:
+            # Case of a pyb file too small to contain a header.
+            size = pyb_file.seek(0, os.SEEK_END)
+            if size < 16:
+                return None
+
+            # Reading of the size of the header and of the magic number at the end of the pyb file.
+            pyb_file.seek(size - 16)
+            size_header, magic_header = struct.unpack("<Q8s", pyb_file.read(16))
+            if magic_header != PybStore.magic_header or size_header > size - 16:
+                return None
+
+            pyb_file.seek(size - 16 - size_header)
+            return pickle.loads(pyb_file.read(size_header))
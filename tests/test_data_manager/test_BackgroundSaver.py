@@ -0,0 +1,108 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from src.data_manager.BackgroundSaver import BackgroundSaver
+
+
+class ObjectToSave:
+    def __init__(self):
+        self._data = {"VSDI": np.arange(10)}
+        self.name = "object"
+
+
+def pickling(obj, path_pyb):
+    with open(path_pyb, "wb") as pyb_file:
+        pickle.dump(obj, pyb_file)
+
+
+def test_shallow_copy():
+    obj = ObjectToSave()
+    obj_copy = BackgroundSaver.shallow_copy(obj)
+
+    # Case of arrays shared and dictionaries copied.
+    assert obj_copy._data is not obj._data
+    assert obj_copy._data["VSDI"] is obj._data["VSDI"]
+
+    # Case of an array replaced in the object but not in the copy.
+    obj._data["VSDI"] = np.zeros(3)
+    assert np.array_equal(obj_copy._data["VSDI"], np.arange(10))
+
+
+def test_submit_wait_saved(tmp_path):
+    path_pyb = f"{tmp_path}/object.pyb"
+    obj = ObjectToSave()
+    event = threading.Event()
+
+    # Case of a save carried out in the background.
+    def saving_function(obj_to_save):
+        event.wait()
+        pickling(obj_to_save, path_pyb)
+
+    future = BackgroundSaver.submit(path_pyb, saving_function, obj)
+    obj._data["VSDI"] = np.zeros(3)
+    assert not future.done()
+
+    # Case of the object saved as it was when the save was submitted.
+    event.set()
+    BackgroundSaver.wait_saved(path_pyb)
+    with open(path_pyb, "rb") as pyb_file:
+        assert np.array_equal(pickle.load(pyb_file)._data["VSDI"], np.arange(10))
+
+    # Case of a pyb file without pending saves.
+    BackgroundSaver.wait_saved(f"{tmp_path}/other.pyb")
+
+
+def test_pruning(tmp_path, capsys):
+    # The callbacks of a save are called by the writing thread before it starts the next save.
+    def waiting_callbacks():
+        BackgroundSaver.submit(f"{tmp_path}/other.pyb", lambda obj: None, ObjectToSave()).result()
+
+    # Case of a finished save unregistered without being waited for.
+    BackgroundSaver.submit(f"{tmp_path}/object.pyb", lambda obj: pickling(obj, f"{tmp_path}/object.pyb"),
+                           ObjectToSave())
+    waiting_callbacks()
+    assert os.path.abspath(f"{tmp_path}/object.pyb") not in BackgroundSaver._dict_pending_saves
+
+    # Case of a failed save reported and kept until it is waited for.
+    def saving_function_error(obj):
+        raise OSError("No space left on device")
+
+    BackgroundSaver.submit(f"{tmp_path}/object.pyb", saving_function_error, ObjectToSave())
+    waiting_callbacks()
+    assert "BACKGROUND SAVE FAILED" in capsys.readouterr().out
+    with pytest.raises(OSError):
+        BackgroundSaver.wait_saved(f"{tmp_path}/object.pyb")
+    assert os.path.abspath(f"{tmp_path}/object.pyb") not in BackgroundSaver._dict_pending_saves
+
+
+def test_flush(tmp_path):
+    # Case of all the saves waited for.
+    list_futures = [BackgroundSaver.submit(f"{tmp_path}/object{i}.pyb", lambda obj, i=i: pickling(
+        obj, f"{tmp_path}/object{i}.pyb"), ObjectToSave()) for i in range(3)]
+    BackgroundSaver.flush()
+    assert all(future.done() for future in list_futures)
+
+    # Case of an error raised again by the waiting.
+    def saving_function_error(obj):
+        raise OSError("No space left on device")
+
+    BackgroundSaver.submit(f"{tmp_path}/object.pyb", saving_function_error, ObjectToSave())
+    with pytest.raises(OSError):
+        BackgroundSaver.flush()
+    BackgroundSaver.flush()
+
+
+def test_wait_saved_writing_thread(tmp_path):
+    # Case of a saving function waiting for the saves of its own pyb file without blocking the writing thread.
+    def saving_function(obj):
+        BackgroundSaver.wait_saved(f"{tmp_path}/object.pyb")
+        pickling(obj, f"{tmp_path}/object.pyb")
+
+    BackgroundSaver.submit(f"{tmp_path}/object.pyb", saving_function, ObjectToSave()).result(timeout=10)
+    BackgroundSaver.wait_saved(f"{tmp_path}/object.pyb")
+    with open(f"{tmp_path}/object.pyb", "rb") as pyb_file:
+        assert np.array_equal(pickle.load(pyb_file)._data["VSDI"], np.arange(10))
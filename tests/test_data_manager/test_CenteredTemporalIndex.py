@@ -0,0 +1,57 @@
+import copy
+import pickle
+
+import numpy as np
+
+from src.data_manager.CenteredTemporalIndex import CenteredTemporalIndex
+
+# Temporal index of 50 time steps centered on the arrival times of the bar on 6 cells.
+index_test = np.linspace(0, 0.8, 50)
+list_time_center_test = [0.1 * i_cell for i_cell in range(6)]
+centered_index_correct = np.array([index_test - time_center for time_center in list_time_center_test])
+
+
+def test_row_computing():
+    centered_index = CenteredTemporalIndex(index_test, list_time_center_test)
+
+    # Case of a whole row.
+    assert np.array_equal(centered_index.row_computing(2), centered_index_correct[2])
+
+    # Case of a part of the temporal index and of a converted row.
+    assert np.array_equal(centered_index.row_computing(2, index_test[:3]), centered_index_correct[2, :3])
+    assert np.array_equal((centered_index * 1000).row_computing(2), centered_index_correct[2] * 1000)
+
+
+def test_getitem():
+    centered_index = CenteredTemporalIndex(index_test, list_time_center_test)
+    assert centered_index.shape == (6, 50) and centered_index.dtype == np.float64 and len(centered_index) == 6
+
+    # Case of the rows and values selected as in the 2D array.
+    for key in (3, -1, (4, 7), slice(1, 5, 2), (slice(None), 7), [0, 5], (np.array([True] * 3 + [False] * 3), 2),
+                (Ellipsis, slice(2, 9)), (1, slice(None, None, -1)), ([0, 1], 2), ([0, 1], [2, 3]),
+                ([[0], [5]], [2, 3, 4]), (np.array([True] * 3 + [False] * 3), [1, 2, 3])):
+        assert np.array_equal(centered_index[key], centered_index_correct[key])
+
+
+def test_array_ufunc():
+    centered_index = CenteredTemporalIndex(index_test, list_time_center_test)
+
+    # Case of the conversions of units applied to the rows.
+    centered_index_ms = centered_index * 1000
+    assert isinstance(centered_index_ms, CenteredTemporalIndex) and centered_index_ms.tuple_ratios == (1000,)
+    assert np.array_equal(centered_index_ms, centered_index_correct * 1000)
+    assert np.array_equal(0.5 * centered_index_ms, centered_index_correct * 1000 * 0.5)
+
+    # Case of the other operations and methods applied to the 2D array.
+    assert np.array_equal(centered_index + 1, centered_index_correct + 1)
+    assert np.array_equal(centered_index * centered_index_correct, centered_index_correct * centered_index_correct)
+    assert np.array_equal(centered_index.round(3), centered_index_correct.round(3))
+
+
+def test_pickle_copy():
+    centered_index = CenteredTemporalIndex(index_test, list_time_center_test) * 1000
+
+    # Case of a CenteredTemporalIndex pickled and copied without computing its rows.
+    for centered_index_copy in (pickle.loads(pickle.dumps(centered_index)), copy.deepcopy(centered_index)):
+        assert isinstance(centered_index_copy, CenteredTemporalIndex)
+        assert np.array_equal(centered_index_copy, centered_index_correct * 1000)
@@ -0,0 +1,89 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from src.data_manager.CompressedArray import CompressedArray
+
+# Array of measurements with 5 rows, 9 columns and 100 time steps.
+array_test = np.cumsum(np.random.default_rng(0).normal(size=(5, 9, 100)), axis=-1)
+
+
+def test_shuffle_unshuffle():
+    bytes_shuffled = CompressedArray.shuffle(np.array([1, 2], dtype="<u2"))
+    assert bytes_shuffled == bytes([1, 2, 0, 0])
+    assert np.array_equal(CompressedArray.unshuffle(bytes_shuffled, np.dtype("<u2"), (2,)), [1, 2])
+    assert np.array_equal(CompressedArray.unshuffle(CompressedArray.shuffle(array_test), array_test.dtype,
+                                                    array_test.shape), array_test)
+
+
+def test_computing_block_size():
+    # Case of blocks of about 1 MiB.
+    assert CompressedArray.computing_block_size(array_test) == 2 ** 20 // (5 * 9 * 8)
+
+    # Case of a time step heavier than a block.
+    assert CompressedArray.computing_block_size(array_test, block_bytes=100) == 1
+
+
+def test_write(tmp_path):
+    # Case of the codecs of the standard library.
+    for codec in ("zlib", "lzma"):
+        compressed_array = CompressedArray.write(array_test, f"{tmp_path}/VSDI_{codec}.blk", codec, block_size=30)
+        assert compressed_array.shape == (5, 9, 100) and compressed_array.dtype == np.float64
+        assert compressed_array.codec == codec and len(compressed_array.list_blocks) == 4
+        assert np.array_equal(compressed_array.decompress(), array_test)
+
+    # Case of an incorrect codec.
+    with pytest.raises(ValueError):
+        CompressedArray.write(array_test, f"{tmp_path}/VSDI.blk", "gzip")
+
+
+def test_reading_blocks(tmp_path):
+    compressed_array = CompressedArray.write(array_test, f"{tmp_path}/VSDI.blk", block_size=30)
+    assert np.array_equal(compressed_array.reading_blocks(1, 2), array_test[..., 30:60])
+    assert np.array_equal(compressed_array.reading_blocks(2, 4), array_test[..., 60:])
+
+
+def test_is_stored_in(tmp_path):
+    compressed_array = CompressedArray.write(array_test, f"{tmp_path}/VSDI.blk", block_size=30)
+    assert compressed_array.is_stored_in(f"{tmp_path}/VSDI.blk")
+    assert not compressed_array.is_stored_in(f"{tmp_path}/VSDI_copy.blk")
+
+    # Case of a file replaced by a new version, the CompressedArray still reading the version it describes.
+    for codec in ("zlib", "lzma"):
+        CompressedArray.write(array_test * 2, f"{tmp_path}/VSDI.blk", codec, block_size=20)
+        assert not compressed_array.is_stored_in(f"{tmp_path}/VSDI.blk")
+        assert np.array_equal(compressed_array[..., 35:50], array_test[..., 35:50])
+        assert np.array_equal(compressed_array.decompress(), array_test)
+
+
+def test_getitem(tmp_path, monkeypatch):
+    compressed_array = CompressedArray.write(array_test, f"{tmp_path}/VSDI.blk", block_size=30)
+
+    # Case of slices decompressing only the blocks of the time steps selected.
+    list_blocks_read = []
+    reading_blocks = compressed_array.reading_blocks
+    monkeypatch.setattr(compressed_array, "reading_blocks", lambda i_start, i_end: list_blocks_read.append(
+        (i_start, i_end)) or reading_blocks(i_start, i_end))
+    assert np.array_equal(compressed_array[..., 35:50], array_test[..., 35:50])
+    assert np.array_equal(compressed_array[2, 4, 95], array_test[2, 4, 95])
+    assert list_blocks_read == [(1, 2), (3, 4)]
+
+    # Case of the other indexes of numpy arrays.
+    for key in [np.s_[1], np.s_[:, 3, 80:], np.s_[..., ::-1], np.s_[..., 90:10:-7], np.s_[..., [3, 99, 7]],
+                np.s_[..., -1], np.s_[..., 10:10], np.s_[None], np.s_[array_test > 0]]:
+        assert np.array_equal(compressed_array[key], array_test[key])
+
+
+def test_numpy_compatibility(tmp_path):
+    compressed_array = CompressedArray.write(array_test, f"{tmp_path}/VSDI.blk")
+    assert np.array_equal(np.asarray(compressed_array), array_test)
+    assert np.array_equal(compressed_array * 2 + 1, array_test * 2 + 1)
+    assert np.array_equal(np.mean(compressed_array, axis=2), np.mean(array_test, axis=2))
+    assert compressed_array.max() == array_test.max()
+    assert len(compressed_array) == 5
+
+    # Case of copies and pickles made as numpy arrays.
+    assert type(copy.deepcopy(compressed_array)) == np.ndarray
+    assert np.array_equal(pickle.loads(pickle.dumps(compressed_array)), array_test)
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from src.data_manager.ConflictPolicy import ConflictPolicy
+
+
+def test_resolving_conflict_policy(monkeypatch):
+    # Case of the default policy.
+    monkeypatch.delenv("MACULAR_CONFLICT_POLICY", raising=False)
+    assert ConflictPolicy.resolving_conflict_policy() == "interactive"
+
+    # Case of a policy given by the environment variable.
+    monkeypatch.setenv("MACULAR_CONFLICT_POLICY", "prefer_file")
+    assert ConflictPolicy.resolving_conflict_policy() == "prefer_file"
+
+    # Case of a policy given as input prevailing over the environment variable.
+    assert ConflictPolicy.resolving_conflict_policy("error") == "error"
+
+    # Case of an incorrect policy.
+    with pytest.raises(ValueError):
+        ConflictPolicy.resolving_conflict_policy("json")
+
+
+def test_is_stale(tmp_path):
+    path_pyb, path_csv = f"{tmp_path}/simulation.pyb", f"{tmp_path}/simulation.csv"
+    open(path_pyb, "wb").close()
+    open(path_csv, "wb").close()
+
+    # Case of a source modified before the pyb file.
+    os.utime(path_csv, (0, 0))
+    assert not ConflictPolicy.is_stale(path_pyb, [path_csv])
+
+    # Case of a source modified after the pyb file.
+    os.utime(path_pyb, (0, 0))
+    os.utime(path_csv, (1, 1))
+    assert ConflictPolicy.is_stale(path_pyb, [path_csv])
+
+    # Case of a missing source.
+    assert not ConflictPolicy.is_stale(path_pyb, [f"{tmp_path}/missing.csv"])
+
+
+def test_choosing_configuration(monkeypatch):
+    # Case of the interactive policy.
+    monkeypatch.setattr('builtins.input', lambda _: "PYB")
+    assert ConflictPolicy.choosing_configuration("interactive") == "pyb"
+
+    # Case of the non-interactive policies.
+    assert ConflictPolicy.choosing_configuration("prefer_file") == "pyb"
+    assert ConflictPolicy.choosing_configuration("prefer_config") == "json"
+    assert ConflictPolicy.choosing_configuration("rebuild_if_stale", False) == "pyb"
+    assert ConflictPolicy.choosing_configuration("rebuild_if_stale", True) == "json"
+    with pytest.raises(ValueError):
+        ConflictPolicy.choosing_configuration("error")
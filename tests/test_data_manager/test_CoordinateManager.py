@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.data_manager.CoordinateManager import CoordinateManager
 
 
@@ -22,3 +24,16 @@ def test_edge_to_dict_edge():
     assert CoordinateManager.edge_to_dict_edge((1, (4, 9))) == {"X_left": 1, "X_right": 1,
                                                                 "Y_bottom": 4, "Y_top": 9}
 
+
+
+def test_array_id_to_coordinates():
+    # Conversion of all the identification numbers of a graph with several cell types.
+    n_cells = (83, 15)
+    array_num = np.arange(3 * n_cells[0] * n_cells[1])
+    dict_coordinates = CoordinateManager.array_id_to_coordinates(array_num, n_cells)
+
+    # Checking the equality with the conversion of each identification number.
+    for num in array_num:
+        assert CoordinateManager.id_to_coordinates(int(num), n_cells) == {"z": dict_coordinates["z"][num],
+                                                                          "x": dict_coordinates["x"][num],
+                                                                          "y": dict_coordinates["y"][num]}
@@ -318,3 +318,122 @@ def test_imbricated_arrays_axis_averaging():
 
     # Test in the case of a temporal averaged section.
     assert np.array_equal(temporal_mean_section, macular_dict_array_SMS_mean_sectioned.data["temporal_mean_section"].round(4))
+
+
+def test_axis_cropping_mask():
+    array_to_crop = np.array([[[4, 0.4, 0.1, 0.3], [0.15, 0.09, 0.19, 0.35]], [[0.4, 0.54, 0.42, 0.69],
+                                                                               [0.2, 0.88, 0.03, 0.67]]])
+
+    # Case of crop with fixed edges.
+    cropped_array, mask = DataPreprocessor.axis_cropping_mask(array_to_crop, 2, "fixed_edge",
+                                                              {"edge_start": 1, "edge_end": 1})
+    assert np.array_equal(cropped_array, array_to_crop[:, :, 1:3])
+    assert mask is None
+
+    # Case of crop with a threshold.
+    cropped_array, mask = DataPreprocessor.axis_cropping_mask(array_to_crop, 0, "threshold", {"threshold": 0.3})
+    assert cropped_array is array_to_crop
+    assert np.array_equal(mask, array_to_crop >= 0.3)
+
+    # Case of crop with a threshold based on a ratio of the maximum value.
+    cropped_array, mask = DataPreprocessor.axis_cropping_mask(array_to_crop, 2, "max_ratio_threshold",
+                                                              {"ratio_threshold": 0.5})
+    assert np.array_equal(mask, np.array([[[True, False, False, False], [False, False, True, True]],
+                                          [[True, True, True, True], [False, True, False, True]]]))
+
+    # Case without crop.
+    assert DataPreprocessor.axis_cropping_mask(array_to_crop, 1, "", {}) == (array_to_crop, None)
+
+
+def test_masked_axis_averaging():
+    array_to_mean = np.array([[[1., 2., 3.], [4., 5., 9.]]])
+
+    # Case of an average of all the values.
+    assert np.array_equal(DataPreprocessor.masked_axis_averaging(array_to_mean, 2), np.array([[2., 6.]]))
+
+    # Case of an average of the values kept by a mask with a position without values.
+    mask = np.array([[[False, False, False], [True, False, True]]])
+    assert np.array_equal(DataPreprocessor.masked_axis_averaging(array_to_mean, 2, mask), np.array([[np.nan, 6.5]]),
+                          equal_nan=True)
+
+    # Case of an average rounded to 4 decimal places.
+    assert np.array_equal(DataPreprocessor.masked_axis_averaging(array_to_mean, 1), np.array([[2.5, 3.5, 6.]]))
+    assert np.array_equal(DataPreprocessor.masked_axis_averaging(np.array([[[1.], [1.], [2.]]]), 1),
+                          np.array([[1.3333]]))
+
+
+def test_mean_section_computing():
+    array_to_mean = np.random.default_rng(0).random((5, 6, 7))
+
+    # Case of the same average sections as with the imbricated arrays for all axes and cropping types.
+    for averaging_axis in ("vertical", "horizontal", "temporal"):
+        for cropping_type, cropping_dict in (("fixed_edge", {"edge_start": 1, "edge_end": 2}), ("", {}),
+                                             ("threshold", {"threshold": 0.4}),
+                                             ("max_ratio_threshold", {"ratio_threshold": 0.7})):
+            imbricated_array = DataPreprocessor.crop_imbricated_array(
+                DataPreprocessor.transform_3d_array_to_imbricated_arrays(array_to_mean, averaging_axis),
+                cropping_type, cropping_dict)
+            assert np.array_equal(DataPreprocessor.mean_section_computing(array_to_mean, averaging_axis,
+                                                                          cropping_type, cropping_dict),
+                                  DataPreprocessor.imbricated_arrays_axis_averaging(imbricated_array))
+
+
+def test_derivative_computing_3d_array():
+    # Test array with a time index of 5 time steps.
+    array_to_derive = np.array([[[0., 1., 4., 9., 16.]]])
+    index = np.array([0., 1., 2., 3., 4.])
+
+    # Case of an instant derivative.
+    assert np.array_equal(DataPreprocessor.derivative_computing_3d_array(array_to_derive, index),
+                          np.array([[[1., 2., 4., 6., 7.]]]))
+
+    # Case of a derivative on a larger interval with the edges computed from the first and last time steps.
+    assert np.array_equal(DataPreprocessor.derivative_computing_3d_array(array_to_derive, index, 2),
+                          np.array([[[2., 3., 4., 5., 6.]]]))
+
+    # Case of a derivative keeping the dtype and written in the array given as output.
+    derivative_array = np.zeros(array_to_derive.shape, dtype=np.float32)
+    assert DataPreprocessor.derivative_computing_3d_array(array_to_derive.astype(np.float32), index, 2,
+                                                          out=derivative_array) is derivative_array
+    assert np.array_equal(derivative_array, np.array([[[2., 3., 4., 5., 6.]]], dtype=np.float32))
+
+    # Case of an index list of Python scalars or numpy scalars, divided as their differences would be.
+    array_to_derive_float32 = np.array([[[0.1, 1.3, 4.7, 9.2, 16.9]]], dtype=np.float32)
+    list_index = [0., 0.3, 0.7, 1.1, 1.7]
+    array_differences = array_to_derive_float32[..., [1, 2, 3, 4, 4]] - array_to_derive_float32[..., [0, 0, 1, 2, 3]]
+    index_differences = np.array(list_index)[[1, 2, 3, 4, 4]] - np.array(list_index)[[0, 0, 1, 2, 3]]
+    assert np.array_equal(DataPreprocessor.derivative_computing_3d_array(array_to_derive_float32, list_index),
+                          array_differences / index_differences.astype(np.float32))
+    assert np.array_equal(DataPreprocessor.derivative_computing_3d_array(
+        array_to_derive_float32, [np.float64(value) for value in list_index]),
+        (array_differences / index_differences).astype(np.float32))
+
+
+def test_vsdi_computing():
+    # Case of the VSDI of the reduced control MacularDictArray.
+    assert np.array_equal(DataPreprocessor.vsdi_computing(macular_dict_array_head100.data),
+                          macular_dict_array_head100_VSDI.data["VSDI"])
+
+    # Case of the VSDI computed by blocks of time steps.
+    assert np.array_equal(DataPreprocessor.vsdi_computing(macular_dict_array_head100.data, block_size=7),
+                          macular_dict_array_head100_VSDI.data["VSDI"])
+
+    # Case of weights given as input.
+    dict_mean_voltages = {"muVn_CorticalExcitatory": np.array([[[-60., -30.]]]),
+                          "muVn_CorticalInhibitory": np.array([[[-50., -75.]]])}
+    assert np.array_equal(DataPreprocessor.vsdi_computing(dict_mean_voltages, 0.5, 0.25),
+                          np.array([[[0., 0.5 * 0.5 - 0.5 * 0.25]]]))
+
+
+def test_weighted_opposite_normalization():
+    array_to_normalize = np.array([[[2., 4., 8.]]])
+
+    # Case of a new array.
+    assert np.array_equal(DataPreprocessor.weighted_opposite_normalization(
+        array_to_normalize, array_to_normalize[:, :, :1], 0.5), np.array([[[0., -0.5, -1.5]]]))
+
+    # Case of an output array given as input.
+    normalized_array = np.zeros((1, 1, 3))
+    assert DataPreprocessor.weighted_opposite_normalization(array_to_normalize, array_to_normalize[:, :, :1], 0.5,
+                                                            out=normalized_array) is normalized_array
+    assert np.array_equal(normalized_array, np.array([[[0., -0.5, -1.5]]]))
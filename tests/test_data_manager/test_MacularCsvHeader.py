@@ -0,0 +1,71 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.data_manager.CoordinateManager import CoordinateManager
+from src.data_manager.MacularCsvHeader import MacularCsvHeader
+
+# Get data for test from relative path.
+path_data_test = os.path.normpath(f"{os.getcwd()}/../data_test/data_manager/")
+
+# Import of a reduced MacularDictArray control with only the 100 first rows.
+path_pyb_file_head100 = f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_copy_0f.pyb"
+with open(path_pyb_file_head100, "rb") as file_head100:
+    macular_dict_array_head100 = pickle.load(file_head100)
+
+# Parsing of the header of the csv of the reduced control MacularDictArray.
+path_csv_file_head100 = f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.csv"
+n_cells = (83, 15)
+macular_csv_header = MacularCsvHeader(path_csv_file_head100, n_cells)
+
+
+def test_columns_getter():
+    # Case of the time column followed by one column per measurement and cell.
+    assert macular_csv_header.columns[0] == "Time"
+    assert len(macular_csv_header.columns) == len(macular_csv_header.list_num) + 1
+    assert len(macular_csv_header.list_num) == len(macular_csv_header.list_measurements)
+
+
+def test_usecols_getter():
+    # Case of all the columns of the csv read without projection.
+    assert macular_csv_header.usecols == macular_csv_header.columns
+
+    # Case of a projection on a single measurement.
+    macular_csv_header_projected = MacularCsvHeader(path_csv_file_head100, n_cells, ["muVn_CorticalExcitatory"])
+    assert macular_csv_header_projected.usecols[0] == "Time"
+    assert macular_csv_header_projected.usecols == [column for column in macular_csv_header.columns
+                                                    if column == "Time" or "CorticalExcitatory" in column]
+    assert macular_csv_header_projected.measurements == ["muVn_CorticalExcitatory"]
+
+    # Case of positions of columns relative to the projected columns.
+    columns, _, _ = macular_csv_header_projected.scatter_map["muVn_CorticalExcitatory"]
+    assert np.array_equal(columns, np.arange(len(macular_csv_header_projected.usecols) - 1))
+
+    # Case of a measurement absent from the csv.
+    with pytest.raises(ValueError):
+        MacularCsvHeader(path_csv_file_head100, n_cells, ["muVn_Absent"])
+
+
+def test_measurements_getter():
+    # Case of the measurements of the csv without duplicates.
+    assert sorted(macular_csv_header.measurements) == sorted(macular_dict_array_head100.data.keys())
+
+
+def test_scatter_map_getter():
+    # Case of all the columns of the csv covered by the scatter map.
+    assert sum(len(columns) for columns, _, _ in macular_csv_header.scatter_map.values()) == len(
+        macular_csv_header.list_num)
+
+    for measurement, (columns, rows, columns_numpy) in macular_csv_header.scatter_map.items():
+        for i, column in enumerate(columns):
+            # Checking the measurement of each column.
+            assert macular_csv_header.list_measurements[column] == measurement
+
+            # Checking the numpy coordinates of the cell of each column.
+            dict_coordinates = CoordinateManager.id_to_coordinates(macular_csv_header.list_num[column], n_cells)
+            assert (n_cells[1] - 1 - dict_coordinates["y"], dict_coordinates["x"]) == (rows[i], columns_numpy[i])
+
+        # Case of integer arrays of coordinates.
+        assert np.issubdtype(rows.dtype, np.integer) and np.issubdtype(columns_numpy.dtype, np.integer)
@@ -1,11 +1,17 @@
+import gzip
 import os
 import pickle
 import re
+import shutil
 
 import numpy as np
+import pytest
 
+from src.data_manager.BackgroundSaver import BackgroundSaver
 from src.data_manager.MacularDictArray import MacularDictArray
 from src.data_manager.DataPreprocessor import DataPreprocessor
+from src.data_manager.PreprocessingCache import PreprocessingCache
+from src.data_manager.PybStore import PybStore
 
 # Get data for test from relative path.
 path_data_test = os.path.normpath(f"{os.getcwd()}/../data_test/data_manager/")
@@ -156,6 +162,23 @@ def test_init(monkeypatch):
     assert not MacularDictArray.equal(macular_dict_array_conflict, macular_dict_array_head100)
 
 
+def test_reduce_ex(tmp_path):
+    path_pyb_store = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    PybStore.save(macular_dict_array_head100, path_pyb_store)
+    macular_dict_array_test = PybStore.load(MacularDictArray, path_pyb_store)
+
+    # Case of memory-maps pickled out-of-band with the protocol 5.
+    list_buffers = []
+    bytes_pickle = pickle.dumps(macular_dict_array_test, protocol=5, buffer_callback=list_buffers.append)
+    assert len(list_buffers) >= len(macular_dict_array_head100.data)
+    assert len(bytes_pickle) < sum(array.nbytes for array in macular_dict_array_head100.data.values())
+    assert MacularDictArray.equal(pickle.loads(bytes_pickle, buffers=list_buffers), macular_dict_array_head100)
+
+    # Case of the previous protocols.
+    assert MacularDictArray.equal(pickle.loads(pickle.dumps(macular_dict_array_test, protocol=4)),
+                                  macular_dict_array_head100)
+
+
 def test_equal():
     # Import of the second MacularDictArray for comparison.
     with open(path_pyb_file_head100, "rb") as file:
@@ -280,6 +303,88 @@ def test_managing_pre_existing_file():
     assert MacularDictArray.equal(macular_dict_array_head100, macular_dict_array_test)
 
 
+def test_managing_preprocessing_cache(monkeypatch, tmp_path):
+    # Enabling of the preprocessing cache in a temporary folder.
+    monkeypatch.setenv("MACULAR_CACHE_DIR", f"{tmp_path}/cache")
+    dict_simulation_head100_tmp = dict_simulation_head100.copy()
+    dict_simulation_head100_tmp["path_pyb"] = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+
+    # Case of a cache miss, with the csv processed and stored in the cache with its raw data and index.
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    assert len(os.listdir(f"{tmp_path}/cache")) == 3
+
+    # Case of a cache hit with another pyb path, without any conflict with the pyb file.
+    monkeypatch.setattr('builtins.input', lambda _: "No")
+    dict_simulation_head100_tmp["path_pyb"] = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_other_0f.pyb"
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    assert macular_dict_array_test.path_pyb == dict_simulation_head100_tmp["path_pyb"]
+    assert len(os.listdir(f"{tmp_path}/cache")) == 3
+
+    # Case of a cache hit with a pyb file already containing the MacularDictArray, which is not written again.
+    inode = os.stat(dict_simulation_head100_tmp["path_pyb"]).st_ino
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    assert os.stat(dict_simulation_head100_tmp["path_pyb"]).st_ino == inode
+
+    # Case of the entry of the preprocessing variant containing no arrays, stored in the raw and process entries.
+    preprocessing_cache = PreprocessingCache.from_environment()
+    macular_dict_array_manifest = preprocessing_cache.get(MacularDictArray, preprocessing_cache.make_key(
+        dict_simulation_head100_tmp["path_csv"], dict_simulation_head100_tmp, dict_preprocessing_default))
+    assert macular_dict_array_manifest.data == {} and macular_dict_array_manifest.index == {}
+
+    # Case of another preprocessing variant stored beside the first one.
+    MacularDictArray(dict_simulation_head100_tmp.copy(), {"VSDI": True})
+    assert len(os.listdir(f"{tmp_path}/cache")) == 6
+
+
+def test_managing_raw_cache(monkeypatch, tmp_path):
+    # Enabling of the preprocessing cache in a temporary folder.
+    monkeypatch.setenv("MACULAR_CACHE_DIR", f"{tmp_path}/cache")
+    dict_simulation_head100_tmp = dict_simulation_head100.copy()
+    dict_simulation_head100_tmp["path_pyb"] = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default)
+
+    # Case of a change of preprocessing reusing the raw data and index without parsing the csv again.
+    def setup_data_index_dict_array_forbidden(self):
+        raise AssertionError("The csv should not be parsed again.")
+
+    monkeypatch.setattr(MacularDictArray, "setup_data_index_dict_array", setup_data_index_dict_array_forbidden)
+    macular_dict_array_test.dict_preprocessing = {"VSDI": True}
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_VSDI)
+
+    # Case of a raw entry not modified by the preprocessing of the arrays it contains.
+    macular_dict_array_test.dict_preprocessing = dict_preprocessing_default
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+
+
+def test_managing_step_cache(monkeypatch, tmp_path):
+    # Enabling of the preprocessing cache in a temporary folder.
+    monkeypatch.setenv("MACULAR_CACHE_DIR", f"{tmp_path}/cache")
+    dict_simulation_head100_tmp = dict_simulation_head100.copy()
+    dict_simulation_head100_tmp["path_pyb"] = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), {"VSDI": True})
+
+    # Case of a units conversion added without computing the VSDI again.
+    def vsdi_computing_forbidden(macular_dict_array_data):
+        raise AssertionError("The VSDI should not be computed again.")
+
+    monkeypatch.setattr(DataPreprocessor, "vsdi_computing", vsdi_computing_forbidden)
+    macular_dict_array_test.dict_preprocessing = {"VSDI": True, "temporal_index_ms": 1000}
+    assert np.array_equal(macular_dict_array_test.data["VSDI"], macular_dict_array_head100_VSDI.data["VSDI"])
+    assert np.array_equal(macular_dict_array_test.index["temporal_ms"],
+                          np.array(macular_dict_array_head100_VSDI.index["temporal"]) * 1000)
+
+    # Case of the entries of the processes containing only the arrays they have created or replaced.
+    preprocessing_cache = PreprocessingCache.from_environment()
+    key = preprocessing_cache.make_step_key(
+        preprocessing_cache.make_raw_key(macular_dict_array_test.path_csv, macular_dict_array_test.dict_simulation),
+        "VSDI", True)
+    macular_dict_array_step = preprocessing_cache.get(MacularDictArray, key)
+    assert list(macular_dict_array_step.data) == ["VSDI"] and macular_dict_array_step.index == {}
+
+
 def test_checking_difference_file_json(monkeypatch):
     # Import of MacularDictArray to be compared.
     with open(f"{path_pyb_file_head100_30dps}", "rb") as file:
@@ -336,6 +441,61 @@ def test_checking_difference_file_json(monkeypatch):
     assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
 
 
+def test_checking_difference_file_json_conflict_policy(monkeypatch, tmp_path):
+    # Import of MacularDictArray to be compared without any user input.
+    with open(f"{path_pyb_file_head100_30dps}", "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+    monkeypatch.setattr('builtins.input', lambda _: pytest.fail("The user should not be asked."))
+
+    # Case of the error policy.
+    with pytest.raises(ValueError):
+        macular_dict_array_test.checking_difference_file_json(dict_simulation_head100, dict_preprocessing_default,
+                                                              "error")
+
+    # Case of keeping the pyb with the prefer_file policy.
+    error = macular_dict_array_test.checking_difference_file_json(dict_simulation_head100, dict_preprocessing_default,
+                                                                  "prefer_file")
+    assert error
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_30dps)
+
+    # Case of keeping the pyb of a csv not modified after it with the rebuild_if_stale policy.
+    dict_simulation_head100_copy_csv = dict_simulation_head100.copy()
+    dict_simulation_head100_copy_csv["path_csv"] = f"{tmp_path}/{os.path.basename(dict_simulation_head100['path_csv'])}"
+    shutil.copyfile(dict_simulation_head100["path_csv"], dict_simulation_head100_copy_csv["path_csv"])
+    os.utime(dict_simulation_head100_copy_csv["path_csv"], (0, 0))
+    error = macular_dict_array_test.checking_difference_file_json(dict_simulation_head100_copy_csv,
+                                                                  dict_preprocessing_default, "rebuild_if_stale")
+    assert error
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_30dps)
+
+    # Case of keeping the json with the prefer_config policy.
+    error = macular_dict_array_test.checking_difference_file_json(dict_simulation_head100.copy(),
+                                                                  dict_preprocessing_default, "prefer_config")
+    assert error
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+
+
+def test_init_conflict_policy(monkeypatch, tmp_path):
+    monkeypatch.setattr('builtins.input', lambda _: pytest.fail("The user should not be asked."))
+    dict_simulation_head100_tmp = dict_simulation_head100.copy()
+    dict_simulation_head100_tmp["path_pyb"] = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    MacularDictArray(dict_simulation_head100_tmp.copy(), {"VSDI": True})
+
+    # Case of a conflict policy given by the environment variable.
+    monkeypatch.setenv("MACULAR_CONFLICT_POLICY", "prefer_file")
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_VSDI)
+
+    # Case of a conflict policy given as input prevailing over the environment variable.
+    macular_dict_array_test = MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default,
+                                               "prefer_config")
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+
+    # Case of an incorrect conflict policy.
+    with pytest.raises(ValueError):
+        MacularDictArray(dict_simulation_head100_tmp.copy(), dict_preprocessing_default, "json")
+
+
 def test_dict_simulation_getter():
     dict_simulation_head100_no_path = dict_simulation_head100.copy()
     del dict_simulation_head100_no_path["path_csv"]
@@ -508,6 +668,30 @@ def test_update_from_simulation_dict():
     assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
 
 
+def test_update_from_dicts(monkeypatch, tmp_path):
+    # Creation of a preprocessing dictionary with binning
+    dict_preprocessing_binning = dict_preprocessing_default.copy()
+    dict_preprocessing_binning["binning"] = 0.0016
+
+    # Case of a binning carried out during the extraction of the data only.
+    def binning_preprocess_forbidden(self):
+        raise AssertionError("The binning should be carried out during the extraction of the data.")
+
+    monkeypatch.setattr(MacularDictArray, "binning_preprocess", binning_preprocess_forbidden)
+    with open(path_pyb_file_head100, "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+    macular_dict_array_test.update_from_dicts(dict_simulation_head100, dict_preprocessing_binning)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_binning)
+
+    # Case of a binning carried out with the other processes when the preprocessing cache is enabled.
+    monkeypatch.undo()
+    monkeypatch.setenv("MACULAR_CACHE_DIR", f"{tmp_path}/cache")
+    with open(path_pyb_file_head100, "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+    macular_dict_array_test.update_from_dicts(dict_simulation_head100, dict_preprocessing_binning)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_binning)
+
+
 def test_update_from_preprocessing_dict():
     # Import of the initial MacularDictArray to be modified.
     with open(path_pyb_file_head100, "rb") as file:
@@ -540,6 +724,105 @@ def test_save():
     assert MacularDictArray.equal(MacularDictArray.load(path_pyb_file_head100), macular_dict_array_head100)
 
 
+def test_save_background(tmp_path):
+    path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    macular_dict_array_test = macular_dict_array_head100.copy(path_pyb)
+
+    # Case of a save in the background waited for before loading the pyb file.
+    macular_dict_array_test.save(background_save=True)
+    BackgroundSaver.wait_saved(macular_dict_array_test.path_pyb)
+    assert MacularDictArray.equal(MacularDictArray.load(macular_dict_array_test.path_pyb), macular_dict_array_head100)
+
+    # Case of a save of another MacularDictArray waiting for the save in the background of the same pyb file.
+    for extension in ("pyb", "pybd"):
+        path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.{extension}"
+        macular_dict_array_head100.copy(path_pyb).save(background_save=True)
+        macular_dict_array_head100_VSDI.copy(path_pyb).save()
+        BackgroundSaver.wait_saved(path_pyb)
+        assert MacularDictArray.equal(MacularDictArray.load(path_pyb), macular_dict_array_head100_VSDI)
+
+    # Case of no temporary file left after the saves.
+    assert sorted(os.listdir(tmp_path)) == ["RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb",
+                                            "RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"]
+    assert sorted(os.listdir(f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd")) == [
+        "data", "index", "metadata.pkl"]
+
+
+def test_inspect(tmp_path):
+    # Case of a pyb file with header.
+    macular_dict_array_test = MacularDictArray.load(path_pyb_file_head100)
+    macular_dict_array_test._path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    macular_dict_array_test.save()
+    dict_description = MacularDictArray.inspect(macular_dict_array_test.path_pyb)
+    assert dict_description["dict_simulation"] == macular_dict_array_head100.dict_simulation
+    assert dict_description["dict_preprocessing"] == macular_dict_array_head100.dict_preprocessing
+    assert dict_description["data"] == {measurement: {"shape": array.shape, "dtype": array.dtype.str}
+                                        for measurement, array in macular_dict_array_head100.data.items()}
+
+    # Case of a pyb file without header.
+    with open(macular_dict_array_test.path_pyb, "wb") as pyb_file:
+        pickle.dump(macular_dict_array_test, pyb_file)
+    assert MacularDictArray.inspect(macular_dict_array_test.path_pyb) == dict_description
+
+
+def test_save_load_pyb_store(tmp_path):
+    # Case of a MacularDictArray saved in a pyb store.
+    macular_dict_array_test = MacularDictArray.load(path_pyb_file_head100)
+    macular_dict_array_test._path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    macular_dict_array_test.save()
+    assert os.path.isdir(macular_dict_array_test.path_pyb)
+
+    # Case of a MacularDictArray loaded from a pyb store with memory-mapped data.
+    macular_dict_array_test = MacularDictArray.load(macular_dict_array_test.path_pyb)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    assert all(isinstance(macular_dict_array_test.data[measurement], np.memmap)
+               for measurement in macular_dict_array_test.data)
+
+
+def test_save_arrays(tmp_path):
+    path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    macular_dict_array_test = macular_dict_array_head100.copy(path_pyb)
+    macular_dict_array_test.save()
+    measurement = list(macular_dict_array_test.data)[0]
+    inode = os.stat(f"{macular_dict_array_test.path_pyb}/data/{measurement}.npy").st_ino
+
+    # Case of a new measurement written alone in the pyb store.
+    macular_dict_array_test.data["VSDI_copy"] = macular_dict_array_test.data[measurement] + 1
+    macular_dict_array_test.save_arrays(["VSDI_copy"])
+    assert os.stat(f"{macular_dict_array_test.path_pyb}/data/{measurement}.npy").st_ino == inode
+    assert MacularDictArray.equal(MacularDictArray.load(macular_dict_array_test.path_pyb), macular_dict_array_test)
+
+    # Case of a pyb file saved as a whole.
+    macular_dict_array_test.path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    macular_dict_array_test.save_arrays(["VSDI_copy"])
+    assert MacularDictArray.equal(MacularDictArray.load(macular_dict_array_test.path_pyb), macular_dict_array_test)
+
+
+def test_adding_preprocessing(tmp_path):
+    # Loading of a MacularDictArray with a derivative on FiringRate_GanglionGainControl with n=3.
+    with open(f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_dFRGang3_0f.pyb", "rb") as file_dFRGang3:
+        macular_dict_array_head100_dFRGang3 = pickle.load(file_dFRGang3)
+
+    # Initialisation of a MacularDictArray loaded from a pyb store.
+    path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    macular_dict_array_test = macular_dict_array_head100.copy(path_pyb)
+    macular_dict_array_test.save()
+    macular_dict_array_test = MacularDictArray.load(macular_dict_array_test.path_pyb)
+    set_files = set(os.listdir(f"{macular_dict_array_test.path_pyb}/data"))
+
+    # Case of a derivative added to the MacularDictArray and written alone in the pyb store.
+    macular_dict_array_test.adding_preprocessing("derivative", {"FiringRate_GanglionGainControl": 31})
+    assert set(os.listdir(f"{macular_dict_array_test.path_pyb}/data")) - set_files == {
+        "FiringRate_GanglionGainControl_derivative.npy"}
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100_dFRGang3)
+    assert MacularDictArray.equal(MacularDictArray.load(macular_dict_array_test.path_pyb),
+                                  macular_dict_array_head100_dFRGang3)
+
+    # Case of a process modifying the existing arrays.
+    with pytest.raises(ValueError):
+        macular_dict_array_test.adding_preprocessing("binning", 0.0016)
+
+
 def test_setup_data_index_dict_array():
     # Import of the initial MacularDictArray with empty data and index to be filled.
     with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
@@ -558,33 +841,222 @@ def test_setup_data_index_dict_array():
                                              macular_dict_array_head3000.index)
 
 
-def test_extract_data_index_from_macular_csv():
+def test_extract_data_index_from_macular_csv(monkeypatch):
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Use extract data index from macular csv to test it, without reading the temporal index first.
+    def extract_temporal_index_from_macular_csv_forbidden(self, n_rows_skipped=0):
+        raise AssertionError("The csv should be read only once.")
+
+    monkeypatch.setattr(MacularDictArray, "extract_temporal_index_from_macular_csv",
+                        extract_temporal_index_from_macular_csv_forbidden)
+    macular_dict_array_test.extract_data_index_from_macular_csv()
+
+    # Checking equality between data allocated for the whole simulation in the numpy orientation.
+    assert macular_dict_array_test.data.keys() == macular_dict_array_head3000.data.keys()
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output], macular_dict_array_head3000.data[output])
+        assert macular_dict_array_test.data[output].flags["C_CONTIGUOUS"]
+
+    # Checking equality between temporal indexes.
+    assert np.array_equal(macular_dict_array_test.index["temporal"], macular_dict_array_head3000.index["temporal"])
+
+
+def test_extract_data_index_from_macular_csv_binned():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Use extract data index from macular csv with a binning spanning the chunks to test it.
+    macular_dict_array_test.extract_data_index_from_macular_csv(0.0501)
+
+    # Checking equality with the binning of the data and index allocated for the whole simulation.
+    bin_size, n_bin = DataPreprocessor.computing_binning_parameters(macular_dict_array_head3000.index["temporal"],
+                                                                    0.0501)
+    assert macular_dict_array_test.data.keys() == macular_dict_array_head3000.data.keys()
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output], DataPreprocessor.binning_tridimensional(
+            macular_dict_array_head3000.data[output], bin_size, n_bin))
+    assert np.array_equal(macular_dict_array_test.index["temporal"], DataPreprocessor.binning_unidimensional(
+        macular_dict_array_head3000.index["temporal"], bin_size, n_bin))
+
+    # Case of integer measurements whose bins are averaged in float arrays.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+    macular_dict_array_test.dict_simulation["dtype"] = "int32"
+    macular_dict_array_test.extract_data_index_from_macular_csv(0.0501)
+    for output in macular_dict_array_test.data:
+        assert macular_dict_array_test.data[output].dtype == np.float64
+        assert np.array_equal(macular_dict_array_test.data[output], DataPreprocessor.binning_tridimensional(
+            macular_dict_array_head3000.data[output].astype(np.int32), bin_size, n_bin))
+
+
+def test_extract_temporal_index_from_macular_csv():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Use extract temporal index from macular csv to test it.
+    macular_dict_array_test.extract_temporal_index_from_macular_csv()
+
+    # Checking equality between temporal indexes.
+    assert np.array_equal(macular_dict_array_test.index["temporal"], macular_dict_array_head3000.index["temporal"])
+
+    # Case of a reading stopped at the end of the simulation.
+    macular_dict_array_test.dict_simulation["end"] = 0.5
+    macular_dict_array_test.extract_temporal_index_from_macular_csv()
+    assert np.array_equal(macular_dict_array_test.index["temporal"], macular_dict_array_head3000.index["temporal"][
+        macular_dict_array_head3000.index["temporal"] <= 0.5])
+
+
+def test_reading_first_times():
     # Import of the initial MacularDictArray with empty data and index to be filled.
     with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
               "rb") as file:
         macular_dict_array_test = pickle.load(file)
 
-    # Import of the control MacularDictArray for comparison.
-    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_extractedDataIndex_0f.pyb",
+    # Case of a first chunk containing two time steps kept.
+    assert np.array_equal(macular_dict_array_test.reading_first_times(),
+                          macular_dict_array_head3000.index["temporal"][:2000])
+
+    # Case of a transient covering the first chunk and of rows skipped.
+    macular_dict_array_test.dict_simulation["transient"] = "35s"
+    first_time = macular_dict_array_test.reading_first_times(10)
+    assert first_time[0] == macular_dict_array_head3000.index["temporal"][10]
+    assert (first_time >= 35).sum() >= 2 and (first_time[:-2000] >= 35).sum() < 2
+
+
+def test_counting_lines(tmp_path):
+    # Case of rows counted after the header with or without line break at the end.
+    with open(f"{tmp_path}/test.csv", "wb") as file_csv:
+        file_csv.write(b"Time,muVn (0) CorticalExcitatory\n0.0,1.0\n0.0167,2.0\n")
+    assert MacularDictArray.counting_lines(f"{tmp_path}/test.csv") == 2
+    with open(f"{tmp_path}/test.csv", "ab") as file_csv:
+        file_csv.write(b"0.0334,3.0")
+    assert MacularDictArray.counting_lines(f"{tmp_path}/test.csv", block_size=4) == 3
+
+    # Case of a compressed csv.
+    with open(f"{tmp_path}/test.csv", "rb") as file_csv, gzip.open(f"{tmp_path}/test.csv.gz", "wb") as file_csv_gz:
+        file_csv_gz.write(file_csv.read())
+    assert MacularDictArray.counting_lines(f"{tmp_path}/test.csv.gz") == 3
+
+
+def test_counting_time_steps(tmp_path):
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
               "rb") as file:
-        macular_dict_array_head3000_extracted = pickle.load(file)
+        macular_dict_array_test = pickle.load(file)
+    n_time = len(macular_dict_array_head3000.index["temporal"])
+
+    # Case of a csv without transient and end.
+    assert macular_dict_array_test.counting_time_steps(0, macular_dict_array_test.reading_first_times()) == n_time
+
+    # Case of a transient with rows skipped and of an end.
+    macular_dict_array_test.dict_simulation["transient"] = "35s"
+    macular_dict_array_test.dict_simulation["end"] = 42
+    time_kept = ((macular_dict_array_head3000.index["temporal"] >= 35) &
+                 (macular_dict_array_head3000.index["temporal"] <= 42))
+    assert macular_dict_array_test.counting_time_steps(10, macular_dict_array_test.reading_first_times(10)) == (
+        time_kept.sum())
+
+    # Case of a compressed csv without end.
+    path_csv_gz = f"{tmp_path}/{macular_dict_array_test.path_csv.split('/')[-1]}.gz"
+    with open(macular_dict_array_test.path_csv, "rb") as file_csv, gzip.open(path_csv_gz, "wb") as file_csv_gz:
+        file_csv_gz.write(file_csv.read())
+    macular_dict_array_test.path_csv = path_csv_gz
+    macular_dict_array_test.dict_simulation["end"] = "max"
+    assert macular_dict_array_test.counting_time_steps(10, macular_dict_array_test.reading_first_times(10)) == (
+        (macular_dict_array_head3000.index["temporal"] >= 35).sum())
+
+
+def test_extract_data_index_from_macular_csv_cropped():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
 
-    # Use extract data index from macular csv to test it.
+    # Case of a transient covering the whole first chunk and of an end reached before the last chunk.
+    macular_dict_array_test.dict_simulation["transient"] = "35s"
+    macular_dict_array_test.dict_simulation["end"] = 42
     macular_dict_array_test.extract_data_index_from_macular_csv()
+    time_kept = ((macular_dict_array_head3000.index["temporal"] >= 35) &
+                 (macular_dict_array_head3000.index["temporal"] <= 42))
 
-    # Checking equality between data.
-    assert macular_dict_array_test.data.keys() == macular_dict_array_head3000_extracted.data.keys()
+    # Checking equality between data and index and the time steps kept in the control MacularDictArray.
+    assert np.array_equal(macular_dict_array_test.index["temporal"],
+                          macular_dict_array_head3000.index["temporal"][time_kept] - 35)
     for output in macular_dict_array_test.data:
-        for i in range(len(macular_dict_array_test.data[output])):
-            assert np.array_equal(macular_dict_array_test.data[output][i],
-                                  macular_dict_array_head3000_extracted.data[output][i])
+        assert np.array_equal(macular_dict_array_test.data[output],
+                              macular_dict_array_head3000.data[output][:, :, time_kept])
 
-    # Checking equality between indexes.
-    assert macular_dict_array_test.index.keys() == macular_dict_array_head3000_extracted.index.keys()
-    for output in macular_dict_array_test.index:
-        for i in range(len(macular_dict_array_test.index[output])):
-            assert np.array_equal(macular_dict_array_test.index[output][i],
-                                  macular_dict_array_head3000_extracted.index[output][i])
+    # Case of a delta_t too small, skipping rows outside the transient, which must be read again.
+    macular_dict_array_test.dict_simulation["delta_t"] = 0.001
+    assert macular_dict_array_test.extract_temporal_index_from_macular_csv(
+        macular_dict_array_test.transient_rows_computing()) == 0
+    assert np.array_equal(macular_dict_array_test.index["temporal"],
+                          macular_dict_array_head3000.index["temporal"][time_kept] - 35)
+
+
+def test_extract_data_index_from_macular_csv_projected():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Case of a projection on the measurements needed for the VSDI.
+    macular_dict_array_test.dict_simulation["measurements"] = ["muVn_CorticalExcitatory", "muVn_CorticalInhibitory"]
+    macular_dict_array_test.extract_data_index_from_macular_csv()
+
+    # Checking equality between data and index and those of the control MacularDictArray.
+    assert sorted(macular_dict_array_test.data) == ["muVn_CorticalExcitatory", "muVn_CorticalInhibitory"]
+    assert np.array_equal(macular_dict_array_test.index["temporal"], macular_dict_array_head3000.index["temporal"])
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output], macular_dict_array_head3000.data[output])
+
+
+def test_extract_data_index_from_macular_csv_parallel():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Case of a parsing by several worker processes with a transient and an end.
+    macular_dict_array_test.dict_simulation["n_workers"] = 3
+    macular_dict_array_test.dict_simulation["transient"] = "35s"
+    macular_dict_array_test.dict_simulation["end"] = 42
+    macular_dict_array_test.extract_data_index_from_macular_csv()
+    time_kept = ((macular_dict_array_head3000.index["temporal"] >= 35) &
+                 (macular_dict_array_head3000.index["temporal"] <= 42))
+
+    # Checking equality between data and index and the time steps kept in the control MacularDictArray.
+    assert np.array_equal(macular_dict_array_test.index["temporal"],
+                          macular_dict_array_head3000.index["temporal"][time_kept] - 35)
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output],
+                              macular_dict_array_head3000.data[output][:, :, time_kept])
+
+
+def test_extract_data_index_from_macular_csv_float32():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Case of measurements stored in float32.
+    macular_dict_array_test.dict_simulation["dtype"] = "float32"
+    macular_dict_array_test.extract_data_index_from_macular_csv()
+
+    # Checking that the data are the float64 data of the control MacularDictArray rounded to float32.
+    for output in macular_dict_array_test.data:
+        assert macular_dict_array_test.data[output].dtype == np.float32
+        assert np.array_equal(macular_dict_array_test.data[output],
+                              macular_dict_array_head3000.data[output].astype(np.float32))
 
 
 def test_dataframe_chunk_processing():
@@ -598,18 +1070,47 @@ def test_dataframe_chunk_processing():
         dataframe_chunk = pickle.load(file)
 
     # Use dataframe chunk processing to test it.
-    macular_dict_array_test.dataframe_chunk_processing(dataframe_chunk, 0)
+    i_time = macular_dict_array_test.dataframe_chunk_processing(dataframe_chunk, 0)
+    assert i_time == 2000
 
     # Checking equality between data.
     for output in macular_dict_array_test.data:
-        assert np.array_equal(np.rot90(macular_dict_array_test.data[output][0]),
+        assert macular_dict_array_test.data[output].shape[-1] == macular_dict_array_head3000.data[output].shape[-1]
+        assert np.array_equal(macular_dict_array_test.data[output][:, :, :2000],
                               macular_dict_array_head3000.data[output][:, :, :2000])
 
     # Checking equality between indexes.
-    assert np.array_equal(macular_dict_array_test.index["temporal"][0],
+    assert np.array_equal(macular_dict_array_test.index["temporal"][:2000],
                           macular_dict_array_head3000.index["temporal"][:2000])
 
 
+def test_dataframe_chunk_binning():
+    # Import of the initial MacularDictArray with empty data and index to be filled.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
+              "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+
+    # Import of the first dataframe chunk to be processed.
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_first_chunk_0f.pyb", "rb") as file:
+        dataframe_chunk = pickle.load(file)
+
+    # Allocation of the binned arrays of the measurements.
+    csv_header = macular_dict_array_test.csv_header_parsing()
+    macular_dict_array_test._data = {measurement: np.zeros(array.shape[:2] + (1000,))
+                                     for measurement, array in macular_dict_array_head3000.data.items()}
+
+    # Case of a chunk binned by 3 time steps with the time steps of its last incomplete bin carried over.
+    n_time = macular_dict_array_test.dataframe_chunk_cropping(dataframe_chunk.copy(), csv_header).shape[0]
+    i_bin, dict_partial_bins = macular_dict_array_test.dataframe_chunk_binning(dataframe_chunk, 0, {}, 3, csv_header)
+    assert i_bin == n_time // 3
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output][:, :, :i_bin],
+                              DataPreprocessor.binning_tridimensional(macular_dict_array_head3000.data[output], 3,
+                                                                      i_bin))
+        assert np.array_equal(dict_partial_bins[output],
+                              macular_dict_array_head3000.data[output][:, :, i_bin * 3:n_time])
+
+
 def test_transient_computing():
     # Case using frames in a name following the nomenclature.
     macular_dict_array_test.path_csv = ("/".join(macular_dict_array_test.path_csv.split("/")[:-1]) +
@@ -631,31 +1132,72 @@ def test_transient_computing():
     assert macular_dict_array_test.transient_computing() == 0
 
 
-def test_transient_extraction():
-    macular_dict_array_test._path_csv = macular_dict_array_head100._path_csv.replace("_0f", "_12f")
-    print(macular_dict_array_test._path_csv)
-    assert macular_dict_array_test.transient_extraction() == 12
+def test_compression_extension():
+    # Case of a csv without compression.
+    assert MacularDictArray.compression_extension("/path/to/csv/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv") == ""
+
+    # Case of compressed csv.
+    assert MacularDictArray.compression_extension("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv.gz") == ".gz"
+    assert MacularDictArray.compression_extension("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv.bz2") == ".bz2"
+    assert MacularDictArray.compression_extension("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv.xz") == ".xz"
+
 
+def test_path_csv_to_path_pyb():
+    # Case of a csv without compression in a folder whose name contains csv.
+    assert (MacularDictArray.path_csv_to_path_pyb("/path/to/csv/RC_RM_dSGpCP0026_barSpeed6dps_0f.csv") ==
+            "/path/to/csv/RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb")
 
-def test_concatenate_data_index_dict_array():
+    # Case of a compressed csv.
+    assert (MacularDictArray.path_csv_to_path_pyb("../RC_RM_dSGpCP0026_barSpeed6dps_0f.csv.bz2") ==
+            "../RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb")
+
+
+def test_extract_data_index_from_macular_csv_compressed(tmp_path):
     # Import of the initial MacularDictArray with empty data and index to be filled.
-    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_extractedDataIndex_0f.pyb",
+    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_no_data_no_index_0f.pyb",
               "rb") as file:
         macular_dict_array_test = pickle.load(file)
 
-    # Import of the control MacularDictArray for comparison.
-    with open(f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_concatenated_0f.pyb",
-              "rb") as file:
-        macular_dict_array_head3000_concatenated = pickle.load(file)
+    # Compression of the csv in a temporary folder.
+    path_csv_gz = f"{tmp_path}/{macular_dict_array_test.path_csv.split('/')[-1]}.gz"
+    with open(macular_dict_array_test.path_csv, "rb") as file_csv, gzip.open(path_csv_gz, "wb") as file_csv_gz:
+        file_csv_gz.write(file_csv.read())
 
-    # Use concatenate data index dict array to test it.
-    macular_dict_array_test.concatenate_data_index_dict_array()
+    # Case of a compressed csv read with a transient extracted from its name and several workers.
+    macular_dict_array_test.path_csv = path_csv_gz
+    macular_dict_array_test.dict_simulation["n_workers"] = 3
+    assert macular_dict_array_test.transient_extraction() == 0
+    macular_dict_array_test.extract_data_index_from_macular_csv()
 
-    # Checking equality between indexes and data.
-    assert MacularDictArray.equal_dict_array(macular_dict_array_test.data,
-                                             macular_dict_array_head3000_concatenated.data)
-    assert MacularDictArray.equal_dict_array(macular_dict_array_test.index,
-                                             macular_dict_array_head3000_concatenated.index)
+    # Checking equality between data and index and those of the control MacularDictArray.
+    assert np.array_equal(macular_dict_array_test.index["temporal"], macular_dict_array_head3000.index["temporal"])
+    for output in macular_dict_array_test.data:
+        assert np.array_equal(macular_dict_array_test.data[output], macular_dict_array_head3000.data[output])
+
+
+def test_transient_rows_computing():
+    # Case of a transient in seconds.
+    macular_dict_array_test._dict_simulation["transient"] = "0.5s"
+    assert macular_dict_array_test.transient_rows_computing() == 29
+
+    # Case of a transient in frames.
+    macular_dict_array_test._dict_simulation["transient"] = "30f"
+    assert macular_dict_array_test.transient_rows_computing() == 29
+
+    # Case of a row skipping disabled.
+    macular_dict_array_test._dict_simulation["skip_transient_rows"] = False
+    assert macular_dict_array_test.transient_rows_computing() == 0
+    del macular_dict_array_test._dict_simulation["skip_transient_rows"]
+
+    # Case without transient.
+    macular_dict_array_test._dict_simulation["transient"] = "0f"
+    assert macular_dict_array_test.transient_rows_computing() == 0
+
+
+def test_transient_extraction():
+    macular_dict_array_test._path_csv = macular_dict_array_head100._path_csv.replace("_0f", "_12f")
+    print(macular_dict_array_test._path_csv)
+    assert macular_dict_array_test.transient_extraction() == 12
 
 
 def test_setup_spatial_index():
@@ -711,6 +1253,39 @@ def test_setup_data_dict_array_preprocessing():
     assert MacularDictArray.equal_dict_array(macular_dict_array_head3000.index, macular_dict_array_test.index)
 
 
+def test_setup_data_dict_array_preprocessing_float32():
+    # Import of the initial MacularDictArray without any preprocessing and conversion of its data in float32.
+    with open(path_pyb_file_head3000, "rb") as file:
+        macular_dict_array_test = pickle.load(file)
+    macular_dict_array_test.dict_simulation["dtype"] = "float32"
+    for measurement in macular_dict_array_test.data:
+        macular_dict_array_test.data[measurement] = macular_dict_array_test.data[measurement].astype(np.float32)
+
+    # Modification of the preprocessing dictionary with the rounding-sensitive processes.
+    macular_dict_array_test.dict_preprocessing["temporal_centering"] = True
+    macular_dict_array_test.dict_preprocessing["spatial_x_centering"] = True
+    macular_dict_array_test.dict_preprocessing["spatial_y_centering"] = True
+    macular_dict_array_test.dict_preprocessing["binning"] = 0.0016
+    macular_dict_array_test.dict_preprocessing["VSDI"] = True
+    macular_dict_array_test.dict_preprocessing["derivative"] = {"VSDI": 31, "FiringRate_GanglionGainControl": 31}
+    macular_dict_array_test.dict_preprocessing["edge"] = [5, 0]
+    macular_dict_array_test.dict_preprocessing["temporal_index_ms"] = 1000
+    macular_dict_array_test.dict_preprocessing["spatial_index_mm_retina"] = 0.3
+    macular_dict_array_test.dict_preprocessing["spatial_index_mm_cortex"] = 3
+    macular_dict_array_test.setup_data_dict_array_preprocessing()
+
+    # Checking that the data stay in float32 and close to the float64 data relatively to their scale.
+    assert macular_dict_array_test.data.keys() == macular_dict_array_default_head3000.data.keys()
+    for measurement in macular_dict_array_test.data:
+        data_float64 = macular_dict_array_default_head3000.data[measurement]
+        assert macular_dict_array_test.data[measurement].dtype == np.float32
+        assert np.allclose(macular_dict_array_test.data[measurement], data_float64, rtol=1e-5,
+                           atol=1e-5 * np.max(np.abs(data_float64)))
+
+    # Checking equality between indexes which are not affected by the dtype.
+    assert MacularDictArray.equal_dict_array(macular_dict_array_default_head3000.index, macular_dict_array_test.index)
+
+
 def test_binning_preprocess():
     # Initialisation of the MacularDictArray for tests with the values of the reduced control MacularDictArray.
     with open(path_pyb_file_head100, "rb") as file_test:
@@ -761,6 +1336,24 @@ def test_edge_cropping_preprocess():
     assert macular_dict_array_test.index["spatial_y"].shape[0] == 9
 
 
+def test_vsdi_preprocess():
+    # Initialisation of the MacularDictArray for tests with the default MacularDictArray.
+    with open(path_pyb_file_head100, "rb") as file_test:
+        macular_dict_array_test = pickle.load(file_test)
+
+    # Case of the default weights.
+    macular_dict_array_test.dict_preprocessing["VSDI"] = True
+    macular_dict_array_test.vsdi_preprocess()
+    assert np.array_equal(macular_dict_array_test.data["VSDI"], macular_dict_array_head100_VSDI.data["VSDI"])
+
+    # Case of weights given in the preprocessing dictionary.
+    macular_dict_array_test.dict_preprocessing["VSDI"] = {"excitatory": 1, "inhibitory": 0}
+    macular_dict_array_test.vsdi_preprocess()
+    exc_mean_voltage = macular_dict_array_test.data["muVn_CorticalExcitatory"]
+    assert np.array_equal(macular_dict_array_test.data["VSDI"], -DataPreprocessor.array_normalization(
+        exc_mean_voltage, exc_mean_voltage[:, :, 0]))
+
+
 def test_derivating_preprocess():
     # Loading of a MacularDictArray with a derivative on FiringRate_GanglionGainControl with n=3.
     with open(f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_dFRGang3_0f.pyb", "rb") as file_dFRGang3:
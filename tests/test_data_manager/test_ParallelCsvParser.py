@@ -0,0 +1,100 @@
+import os
+import pickle
+
+import numpy as np
+
+from src.data_manager.MacularCsvHeader import MacularCsvHeader
+from src.data_manager.ParallelCsvParser import ParallelCsvParser
+
+# Get data for test from relative path.
+path_data_test = os.path.normpath(f"{os.getcwd()}/../data_test/data_manager/")
+
+# Import of a reduced MacularDictArray control with only the 3000 first rows.
+path_pyb_file_head3000 = f"{path_data_test}/MacularDictArray/RC_RM_dSGpCP0026_barSpeed6dps_head3000_copy_0f.pyb"
+with open(path_pyb_file_head3000, "rb") as file_head3000:
+    macular_dict_array_head3000 = pickle.load(file_head3000)
+
+path_csv_file_head3000 = macular_dict_array_head3000.path_csv
+macular_csv_header = MacularCsvHeader(path_csv_file_head3000, (83, 15))
+
+
+def test_split_byte_ranges():
+    list_ranges = ParallelCsvParser.split_byte_ranges(path_csv_file_head3000, 7)
+
+    with open(path_csv_file_head3000, "rb") as file:
+        content = file.read()
+
+    # Case of contiguous ranges covering all the csv except its header.
+    assert list_ranges[0][0] == content.index(b"\n") + 1
+    assert list_ranges[-1][1] == len(content)
+    assert all(list_ranges[i][1] == list_ranges[i + 1][0] for i in range(len(list_ranges) - 1))
+
+    # Case of ranges starting at line boundaries.
+    assert all(content[start - 1:start] == b"\n" for start, _ in list_ranges)
+
+    # Case of more ranges than lines.
+    assert len(ParallelCsvParser.split_byte_ranges(path_csv_file_head3000, 100000)) <= 3000
+
+
+def test_selecting_byte_ranges():
+    list_ranges = ParallelCsvParser.split_byte_ranges(path_csv_file_head3000, 10)
+
+    # Case without transient and end.
+    assert ParallelCsvParser.selecting_byte_ranges(path_csv_file_head3000, list_ranges, 0, "max") == list_ranges
+
+    # Case of a transient and an end removing the first and last ranges.
+    list_first_times = [ParallelCsvParser.get_first_time(path_csv_file_head3000, start) for start, _ in list_ranges]
+    assert ParallelCsvParser.selecting_byte_ranges(path_csv_file_head3000, list_ranges, list_first_times[1],
+                                                   list_first_times[-2]) == list_ranges[1:-1]
+
+
+def test_skipping_rows():
+    with open(path_csv_file_head3000, "rb") as file:
+        content = file.read()
+    start_data = content.index(b"\n") + 1
+
+    # Case without rows skipped.
+    assert ParallelCsvParser.skipping_rows(path_csv_file_head3000, 0) == start_data
+
+    # Case of rows skipped over several blocks of bytes.
+    assert ParallelCsvParser.skipping_rows(path_csv_file_head3000, 10, block_size=100) == (
+        start_data + len(b"".join(content[start_data:].splitlines(keepends=True)[:10])))
+
+    # Case of more rows skipped than rows in the csv.
+    assert ParallelCsvParser.skipping_rows(path_csv_file_head3000, 100000) == len(content)
+
+
+def test_counting_rows():
+    list_ranges = ParallelCsvParser.split_byte_ranges(path_csv_file_head3000, 3)
+    list_first_times = [ParallelCsvParser.get_first_time(path_csv_file_head3000, start) for start, _ in list_ranges]
+
+    # Case of ranges whose rows are all kept.
+    assert sum(ParallelCsvParser.counting_rows(path_csv_file_head3000, byte_range, 0, "max")
+               for byte_range in list_ranges) == 3000
+
+    # Case of a transient and an end inside a range.
+    transient, end = macular_dict_array_head3000.index["temporal"][[10, 1010]]
+    assert sum(ParallelCsvParser.counting_rows(path_csv_file_head3000, byte_range, transient, end)
+               for byte_range in list_ranges) == 1001
+    assert ParallelCsvParser.counting_rows(path_csv_file_head3000, list_ranges[-1], 0, list_first_times[-1]) == 1
+
+
+def test_parse_macular_csv():
+    # Case of a parsing of the whole csv.
+    dict_measurements_array, temporal_index = ParallelCsvParser.parse_macular_csv(
+        path_csv_file_head3000, macular_csv_header, 0, "max", (15, 83), 3)
+
+    # Checking equality between the parsed data and index and those of the control MacularDictArray.
+    assert np.array_equal(temporal_index, macular_dict_array_head3000.index["temporal"])
+    assert dict_measurements_array.keys() == macular_dict_array_head3000.data.keys()
+    for measurement in dict_measurements_array:
+        assert np.array_equal(dict_measurements_array[measurement], macular_dict_array_head3000.data[measurement])
+
+    # Case of rows of the transient skipped before the parsing.
+    transient = macular_dict_array_head3000.index["temporal"][100]
+    dict_measurements_array, temporal_index = ParallelCsvParser.parse_macular_csv(
+        path_csv_file_head3000, macular_csv_header, transient, "max", (15, 83), 3, n_rows_skipped=99)
+    assert np.array_equal(temporal_index, macular_dict_array_head3000.index["temporal"][100:] - transient)
+    for measurement in dict_measurements_array:
+        assert np.array_equal(dict_measurements_array[measurement],
+                              macular_dict_array_head3000.data[measurement][:, :, 100:])
@@ -0,0 +1,123 @@
+import os
+import pickle
+
+import numpy as np
+
+from src.data_manager.MacularDictArray import MacularDictArray
+from src.data_manager.PreprocessingCache import PreprocessingCache
+
+# Get data for test from relative path.
+path_data_test = os.path.normpath(f"{os.getcwd()}/../data_test/data_manager/")
+
+# Import of a reduced MacularDictArray control with only the 100 first rows.
+path_pyb_file_head100 = f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_copy_0f.pyb"
+with open(path_pyb_file_head100, "rb") as file_head100:
+    macular_dict_array_head100 = pickle.load(file_head100)
+
+path_csv_file_head100 = f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.csv"
+
+
+def test_from_environment(monkeypatch, tmp_path):
+    # Case of a disabled cache.
+    monkeypatch.delenv("MACULAR_CACHE_DIR", raising=False)
+    assert PreprocessingCache.from_environment() is None
+
+    # Case of an enabled cache with a maximum size.
+    monkeypatch.setenv("MACULAR_CACHE_DIR", f"{tmp_path}/cache")
+    monkeypatch.setenv("MACULAR_CACHE_MAX_BYTES", "1000")
+    preprocessing_cache = PreprocessingCache.from_environment()
+    assert preprocessing_cache.path_cache == f"{tmp_path}/cache"
+    assert preprocessing_cache.max_bytes == 1000
+    assert os.path.isdir(f"{tmp_path}/cache")
+
+
+def test_csv_fingerprint(tmp_path):
+    # Case of the fingerprint of a csv.
+    fingerprint = PreprocessingCache.csv_fingerprint(path_csv_file_head100)
+    assert fingerprint["name"] == "RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.csv"
+    assert fingerprint["size"] == os.path.getsize(path_csv_file_head100)
+
+    # Case of a modified csv.
+    path_csv = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.csv"
+    with open(path_csv_file_head100, "rb") as file_csv, open(path_csv, "wb") as file_csv_copy:
+        file_csv_copy.write(file_csv.read())
+    os.utime(path_csv, ns=(fingerprint["mtime_ns"], fingerprint["mtime_ns"]))
+    assert PreprocessingCache.csv_fingerprint(path_csv) == fingerprint
+    with open(path_csv, "r+b") as file_csv_copy:
+        file_csv_copy.write(b"X")
+    os.utime(path_csv, ns=(fingerprint["mtime_ns"], fingerprint["mtime_ns"]))
+    assert PreprocessingCache.csv_fingerprint(path_csv) != fingerprint
+
+
+def test_make_key(tmp_path):
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache")
+    dict_simulation = {"path_csv": path_csv_file_head100, "path_pyb": "a.pyb", "n_cells_x": 83, "n_cells_y": 15}
+    key = preprocessing_cache.make_key(path_csv_file_head100, dict_simulation, {"VSDI": True, "binning": 0.0016})
+
+    # Case of keys independent of the order of the dictionaries, of the pyb path and of the reading of the csv.
+    assert key == preprocessing_cache.make_key(
+        path_csv_file_head100, {"n_cells_y": 15, "n_cells_x": 83, "path_pyb": "b.pyb", "n_workers": 4},
+        {"binning": 0.0016, "VSDI": True})
+
+    # Case of different preprocessing.
+    assert key != preprocessing_cache.make_key(path_csv_file_head100, dict_simulation, {"VSDI": True})
+
+
+def test_make_raw_key(tmp_path):
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache")
+    dict_simulation = {"path_csv": path_csv_file_head100, "path_pyb": "a.pyb", "n_cells_x": 83, "n_cells_y": 15}
+    key = preprocessing_cache.make_raw_key(path_csv_file_head100, dict_simulation)
+
+    # Case of a raw key independent of the pyb path.
+    assert key == preprocessing_cache.make_raw_key(path_csv_file_head100, {"n_cells_x": 83, "n_cells_y": 15})
+
+    # Case of a raw key distinct from the key of the entry without preprocessing.
+    assert key != preprocessing_cache.make_key(path_csv_file_head100, dict_simulation, {})
+
+
+def test_make_step_key(tmp_path):
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache")
+    key_binning = preprocessing_cache.make_step_key("raw_key", "binning", 0.0016)
+
+    # Case of keys changing with the parameters of the process.
+    assert key_binning != preprocessing_cache.make_step_key("raw_key", "binning", 0.0032)
+
+    # Case of keys changing with the parameters of the upstream processes.
+    assert (preprocessing_cache.make_step_key(key_binning, "VSDI", True) != preprocessing_cache.make_step_key(
+        preprocessing_cache.make_step_key("raw_key", "binning", 0.0032), "VSDI", True))
+
+
+def test_get_put(tmp_path):
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache")
+
+    # Case of a missing entry.
+    assert preprocessing_cache.get(MacularDictArray, "key") is None
+
+    # Case of an entry stored and loaded with copy-on-write arrays.
+    preprocessing_cache.put("key", macular_dict_array_head100)
+    macular_dict_array_test = preprocessing_cache.get(MacularDictArray, "key")
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    measurement = list(macular_dict_array_test.data)[0]
+    macular_dict_array_test.data[measurement][0, 0, 0] += 1
+    assert np.array_equal(preprocessing_cache.get(MacularDictArray, "key").data[measurement],
+                          macular_dict_array_head100.data[measurement])
+
+
+def test_eviction(tmp_path):
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache")
+    preprocessing_cache.put("key1", macular_dict_array_head100)
+    preprocessing_cache.put("key2", macular_dict_array_head100)
+    size_entry = PreprocessingCache.entry_size(preprocessing_cache.path_entry("key1"))
+
+    # Case of the least recently used entry removed when the maximum size is exceeded.
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache", 2 * size_entry)
+    os.utime(preprocessing_cache.path_entry("key1"), ns=(0, 0))
+    preprocessing_cache.get(MacularDictArray, "key1")
+    os.utime(preprocessing_cache.path_entry("key2"), ns=(1, 1))
+    preprocessing_cache.put("key3", macular_dict_array_head100)
+    assert sorted(os.listdir(preprocessing_cache.path_cache)) == ["key1.pybd", "key3.pybd"]
+
+    # Case of the entry just stored being kept even if it exceeds the maximum size on its own.
+    preprocessing_cache = PreprocessingCache(f"{tmp_path}/cache", 1)
+    preprocessing_cache.put("key4", macular_dict_array_head100)
+    assert os.listdir(preprocessing_cache.path_cache) == ["key4.pybd"]
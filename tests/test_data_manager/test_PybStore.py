@@ -0,0 +1,204 @@
+import os
+import pickle
+
+import numpy as np
+
+from src.data_manager.CompressedArray import CompressedArray
+from src.data_manager.MacularDictArray import MacularDictArray
+from src.data_manager.PybStore import PybStore
+
+# Get data for test from relative path.
+path_data_test = os.path.normpath(f"{os.getcwd()}/../data_test/data_manager/")
+
+# Import of a reduced MacularDictArray control with only the 100 first rows.
+path_pyb_file_head100 = f"{path_data_test}/RC_RM_dSGpCP0026_barSpeed6dps_head100_copy_0f.pyb"
+with open(path_pyb_file_head100, "rb") as file_head100:
+    macular_dict_array_head100 = pickle.load(file_head100)
+
+
+def test_is_pyb_store():
+    # Case of a pyb store.
+    assert PybStore.is_pyb_store("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.pybd")
+    assert PybStore.is_pyb_store("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.pybd/")
+
+    # Case of a pyb file.
+    assert not PybStore.is_pyb_store("/path/to/pybd/RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb")
+
+
+def test_is_out_of_band():
+    # Case of a pyb file with out-of-band buffers.
+    assert PybStore.is_out_of_band("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb5")
+
+    # Case of a pyb file.
+    assert not PybStore.is_out_of_band("/path/to/RC_RM_dSGpCP0026_barSpeed6dps_0f.pyb")
+
+
+def test_array_file_name():
+    assert PybStore.array_file_name("data", "FiringRate_GanglionGainControl") == (
+        "data/FiringRate_GanglionGainControl.npy")
+    assert PybStore.array_file_name("index", "spatial x/y") == "index/spatial_x_y.npy"
+
+
+def test_save_load(tmp_path):
+    path_pyb_store = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    PybStore.save(macular_dict_array_head100, path_pyb_store)
+
+    # Case of one file per array and a metadata file.
+    assert sorted(os.listdir(path_pyb_store)) == ["data", "index", "metadata.pkl"]
+    assert sorted(os.listdir(f"{path_pyb_store}/data")) == sorted(
+        f"{measurement}.npy" for measurement in macular_dict_array_head100.data)
+
+    # Case of a loading with read-only memory-mapped arrays.
+    macular_dict_array_test = PybStore.load(MacularDictArray, path_pyb_store)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    assert list(macular_dict_array_test.data) == list(macular_dict_array_head100.data)
+    for measurement in macular_dict_array_test.data:
+        assert isinstance(macular_dict_array_test.data[measurement], np.memmap)
+        assert not macular_dict_array_test.data[measurement].flags.writeable
+
+
+def test_save_memory_mapped(tmp_path):
+    path_pyb_store = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    PybStore.save(macular_dict_array_head100, path_pyb_store)
+    macular_dict_array_test = PybStore.load(MacularDictArray, path_pyb_store)
+    measurement = list(macular_dict_array_test.data)[0]
+    path_file = f"{path_pyb_store}/data/{measurement}.npy"
+    inode = os.stat(path_file).st_ino
+
+    # Case of arrays mapped on their own file which are not written again.
+    PybStore.save(macular_dict_array_test, path_pyb_store)
+    assert os.stat(path_file).st_ino == inode
+
+    # Case of a modified array written in a new file, the previous memory-map remaining valid.
+    previous_array = macular_dict_array_test.data[measurement]
+    macular_dict_array_test.data[measurement] = previous_array + 1
+    PybStore.save(macular_dict_array_test, path_pyb_store)
+    assert os.stat(path_file).st_ino != inode
+    assert np.array_equal(previous_array, macular_dict_array_head100.data[measurement])
+    assert np.array_equal(PybStore.load(MacularDictArray, path_pyb_store).data[measurement],
+                          macular_dict_array_head100.data[measurement] + 1)
+
+    # Case of a slice of a memory-mapped array written in a new file.
+    macular_dict_array_test = PybStore.load(MacularDictArray, path_pyb_store)
+    macular_dict_array_test.data[measurement] = macular_dict_array_test.data[measurement][:, :, 10:]
+    assert isinstance(macular_dict_array_test.data[measurement], np.memmap)
+    PybStore.save(macular_dict_array_test, path_pyb_store)
+    assert np.array_equal(PybStore.load(MacularDictArray, path_pyb_store).data[measurement],
+                          macular_dict_array_head100.data[measurement][:, :, 10:] + 1)
+
+    # Case of a removed array whose file is deleted.
+    del macular_dict_array_test.data[measurement]
+    PybStore.save(macular_dict_array_test, path_pyb_store)
+    assert not os.path.exists(path_file)
+    assert measurement not in PybStore.load(MacularDictArray, path_pyb_store).data
+
+
+def test_save_load_compressed(tmp_path):
+    path_pyb_store = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    PybStore.save(macular_dict_array_head100, path_pyb_store, compression="zlib")
+
+    # Case of the measurement arrays compressed in their own file.
+    assert sorted(os.listdir(f"{path_pyb_store}/data")) == sorted(
+        f"{measurement}.blk" for measurement in macular_dict_array_head100.data)
+
+    # Case of a loading with compressed arrays.
+    macular_dict_array_test = PybStore.load(MacularDictArray, path_pyb_store)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    measurement = list(macular_dict_array_test.data)[0]
+    assert isinstance(macular_dict_array_test.data[measurement], CompressedArray)
+    assert np.array_equal(macular_dict_array_test.data[measurement][..., 2:5],
+                          macular_dict_array_head100.data[measurement][..., 2:5])
+
+    # Case of compressed arrays not written again with the same codec.
+    path_file = f"{path_pyb_store}/data/{measurement}.blk"
+    inode = os.stat(path_file).st_ino
+    PybStore.save(macular_dict_array_test, path_pyb_store, compression="zlib")
+    assert os.stat(path_file).st_ino == inode
+
+    # Case of compressed arrays decompressed in ‘.npy’ files without codec.
+    PybStore.save(macular_dict_array_test, path_pyb_store)
+    assert sorted(os.listdir(f"{path_pyb_store}/data")) == sorted(
+        f"{measurement}.npy" for measurement in macular_dict_array_head100.data)
+    assert MacularDictArray.equal(PybStore.load(MacularDictArray, path_pyb_store), macular_dict_array_head100)
+
+
+def test_save_names_arrays(tmp_path):
+    path_pyb_store = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pybd"
+    PybStore.save(macular_dict_array_head100, path_pyb_store)
+    macular_dict_array_test = macular_dict_array_head100.copy()
+    measurement = list(macular_dict_array_test.data)[0]
+    inode = os.stat(f"{path_pyb_store}/data/{measurement}.npy").st_ino
+
+    # Case of a new array written alone, the files of the other arrays being kept.
+    macular_dict_array_test.data["new_measurement"] = macular_dict_array_test.data[measurement] * 2
+    PybStore.save(macular_dict_array_test, path_pyb_store, dict_names_arrays={"_data": ["new_measurement"]})
+    assert os.stat(f"{path_pyb_store}/data/{measurement}.npy").st_ino == inode
+    assert MacularDictArray.equal(PybStore.load(MacularDictArray, path_pyb_store), macular_dict_array_test)
+
+    # Case of an array replaced.
+    macular_dict_array_test.data[measurement] = macular_dict_array_test.data[measurement] + 1
+    PybStore.save(macular_dict_array_test, path_pyb_store, dict_names_arrays={"_data": [measurement]})
+    assert os.stat(f"{path_pyb_store}/data/{measurement}.npy").st_ino != inode
+    assert MacularDictArray.equal(PybStore.load(MacularDictArray, path_pyb_store), macular_dict_array_test)
+
+
+def test_make_header():
+    header = PybStore.make_header(macular_dict_array_head100)
+
+    # Case of a header without the data and index.
+    assert "_data" not in header["attributes"] and "_index" not in header["attributes"]
+    assert header["attributes"]["_dict_simulation"] == macular_dict_array_head100.dict_simulation
+
+    # Case of the shape and dtype of each array.
+    for measurement in macular_dict_array_head100.data:
+        assert header["manifest"]["_data"][measurement] == {
+            "shape": macular_dict_array_head100.data[measurement].shape,
+            "dtype": macular_dict_array_head100.data[measurement].dtype.str}
+
+
+def test_dump_read_header(tmp_path):
+    path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb"
+    PybStore.dump(macular_dict_array_head100, path_pyb)
+
+    # Case of a pyb file still readable with pickle.load.
+    with open(path_pyb, "rb") as pyb_file:
+        assert MacularDictArray.equal(pickle.load(pyb_file), macular_dict_array_head100)
+
+    # Case of a header read from the end of the pyb file.
+    assert PybStore.read_header(path_pyb) == PybStore.make_header(macular_dict_array_head100)
+
+    # Case of a pyb file saved without header.
+    with open(path_pyb, "wb") as pyb_file:
+        pickle.dump(macular_dict_array_head100, pyb_file)
+    assert PybStore.read_header(path_pyb) is None
+
+    # Case of an empty pyb file.
+    open(path_pyb, "wb").close()
+    assert PybStore.read_header(path_pyb) is None
+
+    # Case of a pyb store whose metadata is the header.
+    PybStore.save(macular_dict_array_head100, f"{path_pyb}d")
+    header = PybStore.read_header(f"{path_pyb}d")
+    assert "_data" not in header["attributes"]
+    assert header["manifest"]["_data"].keys() == macular_dict_array_head100.data.keys()
+
+
+def test_dump_load_file_out_of_band(tmp_path):
+    path_pyb = f"{tmp_path}/RC_RM_dSGpCP0026_barSpeed6dps_head100_0f.pyb5"
+    PybStore.dump(macular_dict_array_head100, path_pyb)
+
+    # Case of buffers written in aligned regions described by the header.
+    header = PybStore.read_header(path_pyb)
+    assert len(header["buffers"]) >= len(macular_dict_array_head100.data)
+    assert all(offset % PybStore.alignment == 0 for offset, _ in header["buffers"])
+
+    # Case of a loading with arrays mapped on the file in copy-on-write mode.
+    macular_dict_array_test = PybStore.load_file(path_pyb)
+    assert MacularDictArray.equal(macular_dict_array_test, macular_dict_array_head100)
+    measurement = list(macular_dict_array_test.data)[0]
+    macular_dict_array_test.data[measurement][0, 0, 0] += 1
+    assert MacularDictArray.equal(PybStore.load_file(path_pyb), macular_dict_array_head100)
+
+    # Case of a pyb file saved again while its arrays are mapped.
+    PybStore.dump(macular_dict_array_test, path_pyb)
+    assert MacularDictArray.equal(PybStore.load_file(path_pyb), macular_dict_array_test)